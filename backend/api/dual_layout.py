@@ -10,102 +10,448 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import numpy as np
 import networkx as nx
-from scipy.spatial import procrustes
-from typing import Dict, Tuple, List
+from sklearn.neighbors import NearestNeighbors
+from sklearn.decomposition import PCA
+from typing import Dict, Tuple, List, Optional
 import sqlite3
+import json
+from concurrent.futures import ProcessPoolExecutor
 
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
-def compute_knn_relationships(embeddings: Dict[str, np.ndarray],
-                              k: int = 5) -> List[Tuple[str, str, float]]:
+
+def _embedding_matrix_cache(npz_path: str, target_dim: Optional[int] = None
+                            ) -> Tuple[Path, Path]:
+    """
+    Return the (.npy matrix, .json names) sidecar for an .npz embedding file,
+    rebuilding it when missing or older than the .npz
+
+    np.load() cannot memory-map arrays inside an .npz container, so every
+    concept is copied once into a single (N, D) .npy that later runs can map
+    with mmap_mode='r'. It is float32, or float16 when the .npz matrix was
+    saved in half precision (load_embeddings widens the rows it gathers).
+    """
+    npz_path = Path(npz_path)
+    matrix_path = npz_path.with_suffix('.npy')
+    names_path = npz_path.with_suffix('.json')
+
+    if (matrix_path.exists() and names_path.exists()
+            and names_path.stat().st_mtime >= npz_path.stat().st_mtime):
+        dim = np.load(matrix_path, mmap_mode='r').shape[1]
+        if target_dim is None or dim == target_dim:
+            return matrix_path, names_path
+
+    data = np.load(npz_path)
+    if set(data.files) == {'names', 'embeddings'}:
+        # Matrix layout: one (N, D) array plus the row names
+        names = data['names'].tolist()
+        stored = data['embeddings']
+        dim = target_dim or stored.shape[1]
+        dtype = np.float16 if stored.dtype == np.float16 else np.float32
+        matrix = np.ascontiguousarray(stored[:, :dim], dtype=dtype)
+    else:
+        # Legacy layout: one array per concept name
+        names = list(data.files)
+        dim = target_dim or (data[names[0]].size if names else 0)
+
+        matrix = np.empty((len(names), dim), dtype=np.float32)
+        for i, name in enumerate(names):
+            # Flatten if needed (some are (1, 5120), should be (5120,))
+            matrix[i] = data[name].ravel()[:dim]
+
+    # Names are written last so a partial matrix is never picked up
+    np.save(matrix_path, matrix)
+    with open(names_path, 'w') as f:
+        json.dump(names, f)
+
+    return matrix_path, names_path
+
+
+def load_embeddings(npz_path: str,
+                    concepts: List[str],
+                    target_dim: Optional[int] = None
+                    ) -> Tuple[np.ndarray, Dict[str, int], List[str]]:
+    """
+    Load embeddings for the given concepts into one contiguous float32 matrix
+
+    Args:
+        npz_path: Path to an .npz file, either keyed by concept name or
+                  holding 'names' and an (N, D) 'embeddings' matrix
+        concepts: Concepts to load (missing ones are skipped)
+        target_dim: Keep only the first target_dim dimensions
+                    (some Qwen embeddings are stored duplicated)
+
+    Returns:
+        (X, name_to_row, valid_names) where X is (N, D) and row i of X
+        belongs to valid_names[i]
+    """
+    matrix_path, names_path = _embedding_matrix_cache(npz_path, target_dim)
+
+    matrix = np.load(matrix_path, mmap_mode='r')
+    with open(names_path) as f:
+        stored_row = {name: i for i, name in enumerate(json.load(f))}
+
+    valid_names = [c for c in concepts if c in stored_row]
+
+    # One vectorized gather from the mapped file into a contiguous float32
+    # buffer (half-precision files are widened here, after the read)
+    rows = np.array([stored_row[c] for c in valid_names], dtype=np.intp)
+    X = np.ascontiguousarray(matrix[rows], dtype=np.float32)
+
+    name_to_row = {name: i for i, name in enumerate(valid_names)}
+    return X, name_to_row, valid_names
+
+
+def _normalize(X: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize the rows of an embedding matrix (zero rows stay zero)
+
+    Returns:
+        New contiguous float32 (N, D) matrix of unit (or zero) rows
+    """
+    X = np.asarray(X, dtype=np.float32)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    return np.ascontiguousarray(X / np.where(norms == 0, 1, norms))
+
+
+def compute_knn_relationships_arr(X: np.ndarray,
+                                  names: List[str],
+                                  k: int = 5,
+                                  normalized: bool = False) -> List[Tuple[str, str, float]]:
     """
     Compute k-nearest neighbors from embeddings using cosine distance
 
     Args:
-        embeddings: Dict mapping concept names to embedding vectors
+        X: (N, D) embedding matrix, row i belongs to names[i]
+        names: Concept names aligned with the rows of X
         k: Number of nearest neighbors to keep per concept
+        normalized: If True, X already holds the output of _normalize and is
+                    used as is
 
     Returns:
         List of (concept, neighbor, distance) tuples
     """
-    concepts = list(embeddings.keys())
     relationships = []
 
-    print(f"   Computing k-NN (k={k}) from {len(concepts)} embeddings...")
-
-    for concept in concepts:
-        emb = embeddings[concept]
-        emb_norm = np.linalg.norm(emb)
+    print(f"   Computing k-NN (k={k}) from {len(names)} embeddings...")
 
-        if emb_norm == 0:
-            continue
+    # Unit rows: cosine distance is then ||x - y||^2 / 2
+    Xn = X if normalized else _normalize(X)
 
-        distances = []
+    # Zero vectors have no cosine direction, so they never take part
+    valid_rows = np.flatnonzero(Xn.any(axis=1))
 
-        for other in concepts:
-            if other != concept:
-                other_emb = embeddings[other]
-                other_norm = np.linalg.norm(other_emb)
+    k_eff = min(k, len(valid_rows) - 1)
+    if k_eff <= 0:
+        print(f"   ✓ Generated 0 k-NN relationships")
+        return relationships
 
-                if other_norm == 0:
-                    continue
+    # Only gather (copy) rows when some must be dropped
+    X_valid = Xn if len(valid_rows) == len(Xn) else Xn[valid_rows]
 
-                # Cosine distance (1 - cosine similarity)
-                cosine_sim = np.dot(emb, other_emb) / (emb_norm * other_norm)
-                dist = 1.0 - cosine_sim
-                distances.append((other, dist))
+    # Brute-force euclidean search on the unit rows, parallelized across
+    # cores; calling kneighbors() without a query excludes each point
+    # from its own neighbors
+    nn = NearestNeighbors(n_neighbors=k_eff, metric='euclidean', algorithm='brute', n_jobs=-1)
+    nn.fit(X_valid)
+    dists, idx = nn.kneighbors()
+    dists = dists ** 2 / 2
 
-        # Keep top k neighbors
-        distances.sort(key=lambda x: x[1])
-        for neighbor, dist in distances[:k]:
-            relationships.append((concept, neighbor, float(dist)))
+    # Emit (concept, neighbor, distance) rows without a per-pair Python loop
+    name_arr = np.asarray(names, dtype=object)
+    sources = name_arr[np.repeat(valid_rows, idx.shape[1])]
+    targets = name_arr[valid_rows[idx.ravel()]]
+    relationships = list(zip(sources.tolist(), targets.tolist(), dists.ravel().tolist()))
 
     print(f"   ✓ Generated {len(relationships)} k-NN relationships")
     return relationships
 
 
-def get_graph_layout_3d(embeddings: Dict[str, np.ndarray],
-                        relationships: List[Tuple[str, str, float]],
-                        spring_k: float = 2.0,
-                        iterations: int = 150,
-                        seed: int = 42) -> Dict[str, np.ndarray]:
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _fruchterman_reingold_3d(pos, indptr, indices, weights, k_opt, iterations, threshold):
+        """
+        Fruchterman-Reingold spring layout (same force model and cooling as
+        networkx.spring_layout) over a CSR adjacency, parallel across nodes
+        """
+        n = pos.shape[0]
+        displacement = np.zeros_like(pos)
+
+        # Initial temperature is ~0.1 of the domain, cooled linearly to dt
+        t = max(pos[:, 0].max() - pos[:, 0].min(), pos[:, 1].max() - pos[:, 1].min()) * 0.1
+        dt = t / (iterations + 1)
+
+        for _ in range(iterations):
+            for i in prange(n):
+                xi, yi, zi = pos[i, 0], pos[i, 1], pos[i, 2]
+                fx = 0.0
+                fy = 0.0
+                fz = 0.0
+
+                # Repulsion from every other node
+                for j in range(n):
+                    dx = xi - pos[j, 0]
+                    dy = yi - pos[j, 1]
+                    dz = zi - pos[j, 2]
+                    dist = max(np.sqrt(dx * dx + dy * dy + dz * dz), 0.01)
+                    f = k_opt * k_opt / (dist * dist)
+                    fx += dx * f
+                    fy += dy * f
+                    fz += dz * f
+
+                # Attraction along weighted edges
+                for e in range(indptr[i], indptr[i + 1]):
+                    j = indices[e]
+                    dx = xi - pos[j, 0]
+                    dy = yi - pos[j, 1]
+                    dz = zi - pos[j, 2]
+                    dist = max(np.sqrt(dx * dx + dy * dy + dz * dz), 0.01)
+                    f = weights[e] * dist / k_opt
+                    fx -= dx * f
+                    fy -= dy * f
+                    fz -= dz * f
+
+                displacement[i, 0] = fx
+                displacement[i, 1] = fy
+                displacement[i, 2] = fz
+
+            # Move each node at most t along its displacement
+            moved = 0.0
+            for i in prange(n):
+                length = max(np.sqrt(displacement[i, 0] ** 2 + displacement[i, 1] ** 2 +
+                                     displacement[i, 2] ** 2), 0.01)
+                step = t / length
+                for d in range(3):
+                    delta = displacement[i, d] * step
+                    pos[i, d] += delta
+                    moved += delta * delta
+
+            t -= dt
+            if np.sqrt(moved) / n < threshold:
+                break
+
+        return pos
+
+
+def _build_csr_graph(names: List[str],
+                     relationships: List[Tuple[str, str, float]]
+                     ) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
     """
-    Generate 3D force-directed layout from embeddings and relationships
+    Build a symmetric CSR adjacency from relationships, mirroring nx.Graph
+    semantics (node order = first appearance, repeated edges keep the last weight)
+
+    Returns:
+        (node_names, indptr, indices, weights)
+    """
+    allowed = set(names)
+    node_index = {}
+    edge_weights = {}
+
+    for source, target, distance in relationships:
+        if source in allowed and target in allowed:
+            a = node_index.setdefault(source, len(node_index))
+            b = node_index.setdefault(target, len(node_index))
+            if a != b:
+                # AGGRESSIVE weight function (quadratic falloff)
+                edge_weights[(min(a, b), max(a, b))] = 1.0 / ((distance + 0.1) ** 2)
+
+    n = len(node_index)
+    if edge_weights:
+        pairs = np.array(list(edge_weights.keys()), dtype=np.int32)
+        w = np.array(list(edge_weights.values()), dtype=np.float64)
+        src = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        dst = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        w = np.concatenate([w, w])
+    else:
+        src = dst = np.empty(0, dtype=np.int32)
+        w = np.empty(0, dtype=np.float64)
+
+    order = np.argsort(src, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+
+    return list(node_index.keys()), indptr, dst[order].astype(np.int32), w[order]
+
+
+def pca_init_positions(X: np.ndarray, seed: int = 42) -> Optional[np.ndarray]:
+    """
+    Project embeddings onto their top 3 principal components as a layout start
+
+    Starting the spring layout from the embedding geometry instead of random
+    positions lets it converge in about half the iterations.
+
+    Args:
+        X: (N, D) embedding matrix
+        seed: Random seed for the (randomized) SVD solver
+
+    Returns:
+        (N, 3) positions scaled into the unit box like the random
+        initialization, or None when there are fewer than 3 rows
+    """
+    if min(X.shape) < 3:
+        return None
+
+    init = PCA(n_components=3, random_state=seed).fit_transform(X).astype(np.float64)
+    init -= init.min(axis=0)
+    span = init.max()
+    return init / span if span > 0 else init
+
+
+def get_graph_layout_3d_arr(names: List[str],
+                            relationships: List[Tuple[str, str, float]],
+                            spring_k: float = 2.0,
+                            iterations: int = 150,
+                            seed: int = 42,
+                            init_pos: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Generate 3D force-directed layout for the embedded concepts
+
+    Uses the numba Fruchterman-Reingold kernel when numba is installed,
+    otherwise falls back to networkx.spring_layout.
 
     Args:
-        embeddings: Dict mapping concept names to embedding vectors
+        names: Concepts that have embeddings (edges to other concepts are dropped)
         relationships: List of (source, target, distance) tuples
         spring_k: Optimal distance between nodes (higher = more spread)
         iterations: Number of iterations for spring layout
         seed: Random seed for reproducibility
+        init_pos: Optional (N, 3) start positions aligned with names
+                  (see pca_init_positions); random when None
 
     Returns:
         Dict mapping concept names to [x, y, z] coordinates
     """
-    # Build weighted graph
-    G = nx.Graph()
-
-    for source, target, distance in relationships:
-        if source in embeddings and target in embeddings:
-            # AGGRESSIVE weight function (quadratic falloff)
-            # Close neighbors hold tight, distant neighbors barely pull
-            weight = 1.0 / ((distance + 0.1) ** 2)
-            G.add_edge(source, target, weight=weight)
-
-    # Generate 3D spring layout with custom parameters
-    pos = nx.spring_layout(G, dim=3, k=spring_k, iterations=iterations, seed=seed)
+    if not HAS_NUMBA:
+        # Build weighted graph
+        allowed = set(names)
+        G = nx.Graph()
+
+        # AGGRESSIVE weight function (quadratic falloff)
+        # Close neighbors hold tight, distant neighbors barely pull
+        G.add_weighted_edges_from([
+            (source, target, 1.0 / ((distance + 0.1) ** 2))
+            for source, target, distance in relationships
+            if source in allowed and target in allowed
+        ])
+
+        pos_init = None
+        if init_pos is not None:
+            row = {name: i for i, name in enumerate(names)}
+            pos_init = {node: init_pos[row[node]] for node in G}
+
+        # Generate 3D spring layout with custom parameters
+        pos = nx.spring_layout(G, dim=3, pos=pos_init, k=spring_k, iterations=iterations,
+                               seed=seed, weight='weight')
+
+        # Scale coordinates
+        coords = {node: (np.array(coord) * 10).astype(np.float32)
+                  for node, coord in pos.items()}
+
+        return coords
+
+    nodes, indptr, indices, weights = _build_csr_graph(names, relationships)
+    if not nodes:
+        return {}
+
+    if init_pos is not None:
+        row = {name: i for i, name in enumerate(names)}
+        pos = init_pos[[row[node] for node in nodes]].astype(np.float64)
+    else:
+        # Same random initialization as nx.spring_layout(seed=seed)
+        pos = np.random.RandomState(seed).rand(len(nodes), 3)
+    if len(nodes) > 1:
+        pos = _fruchterman_reingold_3d(pos, indptr, indices, weights,
+                                       float(spring_k), iterations, 1e-4)
+
+    # Rescale into [-1, 1] like nx.rescale_layout, then to viewing bounds
+    pos = pos - pos.mean(axis=0)
+    lim = np.abs(pos).max()
+    if lim > 0:
+        pos = pos / lim
 
     # Scale coordinates
-    coords = {node: (np.array(coord) * 10).astype(np.float32)
-              for node, coord in pos.items()}
+    coords = {node: (pos[i] * 10).astype(np.float32) for i, node in enumerate(nodes)}
 
     return coords
 
 
+def compute_layouts_parallel(
+    Xn_human: np.ndarray,
+    human_names: List[str],
+    Xn_ai: np.ndarray,
+    ai_names: List[str],
+    shared_relationships: List[Tuple[str, str, float]],
+    max_workers: int = 4
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Run the four independent layouts (and the two k-NN graphs they need)
+    across worker processes
+
+    Every layout starts from the PCA projection of its model's embeddings,
+    which halves the iterations needed from a random start. Sphere layouts
+    use the shared DB graph with spring_k=2.0, 75 iterations. Authentic
+    layouts use each model's own k-NN graph (k=8) with IDENTICAL physics:
+    spring_k=2.0, 100 iterations. The embedding matrices are the
+    L2-normalized rows from _normalize.
+
+    Returns:
+        (human_sphere, ai_sphere, human_organic, ai_organic) coordinate dicts
+    """
+    # Small (N, 3) start positions, cheap to ship to the workers
+    human_init = pca_init_positions(Xn_human, seed=42)
+    ai_init = pca_init_positions(Xn_ai, seed=43)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Sphere layouts only need the shared graph, start them right away
+        human_sphere = executor.submit(get_graph_layout_3d_arr, human_names,
+                                       shared_relationships, 2.0, 75, 42, human_init)
+        ai_sphere = executor.submit(get_graph_layout_3d_arr, ai_names,
+                                    shared_relationships, 2.0, 75, 43, ai_init)
+
+        human_knn = executor.submit(compute_knn_relationships_arr, Xn_human, human_names, 8, True)
+        ai_knn = executor.submit(compute_knn_relationships_arr, Xn_ai, ai_names, 8, True)
+
+        # Each authentic layout starts as soon as its own k-NN graph is ready
+        human_organic = executor.submit(get_graph_layout_3d_arr, human_names,
+                                        human_knn.result(), 2.0, 100, 42, human_init)
+        ai_organic = executor.submit(get_graph_layout_3d_arr, ai_names,
+                                     ai_knn.result(), 2.0, 100, 43, ai_init)
+
+        return (human_sphere.result(), ai_sphere.result(),
+                human_organic.result(), ai_organic.result())
+
+
+def _procrustes_rs(human: np.ndarray, ai: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Closed-form orthogonal Procrustes: center both, rotate AI onto human
+
+    Returns:
+        (human_centered, ai_rotated, sum of singular values of the cross-covariance)
+    """
+    # The layouts are float32; keep every pass below at that width
+    human = human.astype(np.float32, copy=False)
+    ai = ai.astype(np.float32, copy=False)
+
+    human_centered = human - human.mean(axis=0)
+    ai_centered = ai - ai.mean(axis=0)
+
+    # Rotation from the SVD of the 3x3 cross-covariance (no scale normalization)
+    U, S, Vt = np.linalg.svd(ai_centered.T @ human_centered)
+    ai_rotated = ai_centered @ (U @ Vt)
+
+    return human_centered, ai_rotated, float(S.sum())
+
+
 def align_layouts_procrustes(
-    human_coords: Dict[str, np.ndarray],
-    ai_coords: Dict[str, np.ndarray],
-    preserve_scale: bool = False
-) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], float]:
+    human_matrix: np.ndarray,
+    ai_matrix: np.ndarray,
+    preserve_scale: bool = False,
+    verbose: bool = False
+) -> Tuple[np.ndarray, np.ndarray, float]:
     """
     Align AI coordinate system to Human coordinate system using Procrustes analysis
 
@@ -113,124 +459,147 @@ def align_layouts_procrustes(
     so tension lines show true semantic drift, not arbitrary rotation.
 
     Args:
-        human_coords: MiniLM-based 3D coordinates (base reality)
-        ai_coords: Qwen-based 3D coordinates (alien thought)
+        human_matrix: MiniLM-based 3D coordinates (N x 3, base reality)
+        ai_matrix: Qwen-based 3D coordinates (N x 3, alien thought), rows
+                   aligned with human_matrix
         preserve_scale: If True, preserve natural variance differences (for authentic mode)
+        verbose: If True, print variance diagnostics for the authentic mode
 
     Returns:
-        (aligned_human_coords, aligned_ai_coords, disparity_score)
+        (aligned_human, aligned_ai, disparity_score) with rows in input order
     """
-    # Get shared concepts
-    shared_concepts = sorted(set(human_coords.keys()) & set(ai_coords.keys()))
-
-    if len(shared_concepts) < 3:
-        raise ValueError(f"Need at least 3 shared concepts, got {len(shared_concepts)}")
-
-    # Build matrices (N x 3)
-    human_matrix = np.array([human_coords[c] for c in shared_concepts])
-    ai_matrix = np.array([ai_coords[c] for c in shared_concepts])
+    if len(human_matrix) < 3:
+        raise ValueError(f"Need at least 3 shared concepts, got {len(human_matrix)}")
 
     if preserve_scale:
         # AUTHENTIC MODE: Rotation + translation only (preserve natural scale)
-        # Center both
-        human_centered = human_matrix - np.mean(human_matrix, axis=0)
-        ai_centered = ai_matrix - np.mean(ai_matrix, axis=0)
-
-        # Print natural variance BEFORE rotation/scaling
-        human_std_raw = np.std(human_centered)
-        ai_std_raw = np.std(ai_centered)
-        print(f"   Natural std deviation (before rotation):")
-        print(f"      Human: {human_std_raw:.4f}")
-        print(f"      AI:    {ai_std_raw:.4f}")
-        print(f"      Ratio: AI is {ai_std_raw / human_std_raw:.2f}x the spread of Human")
-
-        # Find rotation via SVD (but DON'T normalize scale)
-        U, S, Vt = np.linalg.svd(ai_centered.T @ human_centered)
-        R = U @ Vt
-        ai_rotated = ai_centered @ R
-
-        # Print variance AFTER rotation
-        ai_std_rotated = np.std(ai_rotated)
-        print(f"   After rotation (before scaling):")
-        print(f"      Human: {human_std_raw:.4f}")
-        print(f"      AI:    {ai_std_rotated:.4f}")
-        print(f"      Ratio: AI is {ai_std_rotated / human_std_raw:.2f}x the spread of Human")
+        human_centered, ai_rotated, _ = _procrustes_rs(human_matrix, ai_matrix)
 
         # Compute disparity
-        disparity = np.sqrt(np.sum((human_centered - ai_rotated) ** 2) / len(shared_concepts))
+        disparity = np.sqrt(np.sum((human_centered - ai_rotated) ** 2) / len(human_matrix))
+
+        # Columns are centered, so std is the RMS over all entries (one pass)
+        human_std = np.sqrt(np.einsum('ij,ij->', human_centered, human_centered) / human_centered.size)
 
         # Scale for visualization based on human spread only (10x smaller for better viewing)
-        scale_factor = 5.0 / np.std(human_centered)
+        scale_factor = 5.0 / human_std
 
         mtx1 = human_centered * scale_factor
         mtx2 = ai_rotated * scale_factor
 
-        # Calculate actual coordinate ranges after scaling
-        human_max_dist = np.max(np.linalg.norm(mtx1, axis=1))
-        ai_max_dist = np.max(np.linalg.norm(mtx2, axis=1))
-        human_final_std = np.std(mtx1)
-        ai_final_std = np.std(mtx2)
-
-        print(f"   Visualization scale factor: {scale_factor:.4f} (applied equally to both)")
-        print(f"   Final coordinate statistics:")
-        print(f"      Human - std: {human_final_std:.2f}, max distance from center: {human_max_dist:.2f}")
-        print(f"      AI    - std: {ai_final_std:.2f}, max distance from center: {ai_max_dist:.2f}")
-        print(f"      Visual size ratio: AI is {ai_max_dist / human_max_dist:.2f}x the radius of Human")
+        if verbose:
+            # Rotation preserves the Frobenius norm, so AI spread is unchanged by it
+            ai_std = np.sqrt(np.einsum('ij,ij->', ai_rotated, ai_rotated) / ai_rotated.size)
+            print(f"   Natural std deviation (rotation does not change spread):")
+            print(f"      Human: {human_std:.4f}")
+            print(f"      AI:    {ai_std:.4f}")
+            print(f"      Ratio: AI is {ai_std / human_std:.2f}x the spread of Human")
+
+            # Calculate actual coordinate ranges after scaling
+            human_max_dist = np.sqrt(np.einsum('ij,ij->i', mtx1, mtx1).max())
+            ai_max_dist = np.sqrt(np.einsum('ij,ij->i', mtx2, mtx2).max())
+
+            print(f"   Visualization scale factor: {scale_factor:.4f} (applied equally to both)")
+            print(f"   Final coordinate statistics:")
+            print(f"      Human - std: {human_std * scale_factor:.2f}, max distance from center: {human_max_dist:.2f}")
+            print(f"      AI    - std: {ai_std * scale_factor:.2f}, max distance from center: {ai_max_dist:.2f}")
+            print(f"      Visual size ratio: AI is {ai_max_dist / human_max_dist:.2f}x the radius of Human")
     else:
         # CONSTRAINED MODE: Standard Procrustes (rotation + scale)
-        mtx1, mtx2, disparity = procrustes(human_matrix, ai_matrix)
+        human_centered, ai_rotated, sv_sum = _procrustes_rs(human_matrix, ai_matrix)
 
-        # Normalize variance to ensure both galaxies have same overall radius
-        human_variance = np.var(mtx1)
-        ai_variance = np.var(mtx2)
+        human_norm = np.sqrt(np.einsum('ij,ij->', human_centered, human_centered))
+        ai_norm = np.sqrt(np.einsum('ij,ij->', ai_rotated, ai_rotated))
+        if human_norm == 0 or ai_norm == 0:
+            raise ValueError("Input matrices must contain >1 unique points")
 
-        if ai_variance > 0:  # Avoid division by zero
-            variance_scale = np.sqrt(human_variance / ai_variance)
-            mtx2 = mtx2 * variance_scale
+        # Standard disparity of the unit-norm matrices under the optimal scale
+        disparity = 1.0 - (sv_sum / (human_norm * ai_norm)) ** 2
 
-        # Scale up for visualization (Procrustes normalizes to unit scale)
+        # Both galaxies get the same overall radius: bring each to unit
+        # Frobenius norm (the optimal Procrustes scale would be undone anyway)
+        # and scale up for visualization
         scale_factor = 50.0
-        mtx1 = mtx1 * scale_factor
-        mtx2 = mtx2 * scale_factor
+        mtx1 = human_centered * (scale_factor / human_norm)
+        mtx2 = ai_rotated * (scale_factor / ai_norm)
+
+    return mtx1, mtx2, disparity
+
 
-    # Reconstruct aligned dictionaries
-    aligned_human = {c: mtx1[i] for i, c in enumerate(shared_concepts)}
-    aligned_ai = {c: mtx2[i] for i, c in enumerate(shared_concepts)}
+def _shared_rows(names: List[str], other_names: List[str]) -> np.ndarray:
+    """
+    Look up each name's row in another layout's node order
 
-    return aligned_human, aligned_ai, disparity
+    Returns:
+        int array aligned with names, -1 where the name is not in other_names
+    """
+    other_row = {name: i for i, name in enumerate(other_names)}
+    return np.fromiter((other_row.get(name, -1) for name in names),
+                       dtype=np.intp, count=len(names))
+
+
+def _stack_shared(human_coords: Dict[str, np.ndarray],
+                  ai_coords: Dict[str, np.ndarray]
+                  ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Stack the concepts placed in both layouts into row-aligned (N, 3) matrices
+
+    Returns:
+        (shared_concepts, human_matrix, ai_matrix), concepts in human layout order
+    """
+    human_names = list(human_coords.keys())
+    H = np.array(list(human_coords.values()), dtype=np.float32).reshape(-1, 3)
+    A = np.array(list(ai_coords.values()), dtype=np.float32).reshape(-1, 3)
+
+    ai_rows = _shared_rows(human_names, list(ai_coords.keys()))
+    mask = ai_rows >= 0
+    shared_concepts = [name for name, keep in zip(human_names, mask) if keep]
+    return shared_concepts, H[mask], A[ai_rows[mask]]
+
+
+def load_concept_metadata(cursor: sqlite3.Cursor) -> Dict[str, Tuple[float, int]]:
+    """
+    Load per-concept relationship aggregates in a single query
+
+    Each relationship is counted once for each distinct endpoint, matching
+    a per-concept "WHERE c1.name = ? OR c2.name = ?" lookup.
+
+    Returns:
+        Dict mapping concept name to (avg_human_distance, connection_count)
+    """
+    cursor.execute("""
+        SELECT c.name, AVG(e.human_distance), COUNT(*)
+        FROM (
+            SELECT concept_a_id AS concept_id, human_distance FROM relationships
+            UNION ALL
+            SELECT concept_b_id, human_distance FROM relationships
+            WHERE concept_b_id != concept_a_id
+        ) e
+        JOIN concepts c ON c.id = e.concept_id
+        GROUP BY c.name
+    """)
+    return {name: (avg_dist, conn_count) for name, avg_dist, conn_count in cursor.fetchall()}
 
 
 def apply_drift_amplification(
-    aligned_human: Dict[str, np.ndarray],
-    aligned_ai: Dict[str, np.ndarray],
+    human_matrix: np.ndarray,
+    ai_matrix: np.ndarray,
     amplification_factor: float = 3.0
-) -> Dict[str, np.ndarray]:
+) -> np.ndarray:
     """
     Amplify drift by pushing AI positions further from human positions
     This creates the organic "bulging" topology
 
     Args:
-        aligned_human: Human coordinates (base)
-        aligned_ai: AI coordinates (to be pushed away)
+        human_matrix: Human coordinates (N x 3, base)
+        ai_matrix: AI coordinates (N x 3, to be pushed away), rows aligned
+                   with human_matrix
         amplification_factor: How much to amplify drift
 
     Returns:
-        Amplified AI coordinates
+        Amplified AI coordinates (N x 3)
     """
-    amplified_ai = {}
-
-    for concept in aligned_human.keys():
-        h_pos = aligned_human[concept]
-        a_pos = aligned_ai[concept]
-
-        # Calculate drift vector
-        drift_vector = a_pos - h_pos
-
-        # Amplify the drift
-        amplified_pos = h_pos + (drift_vector * amplification_factor)
-        amplified_ai[concept] = amplified_pos
-
-    return amplified_ai
+    return human_matrix + (ai_matrix - human_matrix) * amplification_factor
 
 
 def generate_dual_layout():
@@ -272,6 +641,11 @@ def generate_dual_layout():
     # Get concepts
     print("\n1. Loading concepts from database...")
     conn = sqlite3.connect(db_path)
+    # Read-only pipeline: let SQLite mmap the file and keep pages cached
+    conn.execute("PRAGMA query_only=1")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA temp_store=MEMORY")
     cursor = conn.cursor()
     cursor.execute("SELECT name FROM concepts ORDER BY name")
     concepts = [row[0] for row in cursor.fetchall()]
@@ -282,35 +656,18 @@ def generate_dual_layout():
 
     # Load MiniLM (human) embeddings from .npz file
     print(f"   Loading MiniLM embeddings from {minilm_npz_path}...")
-    minilm_data = np.load(minilm_npz_path)
-
-    human_embeddings = {}
-    for concept in concepts:
-        if concept in minilm_data:
-            emb = minilm_data[concept]
-            # Flatten if needed
-            if len(emb.shape) > 1:
-                emb = emb.flatten()
-            human_embeddings[concept] = emb
-
-    # Load Qwen (AI) embeddings from .npz file
+    X_human, _, human_names = load_embeddings(minilm_npz_path, concepts)
+
+    # Load Qwen (AI) embeddings from .npz file (take first 5120 dims of duplicated ones)
     print(f"   Loading Qwen embeddings from {qwen_npz_path}...")
-    qwen_data = np.load(qwen_npz_path)
+    X_ai, _, ai_names = load_embeddings(qwen_npz_path, concepts, target_dim=5120)
 
-    ai_embeddings = {}
-    for concept in concepts:
-        if concept in qwen_data:
-            emb = qwen_data[concept]
-            # Flatten if needed (some are (1, 5120), should be (5120,))
-            if len(emb.shape) > 1:
-                emb = emb.flatten()
-            # Handle duplicated embeddings (take first 5120 if > 5120)
-            if emb.shape[0] > 5120:
-                emb = emb[:5120]  # Take first 5120 dimensions only
-            ai_embeddings[concept] = emb
+    print(f"   ✓ Human (MiniLM): {X_human.shape[0]} embeddings ({X_human.shape[1]}D)")
+    print(f"   ✓ AI (Qwen): {X_ai.shape[0]} embeddings ({X_ai.shape[1]}D)")
 
-    print(f"   ✓ Human (MiniLM): {len(human_embeddings)} embeddings (384D)")
-    print(f"   ✓ AI (Qwen): {len(ai_embeddings)} embeddings (5120D)")
+    # Normalize once; every cosine computation below reuses the unit rows
+    Xn_human = _normalize(X_human)
+    Xn_ai = _normalize(X_ai)
 
     # ====================
     # SPHERE MODE: Shared relationship graph from DB
@@ -326,64 +683,27 @@ def generate_dual_layout():
     shared_relationships = cursor.fetchall()
     print(f"   Using {len(shared_relationships)} shared relationships from DB")
 
-    print("   Human sphere layout:")
-    human_sphere = get_graph_layout_3d(
-        human_embeddings,
-        shared_relationships,
-        spring_k=2.0,
-        iterations=150,
-        seed=42
-    )
-
-    print("   AI sphere layout:")
-    ai_sphere = get_graph_layout_3d(
-        ai_embeddings,
-        shared_relationships,
-        spring_k=2.0,
-        iterations=150,
-        seed=43
+    print("   Computing sphere and authentic layouts in parallel...")
+    human_sphere, ai_sphere, human_organic, ai_organic = compute_layouts_parallel(
+        Xn_human, human_names, Xn_ai, ai_names, shared_relationships
     )
 
     print("   Aligning sphere layouts (Procrustes)...")
-    aligned_human_sphere, aligned_ai_sphere, disparity_sphere = align_layouts_procrustes(
-        human_sphere, ai_sphere
-    )
+    sphere_concepts, H_sphere, A_sphere = _stack_shared(human_sphere, ai_sphere)
+    H_sphere, A_sphere, disparity_sphere = align_layouts_procrustes(H_sphere, A_sphere)
     print(f"   ✓ Sphere mode disparity: {disparity_sphere:.4f}")
 
     # ====================
     # AUTHENTIC MODE: Separate k-NN graphs, identical physics, preserve scale
     # ====================
     print("\n4. AUTHENTIC MODE: Generating scientifically rigorous layouts...")
-    print("   IDENTICAL PHYSICS: k=8, spring_k=2.0, iterations=200")
+    print("   IDENTICAL PHYSICS: k=8, spring_k=2.0, iterations=100 (PCA init)")
     print("   SCALE PRESERVED: No variance normalization")
 
-    print("   Computing human k-NN graph (k=8):")
-    human_relationships = compute_knn_relationships(human_embeddings, k=8)
-
-    print("   Computing AI k-NN graph (k=8):")
-    ai_relationships = compute_knn_relationships(ai_embeddings, k=8)
-
-    print("   Human authentic layout:")
-    human_organic = get_graph_layout_3d(
-        human_embeddings,
-        human_relationships,
-        spring_k=2.0,      # IDENTICAL
-        iterations=200,    # IDENTICAL
-        seed=42
-    )
-
-    print("   AI authentic layout:")
-    ai_organic = get_graph_layout_3d(
-        ai_embeddings,
-        ai_relationships,
-        spring_k=2.0,      # IDENTICAL
-        iterations=200,    # IDENTICAL
-        seed=43
-    )
-
     print("   Aligning authentic layouts (rotation only, scale preserved)...")
-    aligned_human_organic, aligned_ai_organic, disparity_organic = align_layouts_procrustes(
-        human_organic, ai_organic, preserve_scale=True  # KEY: preserve natural variance
+    organic_concepts, H_organic_aligned, A_organic_aligned = _stack_shared(human_organic, ai_organic)
+    H_organic_aligned, A_organic_aligned, disparity_organic = align_layouts_procrustes(
+        H_organic_aligned, A_organic_aligned, preserve_scale=True  # KEY: preserve natural variance
     )
     print(f"   ✓ Authentic mode disparity: {disparity_organic:.4f}")
     print(f"   ✓ Natural scale differences preserved")
@@ -392,46 +712,41 @@ def generate_dual_layout():
     # Build node data with both modes
     # ====================
     print("\n5. Building dual-mode node data...")
-    nodes = []
+    concept_meta = load_concept_metadata(cursor)
+    conn.close()
+
+    # Organic mode positions (fall back to sphere positions if unavailable)
+    organic_rows = _shared_rows(sphere_concepts, organic_concepts)
+    mask = organic_rows >= 0
+    H_organic = H_sphere.copy()
+    A_organic = A_sphere.copy()
+    H_organic[mask] = H_organic_aligned[organic_rows[mask]]
+    A_organic[mask] = A_organic_aligned[organic_rows[mask]]
 
-    for concept in sorted(aligned_human_sphere.keys()):
-        # Sphere mode positions
-        h_pos_sphere = aligned_human_sphere[concept]
-        a_pos_sphere = aligned_ai_sphere[concept]
-        drift_sphere = np.linalg.norm(h_pos_sphere - a_pos_sphere)
-
-        # Organic mode positions (if available)
-        h_pos_organic = aligned_human_organic.get(concept, h_pos_sphere)
-        a_pos_organic = aligned_ai_organic.get(concept, a_pos_sphere)
-        drift_organic = np.linalg.norm(h_pos_organic - a_pos_organic)
-
-        # Get concept metadata
-        cursor.execute("""
-            SELECT AVG(r.human_distance), COUNT(*)
-            FROM relationships r
-            JOIN concepts c1 ON r.concept_a_id = c1.id
-            JOIN concepts c2 ON r.concept_b_id = c2.id
-            WHERE c1.name = ? OR c2.name = ?
-        """, (concept, concept))
-        avg_dist, conn_count = cursor.fetchone()
+    drift_sphere = np.linalg.norm(H_sphere - A_sphere, axis=1)
+    drift_organic = np.linalg.norm(H_organic - A_organic, axis=1)
+
+    # Sort by organic drift (most divergent first)
+    order = np.argsort(-drift_organic, kind='stable')
 
+    nodes = []
+    for i in order:
+        concept = sphere_concepts[i]
+        avg_dist, conn_count = concept_meta.get(concept, (None, 0))
         nodes.append({
             "id": concept,
             "name": concept,
-            "pos_human": h_pos_sphere.tolist(),  # Sphere mode human
-            "pos_ai": a_pos_sphere.tolist(),  # Sphere mode AI
-            "pos_human_organic": h_pos_organic.tolist(),  # Organic mode human
-            "pos_ai_organic": a_pos_organic.tolist(),  # Organic mode AI
-            "drift": float(drift_organic),  # Use organic drift for sorting
-            "drift_sphere": float(drift_sphere),
-            "drift_organic": float(drift_organic),
+            "pos_human": H_sphere[i].tolist(),  # Sphere mode human
+            "pos_ai": A_sphere[i].tolist(),  # Sphere mode AI
+            "pos_human_organic": H_organic[i].tolist(),  # Organic mode human
+            "pos_ai_organic": A_organic[i].tolist(),  # Organic mode AI
+            "drift": float(drift_organic[i]),  # Use organic drift for sorting
+            "drift_sphere": float(drift_sphere[i]),
+            "drift_organic": float(drift_organic[i]),
             "avgDistance": float(avg_dist or 0.5),
             "connections": int(conn_count or 0)
         })
 
-    # Sort by organic drift (most divergent first)
-    nodes.sort(key=lambda n: n["drift_organic"], reverse=True)
-
     print(f"   ✓ Generated {len(nodes)} dual nodes")
     print(f"\n   Top 5 most divergent (organic mode):")
     for node in nodes[:5]:
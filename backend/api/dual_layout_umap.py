@@ -18,6 +18,8 @@ except ImportError:
     print("ERROR: umap-learn not installed. Install with: pip install umap-learn")
     sys.exit(1)
 
+from dual_layout import _normalize, load_concept_metadata, load_embeddings
+
 
 def align_umap_coords(
     human_coords: np.ndarray,
@@ -35,9 +37,13 @@ def align_umap_coords(
     Returns:
         (aligned_human_dict, aligned_ai_dict, disparity)
     """
+    # UMAP emits float32; keep every pass below at that width
+    human_coords = human_coords.astype(np.float32, copy=False)
+    ai_coords = ai_coords.astype(np.float32, copy=False)
+
     # Center both
-    human_centered = human_coords - np.mean(human_coords, axis=0)
-    ai_centered = ai_coords - np.mean(ai_coords, axis=0)
+    human_centered = human_coords - human_coords.mean(axis=0)
+    ai_centered = ai_coords - ai_coords.mean(axis=0)
 
     # Rotation-only Procrustes (preserve scale to show manifold differences)
     U, S, Vt = np.linalg.svd(ai_centered.T @ human_centered)
@@ -48,7 +54,9 @@ def align_umap_coords(
     disparity = np.sqrt(np.sum((human_centered - ai_rotated) ** 2) / len(concept_names))
 
     # Scale for visualization (apply equally to preserve relative differences)
-    scale_factor = 3.75 / np.std(human_centered)
+    # Columns are centered, so std is the RMS over all entries (one pass)
+    human_std = np.sqrt(np.einsum('ij,ij->', human_centered, human_centered) / human_centered.size)
+    scale_factor = 3.75 / human_std
     human_scaled = human_centered * scale_factor
     ai_scaled = ai_rotated * scale_factor
 
@@ -106,40 +114,24 @@ def generate_umap_layout():
     # Load embeddings
     print("\n2. Loading embeddings...")
     print(f"   Loading MiniLM embeddings from {minilm_npz_path}...")
-    minilm_data = np.load(minilm_npz_path)
+    X_human, human_rows, human_names = load_embeddings(minilm_npz_path, concepts)
 
     print(f"   Loading Qwen embeddings from {qwen_npz_path}...")
-    qwen_data = np.load(qwen_npz_path)
-
-    # Build embedding matrices
-    human_embeddings = []
-    ai_embeddings = []
-    valid_concepts = []
-
-    for concept in concepts:
-        if concept in minilm_data and concept in qwen_data:
-            # MiniLM embedding
-            h_emb = minilm_data[concept]
-            if len(h_emb.shape) > 1:
-                h_emb = h_emb.flatten()
-
-            # Qwen embedding
-            a_emb = qwen_data[concept]
-            if len(a_emb.shape) > 1:
-                a_emb = a_emb.flatten()
-            if a_emb.shape[0] > 5120:
-                a_emb = a_emb[:5120]
-
-            human_embeddings.append(h_emb)
-            ai_embeddings.append(a_emb)
-            valid_concepts.append(concept)
-
-    human_matrix = np.array(human_embeddings)
-    ai_matrix = np.array(ai_embeddings)
+    X_ai, ai_rows, _ = load_embeddings(qwen_npz_path, concepts, target_dim=5120)
+
+    # Keep concepts embedded by both models, as aligned row gathers
+    valid_concepts = [c for c in human_names if c in ai_rows]
+    human_matrix = X_human[[human_rows[c] for c in valid_concepts]]
+    ai_matrix = X_ai[[ai_rows[c] for c in valid_concepts]]
 
     print(f"   ✓ Human (MiniLM): {human_matrix.shape}")
     print(f"   ✓ AI (Qwen): {ai_matrix.shape}")
 
+    # L2-normalize once: on unit vectors ||x - y||^2 = 2 - 2*cos(x, y), so
+    # euclidean UMAP finds the same neighborhoods as cosine with faster kernels
+    human_matrix = _normalize(human_matrix)
+    ai_matrix = _normalize(ai_matrix)
+
     # Apply UMAP reduction
     print("\n3. Applying UMAP manifold reduction...")
     print("   Reducing Human embeddings to 3D...")
@@ -147,7 +139,8 @@ def generate_umap_layout():
         n_components=3,
         n_neighbors=15,
         min_dist=0.1,
-        metric='cosine',
+        metric='euclidean',
+        low_memory=False,
         random_state=42
     )
     human_coords = umap_human.fit_transform(human_matrix)
@@ -158,7 +151,8 @@ def generate_umap_layout():
         n_components=3,
         n_neighbors=15,
         min_dist=0.1,
-        metric='cosine',
+        metric='euclidean',
+        low_memory=False,
         random_state=43
     )
     ai_coords = umap_ai.fit_transform(ai_matrix)
@@ -172,6 +166,7 @@ def generate_umap_layout():
 
     # Build node data
     print("\n5. Building node data...")
+    concept_meta = load_concept_metadata(cursor)
     nodes = []
 
     for concept in valid_concepts:
@@ -179,15 +174,7 @@ def generate_umap_layout():
         a_pos = aligned_ai[concept]
         drift = np.linalg.norm(h_pos - a_pos)
 
-        # Get concept metadata from database
-        cursor.execute("""
-            SELECT AVG(r.human_distance), COUNT(*)
-            FROM relationships r
-            JOIN concepts c1 ON r.concept_a_id = c1.id
-            JOIN concepts c2 ON r.concept_b_id = c2.id
-            WHERE c1.name = ? OR c2.name = ?
-        """, (concept, concept))
-        avg_dist, conn_count = cursor.fetchone()
+        avg_dist, conn_count = concept_meta.get(concept, (None, 0))
 
         nodes.append({
             "id": concept,
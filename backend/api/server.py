@@ -4,13 +4,18 @@ Provides API endpoints for querying the semantic cartography
 """
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict
+from anyio import to_thread
+import threading
+import uuid
 import uvicorn
 
 from config import settings
 from db.relational import LSCPDatabase
 from db.vector_store import VectorStore
+from db.handles import get_db, get_vector_store
 from models.control import ControlModel
 from models.explorer import ExplorerModel
 from crawler.scanner import LSCPScanner
@@ -19,7 +24,8 @@ from crawler.scanner import LSCPScanner
 app = FastAPI(
     title="Latent Space Cartography Protocol",
     description="API for exploring semantic deltas between human and AI concept spaces",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # Enable CORS for frontend
@@ -36,6 +42,14 @@ db: Optional[LSCPDatabase] = None
 vector_store: Optional[VectorStore] = None
 scanner: Optional[LSCPScanner] = None
 
+# One scan at a time per process (database calls use per-thread connections)
+_scan_lock = threading.Lock()
+
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database call in a worker thread, off the event loop"""
+    return await to_thread.run_sync(lambda: func(*args, **kwargs))
+
 
 # Request/Response Models
 class ScanRequest(BaseModel):
@@ -74,8 +88,8 @@ async def startup_event():
     print("Initializing LSCP Server...")
 
     # Initialize databases
-    db = LSCPDatabase(settings.SQLITE_DB_PATH)
-    vector_store = VectorStore(settings.VECTOR_DB_PATH, settings.CHROMA_COLLECTION_NAME)
+    db = get_db()
+    vector_store = get_vector_store()
 
     # Initialize models (this will take some time)
     try:
@@ -86,14 +100,16 @@ async def startup_event():
             n_threads=settings.LLAMA_N_THREADS
         )
 
-        # Initialize scanner
+        # Initialize scanner (the shared database opens a connection per
+        # thread, so scans on a worker thread don't contend with requests)
         scanner = LSCPScanner(
             control_model=control_model,
             explorer_model=explorer_model,
             vector_store=vector_store,
             database=db,
             neighbor_count=settings.NEIGHBOR_COUNT,
-            delta_threshold=settings.DELTA_THRESHOLD
+            delta_threshold=settings.DELTA_THRESHOLD,
+            quantize=settings.QUANTIZE_EMBEDDINGS
         )
 
         print("LSCP Server ready!")
@@ -129,7 +145,7 @@ async def get_all_concepts() -> List[str]:
     if not vector_store:
         raise HTTPException(status_code=503, detail="Vector store not initialized")
 
-    concepts = vector_store.get_all_concepts()
+    concepts = await to_thread.run_sync(vector_store.get_all_concepts)
     return concepts
 
 
@@ -139,7 +155,7 @@ async def get_concept(concept_name: str) -> ConceptResponse:
     if not db:
         raise HTTPException(status_code=503, detail="Database not initialized")
 
-    result = db.get_concept_neighbors(concept_name)
+    result = await run_db(db.get_concept_neighbors, concept_name)
 
     if not result.get("relationships"):
         raise HTTPException(status_code=404, detail=f"Concept '{concept_name}' not found")
@@ -153,15 +169,35 @@ async def get_edge_concepts(threshold: float = 0.3, limit: int = 100) -> List[Ed
     if not db:
         raise HTTPException(status_code=503, detail="Database not initialized")
 
-    edges = db.get_high_delta_relationships(threshold=threshold, limit=limit)
+    edges = await run_db(db.get_high_delta_relationships, threshold=threshold, limit=limit)
     return [EdgeResponse(**edge) for edge in edges]
 
 
-@app.post("/scan")
+def _run_scan_job(job_id: str, concept: str, vocabulary: List[str]):
+    """
+    Run a queued scan in a worker thread and record its outcome
+
+    Job state is kept in the database, so a poll served by another API
+    worker process sees it too.
+    """
+    with _scan_lock:
+        db.update_scan_job(job_id, "running")
+        try:
+            result = scanner.scan_concept(concept, vocabulary)
+        except Exception as e:
+            db.update_scan_job(job_id, "failed", error=f"Scan failed: {str(e)}")
+            return
+        db.update_scan_job(job_id, "complete", result=result)
+
+
+@app.post("/scan", status_code=202)
 async def scan_concept(request: ScanRequest, background_tasks: BackgroundTasks) -> Dict:
     """
-    Scan a new concept
+    Queue a scan of a new concept
     If vocabulary not provided, uses existing database concepts
+
+    Scans take minutes, so this returns a job id right away; poll
+    GET /scan/{job_id} for the result.
     """
     if not scanner:
         raise HTTPException(status_code=503, detail="Scanner not initialized")
@@ -169,7 +205,7 @@ async def scan_concept(request: ScanRequest, background_tasks: BackgroundTasks)
     # Use existing concepts as vocabulary if not provided
     vocabulary = request.vocabulary
     if not vocabulary:
-        vocabulary = vector_store.get_all_concepts()
+        vocabulary = await to_thread.run_sync(vector_store.get_all_concepts)
 
     # If vocabulary is still empty, use a minimal set
     if not vocabulary:
@@ -179,44 +215,39 @@ async def scan_concept(request: ScanRequest, background_tasks: BackgroundTasks)
     if request.concept not in vocabulary:
         vocabulary.append(request.concept)
 
-    try:
-        result = scanner.scan_concept(request.concept, vocabulary)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Scan failed: {str(e)}")
+    # Finished jobs are kept SCAN_JOB_TTL seconds for polling, then dropped
+    await run_db(db.prune_scan_jobs, settings.SCAN_JOB_TTL)
 
+    job_id = uuid.uuid4().hex
+    await run_db(db.add_scan_job, job_id, request.concept)
+    background_tasks.add_task(_run_scan_job, job_id, request.concept, vocabulary)
 
-@app.get("/stats")
-async def get_stats() -> Dict:
-    """Get database statistics"""
-    if not db:
-        raise HTTPException(status_code=503, detail="Database not initialized")
+    return {"job_id": job_id, "status": "queued", "concept": request.concept}
 
-    cursor = db.conn.cursor()
 
-    cursor.execute("SELECT COUNT(*) FROM concepts")
-    concept_count = cursor.fetchone()[0]
+@app.get("/scan/{job_id}")
+async def get_scan_job(job_id: str) -> Dict:
+    """Get the status (and, once complete, the result) of a scan job"""
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not initialized")
 
-    cursor.execute("SELECT COUNT(*) FROM relationships")
-    relationship_count = cursor.fetchone()[0]
+    job = await run_db(db.get_scan_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Scan job '{job_id}' not found")
 
-    cursor.execute("SELECT COUNT(*) FROM scans")
-    scan_count = cursor.fetchone()[0]
+    return {"job_id": job_id, **job}
 
-    cursor.execute("SELECT AVG(delta) FROM relationships")
-    avg_delta = cursor.fetchone()[0] or 0
 
-    cursor.execute("SELECT COUNT(*) FROM relationships WHERE delta >= ?", (settings.DELTA_THRESHOLD,))
-    high_delta_count = cursor.fetchone()[0]
+@app.get("/stats")
+async def get_stats() -> Dict:
+    """Get database statistics"""
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not initialized")
 
-    return {
-        "concepts": concept_count,
-        "relationships": relationship_count,
-        "scans": scan_count,
-        "avg_delta": round(avg_delta, 4),
-        "high_delta_pairs": high_delta_count,
-        "threshold": settings.DELTA_THRESHOLD
-    }
+    stats = await run_db(db.get_stats, settings.DELTA_THRESHOLD)
+    stats["avg_delta"] = round(stats["avg_delta"], 4)
+    stats["threshold"] = settings.DELTA_THRESHOLD
+    return stats
 
 
 def run_server():
@@ -225,6 +256,7 @@ def run_server():
         "api.server:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
+        workers=settings.API_WORKERS,
         reload=False
     )
 
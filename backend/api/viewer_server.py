@@ -2,20 +2,31 @@
 LSCP Galaxy Viewer API
 Serves 3D visualization data for the semantic space
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Optional
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Iterator, List, Dict, Optional, Tuple
+from contextlib import contextmanager
 import numpy as np
 import sqlite3
 from pathlib import Path
-import pickle
+import json
+import os
+import threading
+import anyio
+import orjson
 import umap
+from scipy import optimize, sparse
+from scipy.sparse.csgraph import connected_components
+
+from barnes_hut_layout import HAS_NUMBA, barnes_hut_layout
 
 # Initialize FastAPI
 app = FastAPI(
     title="LSCP Galaxy Viewer API",
     description="API for visualizing the Latent Space Cartography Protocol",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Enable CORS for React frontend
@@ -29,50 +40,214 @@ app.add_middleware(
 
 # Database path
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "lscp.db"
-CACHE_PATH = Path(__file__).parent.parent.parent / "data" / "umap_cache.pkl"
+CACHE_PATH = Path(__file__).parent.parent.parent / "data" / "umap_cache.npy"
+CACHE_NAMES_PATH = Path(__file__).parent.parent.parent / "data" / "umap_cache.json"
 VECTOR_DB_PATH = Path(__file__).parent.parent.parent / "data" / "vectors"
 
 # Global cache
 _projection_cache = None
 
+# Bumped whenever _projection_cache changes (full layout or incremental update)
+_projection_version = 0
+
+# Serialized /api/galaxy payload, keyed by the DB state it was built from
+_galaxy_payload_cache = None
+
+# Serializes projection refreshes, which run in worker threads
+_projection_lock = threading.Lock()
+
+# Set by migrate_db when the trigram full-text index over concept names exists
+_has_name_fts = False
+
+# Graphs at least this large use the Barnes-Hut layout (when numba is installed)
+BARNES_HUT_MIN_NODES = 2000
+
+# New concepts are placed incrementally unless they grow the graph by more than this
+INCREMENTAL_MAX_GROWTH = 0.1
 
-def get_graph_layout_3d():
-    """Calculate 3D layout using force-directed graph from relationships"""
-    try:
-        import networkx as nx
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
+class ProjectionCache:
+    """3D positions as one (N, 3) float32 array plus a name -> row index"""
 
+    def __init__(self, names: List[str], coords: np.ndarray):
+        self.names = list(names)
+        self.coords = coords
+        self.row = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get(self, name: str, default=None):
+        """Position of a concept as [x, y, z], or default if it has none"""
+        i = self.row.get(name)
+        return default if i is None else self.coords[i].tolist()
+
+    def save(self, coords_path: Path, names_path: Path):
+        """
+        Write the coordinates (.npy) and names (.json) side by side
+
+        Files are replaced atomically, so a cache still memory-mapping the
+        previous version keeps reading intact data.
+        """
+        tmp_coords = coords_path.with_name(coords_path.stem + ".tmp.npy")
+        np.save(tmp_coords, np.ascontiguousarray(self.coords, dtype=np.float32))
+        tmp_names = names_path.with_name(names_path.name + ".tmp")
+        with open(tmp_names, 'w') as f:
+            json.dump(self.names, f)
+        os.replace(tmp_coords, coords_path)
+        os.replace(tmp_names, names_path)
+
+    @classmethod
+    def load(cls, coords_path: Path, names_path: Path) -> "ProjectionCache":
+        """Memory-map a saved cache (no per-coordinate Python objects)"""
+        with open(names_path) as f:
+            names = json.load(f)
+        return cls(names, np.load(coords_path, mmap_mode='r'))
+
+
+def fr_energy_layout(
+    adjacency: sparse.csr_matrix,
+    k: float = 2.0,
+    iterations: int = 100,
+    seed: int = 42,
+    gravity: float = 1.0,
+    block_size: int = 1024
+) -> np.ndarray:
+    """
+    3D Fruchterman-Reingold layout by L-BFGS minimization of its energy
+
+    Minimizes sum_ij A_ij d_ij^3 / 3k - k^2 sum_ij log d_ij plus a weak pull of
+    each connected component towards the center (the networkx energy method).
+    Attraction is a sparse product over the edges; repulsion is summed over
+    row tiles of block_size nodes with dense GEMMs, so memory stays
+    O(block_size * N).
+
+    Args:
+        adjacency: Symmetric (N, N) sparse matrix of edge weights
+        k: Optimal distance between nodes
+        iterations: Maximum L-BFGS iterations
+        seed: Random seed for the initial positions
+        gravity: Strength of the pull of components towards the center
+        block_size: Rows per repulsion tile
+
+    Returns:
+        (N, 3) positions centered and scaled into [-1, 1]
+    """
+    n = adjacency.shape[0]
+    adjacency = sparse.coo_matrix(adjacency)
+    rows, cols, w = adjacency.row, adjacency.col, adjacency.data
+
+    n_components, labels = connected_components(adjacency, directed=False)
+    component_size = np.bincount(labels, minlength=n_components)
+
+    def energy(x):
+        pos = x.reshape(n, 3)
+        grad = np.zeros_like(pos)
+
+        # Attraction over the edges: weights scaled by distance form a
+        # sparse matrix, so the gradient is two sparse products
+        delta = pos[rows] - pos[cols]
+        dist = np.sqrt(np.maximum(np.einsum('ij,ij->i', delta, delta), 1e-10))
+        Ad = sparse.csr_matrix((w * dist, (rows, cols)), shape=(n, n))
+        grad += (2.0 / k) * (np.asarray(Ad.sum(axis=1)) * pos - Ad @ pos)
+        cost = np.sum(w * dist ** 3) / (3.0 * k)
+
+        # Repulsion between all pairs, one tile of rows at a time; squared
+        # distances and the force sum are both GEMMs against all positions
+        sq = np.einsum('ij,ij->i', pos, pos)
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            tile = pos[start:stop]
+            dist2 = sq[start:stop, None] + sq[None, :] - 2.0 * (tile @ pos.T)
+            np.maximum(dist2, 1e-10, out=dist2)
+            tile_rows = np.arange(stop - start)
+            dist2[tile_rows, tile_rows + start] = 1.0  # self pairs: no force, log 1 = 0
+            inv = 1.0 / dist2
+            inv[tile_rows, tile_rows + start] = 0.0
+            grad[start:stop] -= 2.0 * k ** 2 * (inv.sum(axis=1)[:, None] * tile - inv @ pos)
+            cost -= 0.5 * k ** 2 * np.sum(np.log(dist2))
+
+        # Gravity from each component's centroid to the center of the unit box
+        centers = np.zeros((n_components, 3))
+        np.add.at(centers, labels, pos)
+        offset = centers / component_size[:, None] - 0.5
+        grad += gravity * offset[labels]
+        cost += 0.5 * gravity * np.sum(component_size * np.einsum('ij,ij->i', offset, offset))
+
+        return cost, grad.ravel()
+
+    # Same random initialization as nx.spring_layout(seed=seed)
+    pos = np.random.RandomState(seed).rand(n, 3)
+    if n > 1:
+        pos = optimize.minimize(
+            energy, pos.ravel(), method='L-BFGS-B', jac=True,
+            options={'maxiter': iterations, 'gtol': 1e-4}
+        ).x.reshape(n, 3)
+
+    # Rescale into [-1, 1] like nx.rescale_layout
+    pos = pos - pos.mean(axis=0)
+    lim = np.abs(pos).max()
+    return pos / lim if lim > 0 else pos
+
+
+def load_relationship_graph() -> Tuple[Dict[str, int], sparse.csr_matrix]:
+    """
+    Load the concept graph from relationships
+
+    Returns:
+        (name -> node index, symmetric CSR adjacency of edge weights)
+    """
+    # Runs in worker threads (refresh_projection), so never on the shared connection
+    with open_read_connection() as conn:
         # Build graph from relationships
-        cursor.execute("""
+        rows = conn.execute("""
             SELECT ca.name, cb.name, r.human_distance
             FROM relationships r
             JOIN concepts ca ON r.concept_a_id = ca.id
             JOIN concepts cb ON r.concept_b_id = cb.id
-        """)
-
-        G = nx.Graph()
-        for row in cursor.fetchall():
+        """).fetchall()
+
+    node_index = {}
+    edges = {}
+    for a, b, d in rows:
+        i = node_index.setdefault(a, len(node_index))
+        j = node_index.setdefault(b, len(node_index))
+        if i != j:
             # Use inverse distance as weight (closer concepts = stronger connection)
-            weight = 1.0 / (1.0 + float(row[2]))
-            G.add_edge(row[0], row[1], weight=weight)
+            edges[(min(i, j), max(i, j))] = 1.0 / (1.0 + float(d))
+
+    # Symmetric sparse adjacency (one entry per direction)
+    n = len(node_index)
+    pairs = np.array(list(edges.keys()), dtype=np.int64).reshape(-1, 2)
+    w = np.fromiter(edges.values(), dtype=np.float64, count=len(edges))
+    adjacency = sparse.csr_matrix(
+        (np.concatenate([w, w]),
+         (np.concatenate([pairs[:, 0], pairs[:, 1]]), np.concatenate([pairs[:, 1], pairs[:, 0]]))),
+        shape=(n, n)
+    )
+
+    return node_index, adjacency
 
-        conn.close()
 
-        if len(G.nodes()) == 0:
+def get_graph_layout_3d():
+    """Calculate 3D layout using force-directed graph from relationships"""
+    try:
+        node_index, adjacency = load_relationship_graph()
+        if not node_index:
             return None
+        n = len(node_index)
 
-        # Use spring layout in 3D
-        pos = nx.spring_layout(G, dim=3, k=2, iterations=50, seed=42)
+        if HAS_NUMBA and n >= BARNES_HUT_MIN_NODES:
+            # O(V log V) octree repulsion, parallel minibatches
+            pos = barnes_hut_layout(adjacency.indptr, adjacency.indices, adjacency.data,
+                                    k=2.0, iterations=200, seed=42)
+        else:
+            # Energy-minimizing spring layout in 3D
+            pos = fr_energy_layout(adjacency, k=2.0, iterations=100, seed=42)
 
         # Scale positions for better viewing
-        coords_dict = {}
-        for node, coord in pos.items():
-            scaled = coord * 10  # Scale to reasonable viewing bounds
-            coords_dict[node] = scaled.tolist()
-
-        return coords_dict
+        pos = pos * 10  # Scale to reasonable viewing bounds
+        return ProjectionCache(list(node_index.keys()), pos.astype(np.float32))
 
     except Exception as e:
         print(f"Error creating graph layout: {e}")
@@ -81,47 +256,325 @@ def get_graph_layout_3d():
         return None
 
 
-def calculate_3d_projection():
+def fit_layout_k(
+    pos: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    w: np.ndarray,
+    sample: int = 1024,
+    block_size: int = 256,
+    seed: int = 42
+) -> float:
+    """
+    Recover the optimal distance k of a settled force-directed layout
+
+    At equilibrium each node's attraction (sum_j w_ij d_ij (x_i - x_j) / k)
+    balances its repulsion (k^2 sum_j (x_i - x_j) / d_ij^2), so k^3 is the
+    least-squares ratio of the two over a sample of nodes. Needed because
+    the stored layout was rescaled after it settled.
+
+    Args:
+        pos: (N, 3) positions
+        rows, cols, w: Edges in both directions (COO) with their weights
+    """
+    n = len(pos)
+    delta = pos[rows] - pos[cols]
+    dist = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+    attraction = np.zeros_like(pos)
+    np.add.at(attraction, rows, (w * dist)[:, None] * delta)
+
+    idx = np.arange(n) if n <= sample else np.random.RandomState(seed).choice(n, sample, replace=False)
+    sq = np.einsum('ij,ij->i', pos, pos)
+    repulsion = np.empty((len(idx), 3))
+    for start in range(0, len(idx), block_size):
+        tile_idx = idx[start:start + block_size]
+        tile = pos[tile_idx]
+        dist2 = sq[tile_idx, None] + sq[None, :] - 2.0 * (tile @ pos.T)
+        np.maximum(dist2, 1e-10, out=dist2)
+        inv = 1.0 / dist2
+        inv[np.arange(len(tile_idx)), tile_idx] = 0.0  # no self force
+        repulsion[start:start + len(tile_idx)] = inv.sum(axis=1)[:, None] * tile - inv @ pos
+
+    attraction = attraction[idx]
+    denom = np.sum(repulsion * repulsion)
+    if denom <= 0:
+        return 1.0
+    return float(np.cbrt(max(np.sum(attraction * repulsion) / denom, 1e-12)))
+
+
+def place_new_nodes(
+    cache: ProjectionCache,
+    node_index: Dict[str, int],
+    adjacency: sparse.csr_matrix,
+    iterations: int = 10,
+    gravity: float = 1.0
+) -> ProjectionCache:
+    """
+    Add graph nodes missing from a projection without moving existing ones
+
+    Each new node starts at the weighted centroid of its already-placed
+    neighbors and runs a few L-BFGS steps on its own 3 coordinates under the
+    same energy as fr_energy_layout (attraction to its neighbors, repulsion
+    from every placed node, and the pull of its component's centroid towards
+    the layout center), with all other positions frozen. The optimal
+    distance is fitted to the current layout (fit_layout_k). New nodes are
+    placed breadth-first from the existing layout, so a node attached only
+    to other new nodes waits until one of them has a position.
+
+    Returns:
+        A new ProjectionCache holding the old rows followed by the new ones
+    """
+    names = list(cache.names)
+    coords = [np.asarray(cache.coords, dtype=np.float64)]
+
+    # Projection row of each graph node, -1 while it is unplaced
+    cache_rows = np.array([cache.row.get(name, -1) for name in node_index], dtype=np.int64)
+    new_nodes = [name for name, i in node_index.items() if cache_rows[i] < 0]
+
+    # Optimal distance of the frozen layout, from edges between placed nodes
+    coo = adjacency.tocoo()
+    a, b = cache_rows[coo.row], cache_rows[coo.col]
+    both = (a >= 0) & (b >= 0)
+    k = fit_layout_k(coords[0], a[both], b[both], coo.data[both]) if both.any() else 1.0
+    center = coords[0].mean(axis=0) if len(coords[0]) else np.zeros(3)
+    rng = np.random.RandomState(42)
+
+    # Placed members of each component: position sum and count (for gravity)
+    n_components, labels = connected_components(adjacency, directed=False)
+    graph_placed = np.flatnonzero(cache_rows >= 0)
+    comp_sum = np.zeros((n_components, 3))
+    np.add.at(comp_sum, labels[graph_placed], coords[0][cache_rows[graph_placed]])
+    comp_count = np.bincount(labels[graph_placed], minlength=n_components).astype(np.float64)
+
+    # Breadth-first from the placed nodes; unreachable ones go last
+    pending = list(new_nodes)
+    while pending:
+        ready = [name for name in pending
+                 if (cache_rows[adjacency.getrow(node_index[name]).indices] >= 0).any()]
+        if not ready:
+            ready = pending
+        ready_set = set(ready)
+        pending = [name for name in pending if name not in ready_set]
+
+        for name in ready:
+            pos = np.vstack(coords)
+            i = node_index[name]
+            row = adjacency.getrow(i)
+            nbr_placed = cache_rows[row.indices] >= 0
+            nbr_rows = cache_rows[row.indices][nbr_placed]
+            nbr_w = row.data[nbr_placed]
+            label = labels[i]
+            m = comp_count[label] + 1.0
+
+            if len(nbr_rows):
+                start = np.average(pos[nbr_rows], axis=0, weights=nbr_w)
+            else:
+                start = center
+            start = start + rng.normal(scale=0.1 * k, size=3)
+
+            def energy(x):
+                cost = 0.0
+                grad = np.zeros(3)
+                if len(nbr_rows):
+                    delta = x - pos[nbr_rows]
+                    dist = np.sqrt(np.maximum(np.einsum('ij,ij->i', delta, delta), 1e-10))
+                    cost += np.sum(nbr_w * dist ** 3) / (3.0 * k)
+                    grad += ((nbr_w * dist / k)[:, None] * delta).sum(axis=0)
+                delta = x - pos
+                dist2 = np.maximum(np.einsum('ij,ij->i', delta, delta), 1e-10)
+                cost -= 0.5 * k ** 2 * np.sum(np.log(dist2))
+                grad -= k ** 2 * (delta / dist2[:, None]).sum(axis=0)
+                # Component gravity: the centroid moves by x / m
+                offset = (comp_sum[label] + x) / m - center
+                cost += 0.5 * gravity * m * np.dot(offset, offset)
+                grad += gravity * offset
+                return cost, grad
+
+            x = optimize.minimize(
+                energy, start, method='L-BFGS-B', jac=True,
+                options={'maxiter': iterations}
+            ).x
+
+            cache_rows[i] = len(names)
+            names.append(name)
+            coords.append(x[None, :])
+            comp_sum[label] += x
+            comp_count[label] += 1.0
+
+    return ProjectionCache(names, np.vstack(coords).astype(np.float32))
+
+
+def refresh_projection() -> Optional[ProjectionCache]:
+    """
+    Bring the projection up to date with the relationships table
+
+    Concepts added since the layout was computed are placed incrementally;
+    if they would grow the graph by more than INCREMENTAL_MAX_GROWTH, the
+    full layout is recomputed instead. Blocking (graph scan, layout), so
+    request handlers run it in a worker thread; concurrent calls are
+    serialized and later ones find the projection already current.
+    """
+    global _projection_cache, _projection_version
+
+    with _projection_lock:
+        if _projection_cache is None:
+            return calculate_3d_projection()
+
+        node_index, adjacency = load_relationship_graph()
+        new_count = sum(1 for name in node_index if name not in _projection_cache.row)
+        if new_count == 0:
+            return _projection_cache
+
+        if new_count > INCREMENTAL_MAX_GROWTH * len(_projection_cache):
+            print(f"{new_count} new concepts; recomputing the full 3D layout...")
+            return calculate_3d_projection(force=True)
+
+        print(f"Placing {new_count} new concepts into the 3D layout...")
+        _projection_cache = place_new_nodes(_projection_cache, node_index, adjacency)
+        _projection_version += 1
+        _projection_cache.save(CACHE_PATH, CACHE_NAMES_PATH)
+        return _projection_cache
+
+
+def calculate_3d_projection(force: bool = False):
     """Calculate 3D projection using graph layout and cache it"""
-    global _projection_cache
+    global _projection_cache, _projection_version
 
     # Check cache first
-    if CACHE_PATH.exists():
+    if not force and CACHE_PATH.exists() and CACHE_NAMES_PATH.exists():
         print("Loading cached 3D projection...")
-        with open(CACHE_PATH, 'rb') as f:
-            _projection_cache = pickle.load(f)
+        _projection_cache = ProjectionCache.load(CACHE_PATH, CACHE_NAMES_PATH)
+        _projection_version += 1
         return _projection_cache
 
     print("Calculating 3D graph layout... (this may take a moment)")
 
     # Use graph-based layout
     _projection_cache = get_graph_layout_3d()
+    _projection_version += 1
 
     if not _projection_cache:
         print("Failed to calculate layout")
         return None
 
     # Cache result
-    with open(CACHE_PATH, 'wb') as f:
-        pickle.dump(_projection_cache, f)
+    _projection_cache.save(CACHE_PATH, CACHE_NAMES_PATH)
 
     print(f"Projected {len(_projection_cache)} concepts to 3D space using force-directed layout")
     return _projection_cache
 
 
-def get_db_connection():
-    """Get SQLite connection"""
-    conn = sqlite3.connect(str(DB_PATH))
+def open_db_connection() -> sqlite3.Connection:
+    """Open the SQLite connection shared by all requests (WAL, warm page cache)"""
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA mmap_size=268435456")
     return conn
 
 
+@contextmanager
+def open_read_connection() -> Iterator[sqlite3.Connection]:
+    """
+    Open a private read-only connection for work done off the event loop
+
+    The shared connection is only used by handlers on the event loop;
+    threadpool work (payload streaming, layout refreshes) reads through its
+    own connection, which WAL lets run alongside the writers.
+    """
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA mmap_size=268435456")
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def migrate_db(conn: sqlite3.Connection):
+    """
+    Create the indexes the viewer queries rely on, then refresh planner stats
+
+    Both relationship endpoints are indexed (with the distance they
+    aggregate) so joins and per-concept lookups become index seeks.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_rel_a ON relationships(concept_a_id, human_distance)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_rel_b ON relationships(concept_b_id, human_distance)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_concepts_name ON concepts(name)")
+    conn.execute("ANALYZE")
+    conn.commit()
+
+    create_name_fts(conn)
+
+
+def create_name_fts(conn: sqlite3.Connection):
+    """
+    Index concept names in an FTS5 trigram table for substring search
+
+    The table mirrors concepts (external content) and triggers keep it in
+    sync with every write. Leaves _has_name_fts False (LIKE search) when
+    this SQLite build lacks FTS5 or the trigram tokenizer.
+    """
+    global _has_name_fts
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'concepts_fts'"
+    ).fetchone()
+
+    try:
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS concepts_fts USING fts5(
+                name, content='concepts', content_rowid='id', tokenize='trigram'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS concepts_fts_ai AFTER INSERT ON concepts BEGIN
+                INSERT INTO concepts_fts(rowid, name) VALUES (new.id, new.name);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS concepts_fts_ad AFTER DELETE ON concepts BEGIN
+                INSERT INTO concepts_fts(concepts_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS concepts_fts_au AFTER UPDATE OF name ON concepts BEGIN
+                INSERT INTO concepts_fts(concepts_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                INSERT INTO concepts_fts(rowid, name) VALUES (new.id, new.name);
+            END;
+        """)
+        if not exists:
+            # Populate once from the existing rows
+            conn.execute("INSERT INTO concepts_fts(concepts_fts) VALUES ('rebuild')")
+        conn.commit()
+        _has_name_fts = True
+    except sqlite3.OperationalError as e:
+        print(f"FTS5 trigram search unavailable, using LIKE: {e}")
+        _has_name_fts = False
+
+
+def get_db_connection() -> sqlite3.Connection:
+    """Get the shared SQLite connection (opened on first use)"""
+    if getattr(app.state, "db", None) is None:
+        app.state.db = open_db_connection()
+    return app.state.db
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Calculate projection on startup"""
+    """Open the shared connection and calculate projection on startup"""
+    app.state.db = open_db_connection()
+    migrate_db(app.state.db)
     calculate_3d_projection()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared connection"""
+    if getattr(app.state, "db", None) is not None:
+        app.state.db.close()
+        app.state.db = None
+
+
 @app.get("/")
 async def root():
     """Health check"""
@@ -132,21 +585,38 @@ async def root():
     }
 
 
-@app.get("/api/galaxy")
-async def get_galaxy_data():
+def _db_state() -> tuple:
     """
-    Get all nodes with 3D coordinates, delta scores, and relationships
+    Fingerprint of the database files; changes whenever a write lands
+
+    With WAL, commits only touch the -wal file until a checkpoint, so
+    both files are checked.
     """
-    global _projection_cache
+    state = []
+    for path in (DB_PATH, DB_PATH.with_name(DB_PATH.name + "-wal")):
+        try:
+            st = os.stat(path)
+            state.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            state.append(None)
+    return tuple(state)
 
-    if _projection_cache is None:
-        _projection_cache = calculate_3d_projection()
 
-    if _projection_cache is None:
-        raise HTTPException(status_code=500, detail="Failed to calculate 3D projection")
+def iter_galaxy_payload(projection: ProjectionCache, batch_size: int = 1000) -> Iterator[bytes]:
+    """
+    Stream the /api/galaxy nodes + edges payload as one JSON document
+
+    Rows are read from the cursor batch_size at a time and serialized as
+    they arrive, so the full row lists are never held in memory. Starlette
+    iterates this in its threadpool, so it reads through its own connection.
+    """
+    with open_read_connection() as conn:
+        yield from _galaxy_payload_chunks(conn.cursor(), projection, batch_size)
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
+
+def _galaxy_payload_chunks(cursor: sqlite3.Cursor, projection: ProjectionCache,
+                           batch_size: int) -> Iterator[bytes]:
+    """JSON chunks of the galaxy payload, read through cursor"""
 
     # Get all concepts with their aggregate metrics
     cursor.execute("""
@@ -160,20 +630,21 @@ async def get_galaxy_data():
         GROUP BY c.id, c.name
     """)
 
-    nodes = []
-    for row in cursor.fetchall():
-        concept_name = row['name']
-
-        # Get 3D coordinates
-        coords = _projection_cache.get(concept_name, [0, 0, 0])
-
-        nodes.append({
+    total_nodes = 0
+    yield b'{"nodes":['
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        chunk = b",".join(orjson.dumps({
             "id": row['id'],
-            "name": concept_name,
-            "position": coords,
+            "name": row['name'],
+            "position": projection.get(row['name'], [0, 0, 0]),
             "connections": row['connection_count'] or 0,
             "avgDistance": float(row['avg_distance']) if row['avg_distance'] else 0.0
-        })
+        }) for row in rows)
+        yield (b"," if total_nodes else b"") + chunk
+        total_nodes += len(rows)
 
     # Get all relationships (edges)
     cursor.execute("""
@@ -188,27 +659,69 @@ async def get_galaxy_data():
         JOIN concepts cb ON r.concept_b_id = cb.id
     """)
 
-    edges = []
-    for row in cursor.fetchall():
-        edges.append({
+    total_edges = 0
+    yield b'],"edges":['
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        chunk = b",".join(orjson.dumps({
             "source": row['concept_a'],
             "target": row['concept_b'],
             "distance": float(row['human_distance']),
             "bridge": row['bridge_mechanism'],
             "reasoning": row['internal_monologue']
-        })
+        }) for row in rows)
+        yield (b"," if total_edges else b"") + chunk
+        total_edges += len(rows)
 
-    conn.close()
+    yield b'],"metadata":' + orjson.dumps({
+        "total_nodes": total_nodes,
+        "total_edges": total_edges,
+        "projection_method": "UMAP"
+    }) + b"}"
 
-    return {
-        "nodes": nodes,
-        "edges": edges,
-        "metadata": {
-            "total_nodes": len(nodes),
-            "total_edges": len(edges),
-            "projection_method": "UMAP"
-        }
-    }
+
+def _stream_and_cache(state: tuple, projection: ProjectionCache) -> Iterator[bytes]:
+    """Stream the galaxy payload, keeping a copy for the payload cache"""
+    global _galaxy_payload_cache
+
+    chunks = []
+    for chunk in iter_galaxy_payload(projection):
+        chunks.append(chunk)
+        yield chunk
+
+    # Only a fully sent payload is cached
+    _galaxy_payload_cache = (state, b"".join(chunks))
+
+
+@app.get("/api/galaxy")
+async def get_galaxy_data():
+    """
+    Get all nodes with 3D coordinates, delta scores, and relationships
+
+    The payload is streamed straight from the database cursor and the
+    serialized bytes are reused until the database changes; when it does,
+    concepts added since the layout was computed are placed first.
+    """
+    db_state = _db_state()
+    if _projection_cache is None or _galaxy_payload_cache is None or _galaxy_payload_cache[0][0] != db_state:
+        # Scans every relationship and may re-run the layout: keep it off the event loop
+        await anyio.to_thread.run_sync(refresh_projection)
+
+    # Version read before the projection: if a refresh lands in between, the
+    # newer layout is cached under the older version and rebuilt next time,
+    # never the reverse (no lock, so the event loop never waits on a layout)
+    state = (db_state, _projection_version)
+    projection = _projection_cache
+
+    if projection is None:
+        raise HTTPException(status_code=500, detail="Failed to calculate 3D projection")
+
+    if _galaxy_payload_cache is None or _galaxy_payload_cache[0] != state:
+        return StreamingResponse(_stream_and_cache(state, projection), media_type="application/json")
+
+    return Response(content=_galaxy_payload_cache[1], media_type="application/json")
 
 
 @app.get("/api/node/{node_name}")
@@ -226,49 +739,42 @@ async def get_node_detail(node_name: str):
     if not concept:
         raise HTTPException(status_code=404, detail=f"Concept '{node_name}' not found")
 
-    # Get all relationships
+    # Get all relationships, one per connected concept. Each edge is seen from
+    # this node's side; pairs stored in both directions keep the outgoing row
+    # (then the oldest), via SQLite's bare-column-with-MIN() rule
     cursor.execute("""
         SELECT
-            cb.name as connected_to,
-            r.human_distance,
-            r.bridge_mechanism,
-            r.internal_monologue,
-            'outgoing' as direction
-        FROM relationships r
-        JOIN concepts ca ON r.concept_a_id = ca.id
-        JOIN concepts cb ON r.concept_b_id = cb.id
-        WHERE ca.name = ?
-
-        UNION ALL
-
-        SELECT
-            ca.name as connected_to,
-            r.human_distance,
-            r.bridge_mechanism,
-            r.internal_monologue,
-            'incoming' as direction
-        FROM relationships r
-        JOIN concepts ca ON r.concept_a_id = ca.id
-        JOIN concepts cb ON r.concept_b_id = cb.id
-        WHERE cb.name = ?
-    """, (node_name, node_name))
-
-    # Deduplicate relationships by target (keep first occurrence)
-    seen_targets = set()
-    relationships = []
-    for row in cursor.fetchall():
-        target = row['connected_to']
-        if target not in seen_targets:
-            seen_targets.add(target)
-            relationships.append({
-                "target": target,
-                "distance": float(row['human_distance']),
-                "bridge": row['bridge_mechanism'],
-                "reasoning": row['internal_monologue'],
-                "direction": row['direction']
-            })
-
-    conn.close()
+            c.name as connected_to,
+            e.human_distance,
+            e.bridge_mechanism,
+            e.internal_monologue,
+            e.direction
+        FROM (
+            SELECT
+                CASE WHEN r.concept_a_id = :id THEN r.concept_b_id ELSE r.concept_a_id END as other_id,
+                CASE WHEN r.concept_a_id = :id THEN 'outgoing' ELSE 'incoming' END as direction,
+                r.human_distance,
+                r.bridge_mechanism,
+                r.internal_monologue,
+                MIN((r.concept_a_id != :id) * 4294967296 + r.id) as first_seen
+            FROM relationships r
+            WHERE r.concept_a_id = :id OR r.concept_b_id = :id
+            GROUP BY other_id
+        ) e
+        JOIN concepts c ON c.id = e.other_id
+        ORDER BY e.first_seen
+    """, {"id": concept['id']})
+
+    relationships = [
+        {
+            "target": row['connected_to'],
+            "distance": float(row['human_distance']),
+            "bridge": row['bridge_mechanism'],
+            "reasoning": row['internal_monologue'],
+            "direction": row['direction']
+        }
+        for row in cursor.fetchall()
+    ]
 
     coords = _projection_cache.get(node_name, [0, 0, 0]) if _projection_cache else [0, 0, 0]
 
@@ -289,13 +795,25 @@ async def search_concepts(q: str):
     conn = get_db_connection()
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT id, name
-        FROM concepts
-        WHERE name LIKE ?
-        ORDER BY name
-        LIMIT 10
-    """, (f"%{q}%",))
+    if _has_name_fts and len(q) >= 3:
+        # Trigram index: a quoted phrase matches q anywhere in the name
+        cursor.execute("""
+            SELECT c.id, c.name
+            FROM concepts_fts
+            JOIN concepts c ON c.id = concepts_fts.rowid
+            WHERE concepts_fts MATCH ?
+            ORDER BY c.name
+            LIMIT 10
+        """, ('"' + q.replace('"', '""') + '"',))
+    else:
+        # Trigrams need at least 3 characters
+        cursor.execute("""
+            SELECT id, name
+            FROM concepts
+            WHERE name LIKE ?
+            ORDER BY name
+            LIMIT 10
+        """, (f"%{q}%",))
 
     results = []
     for row in cursor.fetchall():
@@ -306,8 +824,6 @@ async def search_concepts(q: str):
             "position": coords
         })
 
-    conn.close()
-
     return {"results": results}
 
 
@@ -320,7 +836,8 @@ async def get_dual_galaxy_data():
     try:
         from dual_layout import generate_dual_layout
         result = generate_dual_layout()
-        return result
+        # Hand the payload straight to orjson (skips jsonable_encoder's walk)
+        return ORJSONResponse(content=result)
     except Exception as e:
         print(f"Error generating dual layout: {e}")
         import traceback
@@ -337,7 +854,8 @@ async def get_manifold_galaxy_data():
     try:
         from dual_layout_umap import generate_umap_layout
         result = generate_umap_layout()
-        return result
+        # Hand the payload straight to orjson (skips jsonable_encoder's walk)
+        return ORJSONResponse(content=result)
     except Exception as e:
         print(f"Error generating UMAP layout: {e}")
         import traceback
@@ -351,25 +869,21 @@ async def get_stats():
     conn = get_db_connection()
     cursor = conn.cursor()
 
-    cursor.execute("SELECT COUNT(*) as count FROM concepts")
-    total_concepts = cursor.fetchone()['count']
-
-    cursor.execute("SELECT COUNT(*) as count FROM relationships")
-    total_relationships = cursor.fetchone()['count']
-
-    cursor.execute("SELECT COUNT(*) as count FROM scans")
-    total_scans = cursor.fetchone()['count']
-
-    cursor.execute("SELECT AVG(human_distance) as avg FROM relationships")
-    avg_distance = cursor.fetchone()['avg']
-
-    conn.close()
+    cursor.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM concepts) as concepts,
+            COUNT(*) as relationships,
+            (SELECT COUNT(*) FROM scans) as scans,
+            AVG(human_distance) as avg
+        FROM relationships
+    """)
+    row = cursor.fetchone()
 
     return {
-        "concepts": total_concepts,
-        "relationships": total_relationships,
-        "scans": total_scans,
-        "avgDistance": float(avg_distance) if avg_distance else 0.0
+        "concepts": row['concepts'],
+        "relationships": row['relationships'],
+        "scans": row['scans'],
+        "avgDistance": float(row['avg']) if row['avg'] else 0.0
     }
 
 
@@ -3,32 +3,21 @@ Database Cleanup Script
 Fixes corrupted blob data and removes duplicates
 """
 import sqlite3
-import struct
 from pathlib import Path
 
+from db.relational import FIX_FLOAT_BLOBS_SQL, blob_to_float
+
 DB_PATH = Path(__file__).parent.parent / "data" / "lscp.db"
 
 def fix_corrupted_floats():
     """Fix blob data that should be floats"""
     conn = sqlite3.connect(DB_PATH)
+    conn.create_function("blob2f", 1, blob_to_float, deterministic=True)
     cursor = conn.cursor()
 
-    # Get all relationships
-    cursor.execute("SELECT id, human_distance FROM relationships")
-    rows = cursor.fetchall()
-
-    fixed_count = 0
-    for row_id, human_dist in rows:
-        if isinstance(human_dist, bytes):
-            try:
-                # Decode 4-byte IEEE 754 float from blob
-                float_value = struct.unpack('f', human_dist)[0]
-                # Update with proper float
-                cursor.execute("UPDATE relationships SET human_distance = ? WHERE id = ?",
-                             (float_value, row_id))
-                fixed_count += 1
-            except Exception as e:
-                print(f"Error fixing row {row_id}: {e}")
+    # Decode every 4-byte blob in one statement; other blobs are left as-is
+    cursor.execute(FIX_FLOAT_BLOBS_SQL)
+    fixed_count = cursor.rowcount
 
     conn.commit()
     print(f"Fixed {fixed_count} corrupted human_distance values")
@@ -45,26 +34,20 @@ def remove_duplicate_scans():
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
-    # Find duplicates
+    # Keep the earliest scan per concept in one statement
     cursor.execute("""
-        SELECT anchor_concept_id, MIN(id) as keep_id, COUNT(*) as count
-        FROM scans
-        GROUP BY anchor_concept_id
-        HAVING count > 1
+        DELETE FROM scans
+        WHERE id NOT IN (SELECT MIN(id) FROM scans GROUP BY anchor_concept_id)
     """)
+    total_removed = cursor.rowcount
 
-    duplicates = cursor.fetchall()
+    # Neighbor rows of the removed scans (scan_items exists once LSCPDatabase has opened the file)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scan_items'")
+    if cursor.fetchone():
+        cursor.execute("DELETE FROM scan_items WHERE scan_id NOT IN (SELECT id FROM scans)")
 
-    total_removed = 0
-    for concept_id, keep_id, count in duplicates:
-        # Delete all except the one we're keeping
-        cursor.execute("""
-            DELETE FROM scans
-            WHERE anchor_concept_id = ? AND id != ?
-        """, (concept_id, keep_id))
-        removed = count - 1
-        total_removed += removed
-        print(f"Removed {removed} duplicate scan(s) for concept_id {concept_id}")
+    # One scan per concept from now on (add_scan keeps the first)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_scans_anchor ON scans(anchor_concept_id)")
 
     conn.commit()
     print(f"Total duplicate scans removed: {total_removed}")
@@ -94,18 +77,19 @@ def verify_database():
     print(f"  Correct (real): {real_count}")
     print(f"  Corrupted (blob): {blob_count}")
 
-    # Check for duplicate scans
+    # Check for duplicate scans (concepts scanned more than once)
     cursor.execute("""
-        SELECT anchor_concept_id, COUNT(*) as count
+        SELECT
+            COUNT(*) as total,
+            (SELECT COUNT(*) FROM (
+                SELECT 1 FROM scans GROUP BY anchor_concept_id HAVING COUNT(*) > 1
+            )) as duplicates
         FROM scans
-        GROUP BY anchor_concept_id
-        HAVING count > 1
     """)
-    duplicates = cursor.fetchall()
+    total_scans, duplicates = cursor.fetchone()
     print(f"\nScans table:")
-    cursor.execute("SELECT COUNT(*) FROM scans")
-    print(f"  Total scans: {cursor.fetchone()[0]}")
-    print(f"  Duplicate scans: {len(duplicates)}")
+    print(f"  Total scans: {total_scans}")
+    print(f"  Duplicate scans: {duplicates}")
 
     conn.close()
 
@@ -3,6 +3,7 @@ LSCP Configuration
 Centralized settings for the Latent Space Cartography Protocol
 """
 import os
+from dataclasses import dataclass, field
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -11,6 +12,7 @@ PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 VECTOR_DB_PATH = DATA_DIR / "vectors"
 SQLITE_DB_PATH = DATA_DIR / "lscp.db"
+EXPLORER_CACHE_PATH = DATA_DIR / "explorer_cache.db"
 
 # Path to .env file (in project root)
 ENV_FILE = PROJECT_ROOT / ".env"
@@ -18,11 +20,12 @@ ENV_FILE = PROJECT_ROOT / ".env"
 # Load environment variables
 load_dotenv(ENV_FILE)
 
+@dataclass(frozen=True)
 class Settings:
-    """Application settings"""
+    """Application settings (read once from the environment at import)"""
 
     # DeepSeek API Configuration
-    DEEPSEEK_API_KEY: str = os.getenv("DEEPSEEK_API_KEY", "")
+    DEEPSEEK_API_KEY: str = field(default=os.getenv("DEEPSEEK_API_KEY", ""), repr=False)
     DEEPSEEK_BASE_URL: str = "https://api.deepseek.com"
     DEEPSEEK_MODEL: str = "deepseek-reasoner"
 
@@ -33,14 +36,23 @@ class Settings:
     CHROMA_COLLECTION_NAME: str = "lscp_embeddings"
     SQLITE_DB_PATH: str = str(SQLITE_DB_PATH)
     VECTOR_DB_PATH: str = str(VECTOR_DB_PATH)
+    # Reuse stored DeepSeek bridge responses across runs (keyed by model and pair)
+    EXPLORER_CACHE: bool = os.getenv("EXPLORER_CACHE", "true").lower() == "true"
+    EXPLORER_CACHE_PATH: str = str(EXPLORER_CACHE_PATH)
 
     # Crawler Configuration
     NEIGHBOR_COUNT: int = int(os.getenv("NEIGHBOR_COUNT", "5"))
     DELTA_THRESHOLD: float = float(os.getenv("DELTA_THRESHOLD", "0.3"))
+    # Keep the neighbor-search vocabulary matrix as int8 codes (approximate ranking)
+    QUANTIZE_EMBEDDINGS: bool = os.getenv("QUANTIZE_EMBEDDINGS", "false").lower() == "true"
 
     # API Configuration
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
     API_PORT: int = int(os.getenv("API_PORT", "8000"))
+    # Worker processes; each loads its own models and keeps its own scan jobs
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
+    # Seconds a finished scan job stays pollable before it is pruned
+    SCAN_JOB_TTL: int = int(os.getenv("SCAN_JOB_TTL", "3600"))
 
 settings = Settings()
 
@@ -2,16 +2,47 @@
 The Scanner: Core LSCP Crawling Logic
 Compares human and latent semantic spaces
 """
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple, Optional
 import numpy as np
-from scipy.spatial.distance import cosine
-from tqdm import tqdm
 
 from models.control import ControlModel
 from models.explorer import ExplorerModel
 from db.vector_store import VectorStore
 from db.relational import LSCPDatabase
 
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Rows of int8 codes upcast per GEMV block (~1.5 MB of float32 at 384 dims)
+QUANT_BLOCK_ROWS = 1024
+
+# Index candidates fetched per requested neighbor, leaving room for words
+# outside the scan vocabulary
+INDEX_OVERFETCH = 4
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _int8_gemv(codes, scales, q):
+        """
+        Similarities of int8-coded rows against a float32 query
+
+        Each code is widened in registers as it is multiplied, so no
+        float32 copy of the matrix is ever written.
+        """
+        n, d = codes.shape
+        sims = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            acc = np.float32(0.0)
+            for j in range(d):
+                acc += np.float32(codes[i, j]) * q[j]
+            sims[i] = acc / scales[i]
+        return sims
+
 
 class LSCPScanner:
     """Performs LSCP scans on concepts"""
@@ -23,7 +54,8 @@ class LSCPScanner:
         vector_store: VectorStore,
         database: LSCPDatabase,
         neighbor_count: int = 5,
-        delta_threshold: float = 0.3
+        delta_threshold: float = 0.3,
+        quantize: bool = False
     ):
         self.control = control_model
         self.explorer = explorer_model
@@ -31,6 +63,176 @@ class LSCPScanner:
         self.db = database
         self.neighbor_count = neighbor_count
         self.delta_threshold = delta_threshold
+        self.quantize = quantize
+
+        # (vocabulary, names, name -> row, L2-normalized matrix, row scales);
+        # with quantize the matrix holds int8 codes and scales their per-row
+        # factors, otherwise it is float32 and scales is None
+        self._vocab_cache = None
+        # Vocabulary known to be fully embedded, so later scans skip the lookup
+        self._embedded_vocab = None
+
+    def _vocabulary_matrix(
+        self,
+        vocabulary: List[str]
+    ) -> Tuple[List[str], Dict[str, int], np.ndarray, Optional[np.ndarray]]:
+        """
+        Get the vocabulary's stored embeddings as a normalized matrix
+
+        The matrix is rebuilt only when the vocabulary changes, so a batch
+        scan over one vocabulary fetches and normalizes it once. With
+        quantize, rows are kept as symmetric int8 codes (a quarter of the
+        float32 footprint) plus one float32 scale per row.
+        """
+        key = tuple(vocabulary)
+        if self._vocab_cache is None or self._vocab_cache[0] != key:
+            names, matrix = self.vector_store.get_embeddings(vocabulary, space="human")
+            scales = None
+            if names:
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix /= np.where(norms == 0, 1, norms)
+                if self.quantize:
+                    peak = np.abs(matrix).max(axis=1)
+                    scales = (127.0 / np.where(peak == 0, 1, peak)).astype(np.float32)
+                    matrix = np.rint(matrix * scales[:, None]).astype(np.int8)
+            rows = {name: i for i, name in enumerate(names)}
+            self._vocab_cache = (key, names, rows, matrix, scales)
+
+        return self._vocab_cache[1:]
+
+    @staticmethod
+    def _quantized_sims(codes: np.ndarray, scales: np.ndarray, q: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarities of a unit query against int8-coded unit rows
+
+        Uses the fused numba kernel when numba is installed. NumPy has no
+        int8 GEMV, so otherwise codes are upcast one block at a time into a
+        small reused float32 buffer that stays in cache for the sgemv.
+        """
+        if HAS_NUMBA:
+            return _int8_gemv(codes, scales, q.astype(np.float32, copy=False))
+
+        sims = np.empty(len(codes), dtype=np.float32)
+        buf = np.empty((min(QUANT_BLOCK_ROWS, len(codes)), codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(codes), QUANT_BLOCK_ROWS):
+            block = codes[start:start + QUANT_BLOCK_ROWS]
+            np.copyto(buf[:len(block)], block)
+            np.dot(buf[:len(block)], q, out=sims[start:start + len(block)])
+        sims /= scales
+        return sims
+
+    def _find_nearest(
+        self,
+        concept: str,
+        embedding: np.ndarray,
+        vocabulary: List[str],
+        k: int
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the k vocabulary words closest to a concept by cosine distance
+
+        One GEMV against the cached normalized vocabulary matrix, then a
+        partial sort of the top k.
+
+        Returns:
+            List of (neighbor, cosine_distance), nearest first
+        """
+        names, rows, matrix, scales = self._vocabulary_matrix(vocabulary)
+        if not names:
+            return []
+
+        q = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(q)
+        q = q / norm if norm > 0 else q
+        sims = matrix @ q if scales is None else self._quantized_sims(matrix, scales, q)
+
+        # Never return the concept as its own neighbor
+        if concept in rows:
+            sims[rows[concept]] = -np.inf
+
+        k = min(k, len(names) - (concept in rows))
+        if k <= 0:
+            return []
+
+        idx = np.argpartition(-sims, k - 1)[:k]
+        idx = idx[np.argsort(-sims[idx])]
+
+        return [(names[i], float(1.0 - sims[i])) for i in idx]
+
+    def _query_nearest(
+        self,
+        concept: str,
+        embedding: np.ndarray,
+        vocabulary: List[str],
+        k: int
+    ) -> Optional[List[Tuple[str, float]]]:
+        """
+        Find the k vocabulary words closest to a concept via the vector index
+
+        Over-fetches candidates from the store's HNSW index, keeps those in
+        the vocabulary, and re-ranks them by exact cosine distance. The
+        index ranks by L2, which agrees with cosine for the unit-norm
+        MiniLM embeddings.
+
+        Returns:
+            List of (neighbor, cosine_distance), nearest first, or None when
+            the index did not yield enough vocabulary words
+        """
+        vocab = set(vocabulary)
+        vocab.discard(concept)
+
+        names, matrix = self.vector_store.query_human(embedding, k=INDEX_OVERFETCH * k + 1)
+        keep = [i for i, name in enumerate(names) if name in vocab]
+        if len(keep) < min(k, len(vocab)):
+            return None
+        if not keep:
+            return []
+
+        matrix = matrix[keep]
+        norms = np.linalg.norm(matrix, axis=1)
+        q = np.asarray(embedding, dtype=np.float32).ravel()
+        sims = (matrix @ q) / np.maximum(norms * np.linalg.norm(q), 1e-12)
+        order = np.argsort(-sims, kind="stable")[:k]
+
+        return [(names[keep[i]], float(1.0 - sims[i])) for i in order]
+
+    def embed_vocabulary(self, vocabulary: List[str]):
+        """
+        Ensure vocabulary is embedded: one existence lookup, then one
+        batched encode for everything that is missing
+
+        Repeat calls with the same vocabulary return without a lookup.
+        """
+        key = tuple(vocabulary)
+        if key == self._embedded_vocab:
+            return
+
+        missing = self.vector_store.filter_missing(vocabulary)
+        if missing:
+            try:
+                embs = self.control.model.encode(
+                    missing,
+                    batch_size=64,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=True
+                )
+                self.vector_store.add_human_embedding_batch(missing, embs)
+                self.vector_store.add_latent_embedding_batch(missing, embs)
+            except Exception as e:
+                print(f"\n  Warning: Failed to embed {len(missing)} vocabulary words: {e}")
+                self._vocab_cache = None
+                return
+
+            # New words were stored, the cached vocabulary matrix is stale
+            self._vocab_cache = None
+
+        self._embedded_vocab = key
+
+    def prepare_vocabulary(self, vocabulary: List[str]):
+        """Embed the vocabulary and build its neighbor-search matrix ahead of scans"""
+        self.embed_vocabulary(vocabulary)
+        self._vocabulary_matrix(vocabulary)
 
     def scan_concept(self, concept: str, vocabulary: List[str]) -> Dict:
         """
@@ -58,19 +260,13 @@ class LSCPScanner:
         # Step 2: Find nearest neighbors in both spaces
         print("2. Finding nearest neighbors...")
 
-        # Ensure vocabulary is embedded
-        for word in tqdm(vocabulary, desc="Embedding vocabulary"):
-            try:
-                if not self.vector_store.concept_exists(word):
-                    emb = self.control.encode(word)
-                    self.vector_store.add_human_embedding(word, emb)
-                    self.vector_store.add_latent_embedding(word, emb)
-            except Exception as e:
-                print(f"\n  Warning: Failed to embed '{word}': {e}")
-                continue
+        self.embed_vocabulary(vocabulary)
 
-        # Find neighbors (using MiniLM - DeepSeek will provide reasoning, not embeddings)
-        neighbors = self.control.find_nearest(concept, vocabulary, self.neighbor_count)
+        # Find neighbors (using MiniLM - DeepSeek will provide reasoning, not embeddings):
+        # an index probe, or a full pass over the vocabulary if it falls short
+        neighbors = self._query_nearest(concept, embedding, vocabulary, self.neighbor_count)
+        if neighbors is None:
+            neighbors = self._find_nearest(concept, embedding, vocabulary, self.neighbor_count)
 
         print("\nNearest Neighbors (MiniLM):")
         for neighbor, dist in neighbors:
@@ -78,18 +274,19 @@ class LSCPScanner:
 
         # Step 3: Generate DeepSeek reasoning for interesting pairs
         print("\n3. Generating DeepSeek reasoning for connections...")
-        deltas = []
+        rows = []
 
-        # Process all neighbors and generate bridges for significant connections
-        for neighbor_concept, dist in neighbors:
-            # For now, treat distance as the delta (higher distance = more interesting)
-            # We'll generate bridges for pairs above threshold
-            deltas.append(dist)
+        # For now, treat distance as the delta (higher distance = more interesting)
+        # We'll generate bridges for pairs above threshold
+        deltas = np.fromiter((d for _, d in neighbors), dtype=np.float64, count=len(neighbors))
+        high_delta = deltas >= self.delta_threshold
 
+        # Process all neighbors and generate bridges for significant connections
+        for (neighbor_concept, dist), is_high in zip(neighbors, high_delta):
             # Generate bridge mechanism if distance is high enough (interesting connection)
             bridge = None
             reasoning = None
-            if dist >= self.delta_threshold:
+            if is_high:
                 print(f"  Analyzing: {concept} <-> {neighbor_concept} (distance={dist:.3f})")
                 bridge, reasoning = self.explorer.generate_bridge(concept, neighbor_concept)
                 print(f"  Bridge: {bridge}")
@@ -98,33 +295,35 @@ class LSCPScanner:
                     print(f"  {reasoning[:300]}..." if len(reasoning) > 300 else f"  {reasoning}")
                     print()
 
-            # Store relationship (using same distance for both since we only have one embedding space)
-            self.db.add_relationship(
-                concept_a=concept,
-                concept_b=neighbor_concept,
-                human_distance=float(dist),
-                latent_distance=float(dist),  # Same as human since we use one embedding space
-                delta=0.0,  # No delta in this architecture
-                bridge_mechanism=bridge,
-                internal_monologue=reasoning,
-                relationship_type="neighbor"
+            # Queue relationship (using same distance for both since we only have one embedding space)
+            rows.append((
+                concept,
+                neighbor_concept,
+                float(dist),
+                float(dist),  # Same as human since we use one embedding space
+                0.0,  # No delta in this architecture
+                bridge,
+                reasoning,
+                "neighbor"
+            ))
+
+        # Step 4: Store all relationships and log the scan in one transaction
+        avg_dist = deltas.mean()
+        with self.db.bulk_write():
+            self.db.add_relationships_bulk(rows)
+            self.db.add_scan(
+                anchor_concept=concept,
+                human_vector=[n[0] for n in neighbors],
+                latent_vector=[n[0] for n in neighbors],  # Same as human
+                avg_delta=avg_dist
             )
 
-        # Step 4: Log the scan
-        avg_dist = np.mean(deltas)
-        self.db.add_scan(
-            anchor_concept=concept,
-            human_vector=[n[0] for n in neighbors],
-            latent_vector=[n[0] for n in neighbors],  # Same as human
-            avg_delta=avg_dist
-        )
-
         result = {
             "concept": concept,
             "human_neighbors": neighbors,
             "latent_neighbors": neighbors,  # Same as human in this architecture
             "avg_delta": avg_dist,
-            "high_delta_count": sum(1 for d in deltas if d >= self.delta_threshold)
+            "high_delta_count": int(high_delta.sum())
         }
 
         print(f"\nScan complete: Avg Distance = {avg_dist:.3f}")
@@ -132,32 +331,58 @@ class LSCPScanner:
 
         return result
 
-    def batch_scan(self, concepts: List[str], vocabulary: List[str]) -> List[Dict]:
+    def batch_scan(self, concepts: List[str], vocabulary: List[str], workers: int = 1) -> List[Dict]:
         """
         Scan multiple concepts
         Vocabulary should include all concepts being scanned
+
+        Args:
+            concepts: Anchor concepts to scan
+            vocabulary: List of all possible neighbor concepts
+            workers: Concepts scanned at once; scans spend most of their time
+                     waiting on DeepSeek, so threads overlap those round trips
+
+        Returns:
+            Results of the successful scans, in concept order
         """
         results = []
         failed = []
 
-        for i, concept in enumerate(concepts, 1):
+        def scan(i: int, concept: str) -> Dict:
             print(f"\n[{i}/{len(concepts)}] Processing: {concept}")
-            try:
-                result = self.scan_concept(concept, vocabulary)
-                results.append(result)
-                print(f"✓ Successfully scanned {concept}")
-            except Exception as e:
-                error_msg = str(e)
-                print(f"✗ Error scanning {concept}: {error_msg}")
-
-                # Log but don't stop
-                failed.append({
-                    'concept': concept,
-                    'error': error_msg
-                })
-
-                # Continue to next concept
-                continue
+            return self.scan_concept(concept, vocabulary)
+
+        if workers > 1:
+            # Embed the vocabulary once up front rather than in every thread
+            self.embed_vocabulary(vocabulary)
+            executor = ThreadPoolExecutor(max_workers=workers)
+            futures = [executor.submit(scan, i, c) for i, c in enumerate(concepts, 1)]
+            outcomes = (future.result for future in futures)
+        else:
+            executor = None
+            outcomes = (lambda i=i, c=c: scan(i, c) for i, c in enumerate(concepts, 1))
+
+        try:
+            for concept, outcome in zip(concepts, outcomes):
+                try:
+                    result = outcome()
+                    results.append(result)
+                    print(f"✓ Successfully scanned {concept}")
+                except Exception as e:
+                    error_msg = str(e)
+                    print(f"✗ Error scanning {concept}: {error_msg}")
+
+                    # Log but don't stop
+                    failed.append({
+                        'concept': concept,
+                        'error': error_msg
+                    })
+
+                    # Continue to next concept
+                    continue
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
 
         # Print summary
         print(f"\n{'='*60}")
@@ -0,0 +1,87 @@
+"""
+On-disk cache of explorer (DeepSeek) bridge responses
+Re-runs and resumed batches reuse bridges instead of calling the API again
+"""
+import sqlite3
+import threading
+from functools import wraps
+from typing import Callable, Optional, Tuple
+
+CREATE_BRIDGE_CACHE_SQL = """
+    CREATE TABLE IF NOT EXISTS bridges (
+        model TEXT NOT NULL,
+        concept_a TEXT NOT NULL,
+        concept_b TEXT NOT NULL,
+        bridge TEXT NOT NULL,
+        reasoning TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (model, concept_a, concept_b)
+    ) WITHOUT ROWID
+"""
+
+GET_BRIDGE_SQL = """
+    SELECT bridge, reasoning FROM bridges
+    WHERE model = ? AND concept_a = ? AND concept_b = ?
+"""
+
+PUT_BRIDGE_SQL = """
+    INSERT OR REPLACE INTO bridges (model, concept_a, concept_b, bridge, reasoning)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+class ExplorerCache:
+    """Bridge responses keyed by (model, concept_a, concept_b)"""
+
+    def __init__(self, db_path: str):
+        # One connection shared by scan workers; each statement is tiny
+        # next to the API round trip it replaces
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(CREATE_BRIDGE_CACHE_SQL)
+        self.conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, model: str, concept_a: str, concept_b: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Return the cached (bridge, reasoning), or None on a miss"""
+        with self._lock:
+            row = self.conn.execute(GET_BRIDGE_SQL, (model, concept_a, concept_b)).fetchone()
+        return tuple(row) if row else None
+
+    def put(self, model: str, concept_a: str, concept_b: str, bridge: str, reasoning: Optional[str]):
+        """Store one bridge response"""
+        with self._lock, self.conn:
+            self.conn.execute(PUT_BRIDGE_SQL, (model, concept_a, concept_b, bridge, reasoning))
+
+    def close(self):
+        """Close the cache connection"""
+        with self._lock:
+            self.conn.close()
+
+
+def cache_bridges(generate_bridge: Callable, cache: ExplorerCache, model: str) -> Callable:
+    """
+    Wrap an explorer's generate_bridge so responses are read from and
+    written to the cache
+
+    Args:
+        generate_bridge: Bound generate_bridge(concept_a, concept_b) -> (bridge, reasoning)
+        cache: Cache to consult before calling the API
+        model: Model name stored with every entry, so switching models misses
+
+    Returns:
+        Function with the same signature; failed calls (no bridge) are not cached
+    """
+    @wraps(generate_bridge)
+    def cached(concept_a: str, concept_b: str):
+        hit = cache.get(model, concept_a, concept_b)
+        if hit is not None:
+            return hit
+
+        bridge, reasoning = generate_bridge(concept_a, concept_b)
+        if bridge:
+            cache.put(model, concept_a, concept_b, bridge, reasoning)
+        return bridge, reasoning
+
+    return cached
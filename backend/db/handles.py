@@ -0,0 +1,44 @@
+"""
+Process-wide database and vector store handles
+Opened on first use and shared by every caller in the process
+"""
+import atexit
+from functools import lru_cache
+
+from config import settings
+from db.explorer_cache import ExplorerCache
+from db.relational import LSCPDatabase
+from db.vector_store import VectorStore
+
+
+@lru_cache(maxsize=1)
+def get_db() -> LSCPDatabase:
+    """Return the shared SQLite database (closed at interpreter exit)"""
+    db = LSCPDatabase(settings.SQLITE_DB_PATH)
+    atexit.register(db.close)
+    return db
+
+
+@lru_cache(maxsize=1)
+def get_explorer_cache() -> ExplorerCache:
+    """Return the shared explorer response cache (closed at interpreter exit)"""
+    cache = ExplorerCache(settings.EXPLORER_CACHE_PATH)
+    atexit.register(cache.close)
+    return cache
+
+
+@lru_cache(maxsize=None)
+def get_vector_store(suffix: str = "", shared_spaces: bool = False) -> VectorStore:
+    """
+    Return the shared vector store for a collection
+
+    Args:
+        suffix: Appended to CHROMA_COLLECTION_NAME (e.g. "_qwen")
+        shared_spaces: Serve human and latent from one collection
+                       (see VectorStore)
+    """
+    return VectorStore(
+        settings.VECTOR_DB_PATH,
+        settings.CHROMA_COLLECTION_NAME + suffix,
+        shared_spaces=shared_spaces
+    )
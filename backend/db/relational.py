@@ -3,25 +3,180 @@ SQLite Database for LSCP
 Stores concepts, relationships, delta scores, and bridge mechanisms
 """
 import sqlite3
+import struct
+import threading
+from contextlib import contextmanager
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 import json
+import numpy as np
+
+# Commits between PRAGMA optimize runs (planner stats refresh)
+OPTIMIZE_EVERY = 1000
+
+# Prepared statements kept per connection (sqlite3 reuses them by SQL text)
+STATEMENT_CACHE_SIZE = 256
+
+# Milliseconds a connection waits on another thread's write lock
+BUSY_TIMEOUT_MS = 5000
+
+# PRAGMA user_version: 1 once human_distance blobs are REAL,
+# 2 once scan vectors are copied into scan_items
+SCHEMA_VERSION = 2
+
+# Hot-path statements, shared so every call hits the statement cache
+GET_CONCEPT_ID_SQL = "SELECT id FROM concepts WHERE name = ?"
+
+INSERT_CONCEPT_SQL = """
+    INSERT INTO concepts (name) VALUES (?)
+    ON CONFLICT(name) DO NOTHING
+    RETURNING id
+"""
+
+INSERT_MISSING_CONCEPT_SQL = """
+    INSERT INTO concepts (name)
+    SELECT ? WHERE NOT EXISTS (SELECT 1 FROM concepts WHERE name = ?)
+"""
+
+# Existing pairs are updated in place, keeping their id
+_RELATIONSHIP_UPSERT = """
+    ON CONFLICT(concept_a_id, concept_b_id) DO UPDATE SET
+        human_distance = excluded.human_distance,
+        latent_distance = excluded.latent_distance,
+        delta = excluded.delta,
+        bridge_mechanism = excluded.bridge_mechanism,
+        internal_monologue = excluded.internal_monologue,
+        relationship_type = excluded.relationship_type
+"""
+
+UPSERT_RELATIONSHIP_SQL = """
+    INSERT INTO relationships
+    (concept_a_id, concept_b_id, human_distance, latent_distance, delta, bridge_mechanism, internal_monologue, relationship_type)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+""" + _RELATIONSHIP_UPSERT + "RETURNING id"
+
+UPSERT_RELATIONSHIP_BY_NAME_SQL = """
+    INSERT INTO relationships
+    (concept_a_id, concept_b_id, human_distance, latent_distance, delta, bridge_mechanism, internal_monologue, relationship_type)
+    VALUES ((SELECT id FROM concepts WHERE name = ?), (SELECT id FROM concepts WHERE name = ?), ?, ?, ?, ?, ?, ?)
+""" + _RELATIONSHIP_UPSERT
+
+INSERT_SCAN_SQL = """
+    INSERT OR IGNORE INTO scans (anchor_concept_id, human_vector, latent_vector, avg_delta)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Older crawls stored some human distances as raw 4-byte float blobs;
+# blob2f is registered per connection (CAST(... AS REAL) would parse text)
+FIX_FLOAT_BLOBS_SQL = """
+    UPDATE relationships
+    SET human_distance = blob2f(human_distance)
+    WHERE typeof(human_distance) = 'blob' AND length(human_distance) = 4
+"""
+
+INSERT_SCAN_ITEM_SQL = """
+    INSERT INTO scan_items (scan_id, kind, position, concept_id)
+    VALUES (?, ?, ?, (SELECT id FROM concepts WHERE name = ?))
+"""
+
+# Backfill of scan_items from the JSON vector columns
+ADD_SCAN_VECTOR_CONCEPTS_SQL = """
+    INSERT OR IGNORE INTO concepts (name)
+    SELECT j.value FROM scans s, json_each(s.{column}) j
+"""
+
+COPY_SCAN_VECTOR_SQL = """
+    INSERT OR IGNORE INTO scan_items (scan_id, kind, position, concept_id)
+    SELECT s.id, '{kind}', j.key, c.id
+    FROM scans s, json_each(s.{column}) j
+    JOIN concepts c ON c.name = j.value
+"""
+
+# Server scan jobs live here so every API worker process sees them
+UPDATE_SCAN_JOB_SQL = """
+    UPDATE scan_jobs
+    SET status = ?, result = ?, error = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+"""
+
+PRUNE_SCAN_JOBS_SQL = """
+    DELETE FROM scan_jobs
+    WHERE status IN ('complete', 'failed') AND updated_at < datetime('now', ?)
+"""
+
+UPDATE_COORDINATES_SQL = """
+    UPDATE concepts
+    SET coordinates_x = ?, coordinates_y = ?, coordinates_z = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE name = ?
+"""
+
+def blob_to_float(blob: bytes) -> float:
+    """Decode a 4-byte IEEE 754 float stored as a blob"""
+    return struct.unpack('f', blob)[0]
+
+
+class _ThreadState(threading.local):
+    """Per-thread connection and transaction flag"""
+    conn = None
+    in_txn = False
+
 
 class LSCPDatabase:
-    """Manages the relational database for LSCP"""
+    """
+    Manages the relational database for LSCP
+
+    Each thread gets its own connection, so readers are not serialized behind
+    one shared handle and WAL lets them run alongside a writer.
+    """
 
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.conn = None
+        self._local = _ThreadState()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._writes = 0
         self._initialize_db()
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """This thread's connection"""
+        return self._conn()
+
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        conn = self._local.conn
+        if conn is not None:
+            return conn
+
+        # An in-memory database only exists on the connection that made it
+        if str(self.db_path) == ":memory:" and self._connections:
+            conn = self._connections[0]
+        else:
+            conn = sqlite3.connect(
+                self.db_path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+            )
+            conn.row_factory = sqlite3.Row
+
+            # WAL lets readers run during writes and needs one fsync per commit
+            if str(self.db_path) != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-65536")
+            conn.execute("PRAGMA mmap_size=268435456")
+
+            with self._connections_lock:
+                self._connections.append(conn)
+
+        self._local.conn = conn
+        return conn
+
     def _initialize_db(self):
         """Create tables if they don't exist"""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-
-        cursor = self.conn.cursor()
+        conn = self._conn()
+        cursor = conn.cursor()
 
         # Concepts table
         cursor.execute("""
@@ -75,30 +230,134 @@ class LSCPDatabase:
             )
         """)
 
+        # Scan neighbor lists, one row per neighbor ('human' or 'latent');
+        # the JSON vector columns above are kept for one more release
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scan_items (
+                scan_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                concept_id INTEGER NOT NULL,
+                PRIMARY KEY (scan_id, kind, position),
+                FOREIGN KEY (scan_id) REFERENCES scans(id),
+                FOREIGN KEY (concept_id) REFERENCES concepts(id)
+            ) WITHOUT ROWID
+        """)
+
+        # Background scans queued through the API (finished ones are pruned)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scan_jobs (
+                id TEXT PRIMARY KEY,
+                concept TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) WITHOUT ROWID
+        """)
+
         # Create indexes
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_concepts_name ON concepts(name)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_relationships_delta ON relationships(delta)")
+        # Top-delta queries are answered from this index alone, already in
+        # ORDER BY delta DESC order; it supersedes the old delta-only index
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_rel_delta_covering ON relationships(
+                delta DESC, concept_a_id, concept_b_id, human_distance, latent_distance, bridge_mechanism
+            )
+        """)
+        cursor.execute("DROP INDEX IF EXISTS idx_relationships_delta")
+        # A concept's relationships, already in descending delta order
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rel_a_delta ON relationships(concept_a_id, delta DESC)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_scans_timestamp ON scans(scan_timestamp)")
+        # Which scans included a concept
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scan_items_concept ON scan_items(concept_id, kind)")
+        # Finished jobs by age, for pruning
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scan_jobs_status ON scan_jobs(status, updated_at)")
+
+        # One scan per concept; older databases may need cleanup_db.py first
+        try:
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_scans_anchor ON scans(anchor_concept_id)")
+        except sqlite3.IntegrityError:
+            print("  ⚠ Duplicate scans found; run cleanup_db.py to enforce one scan per concept")
+
+        # One-shot migrations, by schema version
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Blob-encoded distances back to REAL
+            conn.create_function("blob2f", 1, blob_to_float, deterministic=True)
+            cursor.execute(FIX_FLOAT_BLOBS_SQL)
+            if cursor.rowcount > 0:
+                print(f"  ✓ Decoded {cursor.rowcount} blob human_distance values")
+        if version < 2:
+            # JSON scan vectors into scan_items
+            for column, kind in (("human_vector", "human"), ("latent_vector", "latent")):
+                cursor.execute(ADD_SCAN_VECTOR_CONCEPTS_SQL.format(column=column))
+                cursor.execute(COPY_SCAN_VECTOR_SQL.format(column=column, kind=kind))
+        if version < SCHEMA_VERSION:
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        # Planner statistics, gathered once (PRAGMA optimize keeps them fresh)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            cursor.execute("ANALYZE")
+
+        conn.commit()
+
+    @contextmanager
+    def bulk_write(self):
+        """
+        Group many writes into one transaction
 
-        self.conn.commit()
+        Inside the block the add_*/update_* methods skip their own commits;
+        everything is committed on exit, or rolled back if the block raises.
+        Nested blocks join the outer transaction.
+        """
+        state = self._local
+        if state.in_txn:
+            yield self
+            return
+
+        conn = self._conn()
+        if conn.in_transaction:
+            conn.commit()
+        # Take the write lock up front: a deferred transaction that reads
+        # first can fail to upgrade (SQLITE_BUSY) when another thread writes
+        conn.execute("BEGIN IMMEDIATE")
+        state.in_txn = True
+        try:
+            yield self
+        except BaseException:
+            state.in_txn = False
+            conn.rollback()
+            raise
+        state.in_txn = False
+        self._commit(0)
+
+    def _commit(self, writes: int = 1):
+        """Commit, refreshing planner stats every OPTIMIZE_EVERY writes"""
+        self._writes += writes
+        if self._local.in_txn:
+            return
+        conn = self._conn()
+        conn.commit()
+        if self._writes >= OPTIMIZE_EVERY:
+            self._writes = 0
+            conn.execute("PRAGMA optimize")
 
     def add_concept(self, name: str) -> int:
         """Add a concept and return its ID"""
-        cursor = self.conn.cursor()
-        try:
-            cursor.execute("INSERT INTO concepts (name) VALUES (?)", (name,))
-            self.conn.commit()
-            return cursor.lastrowid
-        except sqlite3.IntegrityError:
-            # Concept already exists, return existing ID
-            cursor.execute("SELECT id FROM concepts WHERE name = ?", (name,))
-            return cursor.fetchone()[0]
+        concept_id = self.get_concept_id(name)
+        if concept_id is not None:
+            return concept_id
+
+        # ON CONFLICT covers a concurrent insert from another connection
+        row = self._conn().execute(INSERT_CONCEPT_SQL, (name,)).fetchone()
+        self._commit()
+        return row[0] if row else self.get_concept_id(name)
 
     def get_concept_id(self, name: str) -> Optional[int]:
         """Get concept ID by name"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id FROM concepts WHERE name = ?", (name,))
-        result = cursor.fetchone()
+        result = self._conn().execute(GET_CONCEPT_ID_SQL, (name,)).fetchone()
         return result[0] if result else None
 
     def add_relationship(
@@ -116,24 +375,42 @@ class LSCPDatabase:
         concept_a_id = self.add_concept(concept_a)
         concept_b_id = self.add_concept(concept_b)
 
-        cursor = self.conn.cursor()
+        # Insert, or update the existing pair in place
+        relationship_id = self._conn().execute(UPSERT_RELATIONSHIP_SQL, (
+            concept_a_id, concept_b_id, human_distance, latent_distance, delta,
+            bridge_mechanism, internal_monologue, relationship_type
+        )).fetchone()[0]
+        self._commit()
+        return relationship_id
+
+    def add_relationships_bulk(
+        self,
+        rows: List[Tuple[str, str, float, float, float, Optional[str], Optional[str], str]]
+    ) -> int:
+        """
+        Add (or update) many relationships in a single transaction
+
+        Args:
+            rows: (concept_a, concept_b, human_distance, latent_distance, delta,
+                   bridge_mechanism, internal_monologue, relationship_type) tuples
+
+        Returns:
+            Number of rows written
+        """
+        if not rows:
+            return 0
+
+        conn = self._conn()
+        names = {(name, name) for row in rows for name in row[:2]}
         try:
-            cursor.execute("""
-                INSERT INTO relationships
-                (concept_a_id, concept_b_id, human_distance, latent_distance, delta, bridge_mechanism, internal_monologue, relationship_type)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (concept_a_id, concept_b_id, human_distance, latent_distance, delta, bridge_mechanism, internal_monologue, relationship_type))
-            self.conn.commit()
-            return cursor.lastrowid
-        except sqlite3.IntegrityError:
-            # Relationship exists, update it
-            cursor.execute("""
-                UPDATE relationships
-                SET human_distance = ?, latent_distance = ?, delta = ?, bridge_mechanism = ?, internal_monologue = ?, relationship_type = ?
-                WHERE concept_a_id = ? AND concept_b_id = ?
-            """, (human_distance, latent_distance, delta, bridge_mechanism, internal_monologue, relationship_type, concept_a_id, concept_b_id))
-            self.conn.commit()
-            return cursor.lastrowid
+            conn.executemany(INSERT_MISSING_CONCEPT_SQL, names)
+            conn.executemany(UPSERT_RELATIONSHIP_BY_NAME_SQL, rows)
+        except Exception:
+            if not self._local.in_txn:
+                conn.rollback()
+            raise
+        self._commit(len(rows))
+        return len(rows)
 
     def add_scan(
         self,
@@ -142,22 +419,63 @@ class LSCPDatabase:
         latent_vector: List[str],
         avg_delta: float
     ) -> int:
-        """Record a complete scan operation"""
-        concept_id = self.add_concept(anchor_concept)
+        """
+        Record a complete scan operation (a concept's first scan is kept)
+
+        The neighbor lists go into scan_items, one row per neighbor, in the
+        same transaction as the scan row.
+        """
+        with self.bulk_write():
+            concept_id = self.add_concept(anchor_concept)
+
+            conn = self._conn()
+            cursor = conn.execute(
+                INSERT_SCAN_SQL, (concept_id, json.dumps(human_vector), json.dumps(latent_vector), avg_delta)
+            )
+            if cursor.rowcount == 0:
+                cursor.execute("SELECT MIN(id) FROM scans WHERE anchor_concept_id = ?", (concept_id,))
+                return cursor.fetchone()[0]
+            scan_id = cursor.lastrowid
+
+            names = {(name, name) for name in human_vector + latent_vector}
+            conn.executemany(INSERT_MISSING_CONCEPT_SQL, names)
+            conn.executemany(INSERT_SCAN_ITEM_SQL, [
+                (scan_id, kind, position, name)
+                for kind, vector in (("human", human_vector), ("latent", latent_vector))
+                for position, name in enumerate(vector)
+            ])
+            self._commit()
+        return scan_id
 
-        cursor = self.conn.cursor()
+    def get_scans_including(self, concept_name: str, kind: Optional[str] = None) -> List[Dict]:
+        """
+        Scans whose neighbor lists include a concept
+
+        Args:
+            concept_name: Neighbor to look for
+            kind: 'human' or 'latent' to search one list only
+
+        Returns:
+            {'anchor', 'kind', 'position'} dicts, in scan order
+        """
+        concept_id = self.get_concept_id(concept_name)
+        if concept_id is None:
+            return []
+
+        cursor = self._conn().cursor()
         cursor.execute("""
-            INSERT INTO scans (anchor_concept_id, human_vector, latent_vector, avg_delta)
-            VALUES (?, ?, ?, ?)
-        """, (concept_id, json.dumps(human_vector), json.dumps(latent_vector), avg_delta))
-        self.conn.commit()
-        return cursor.lastrowid
+            SELECT c.name as anchor, i.kind, i.position
+            FROM scan_items i
+            JOIN scans s ON s.id = i.scan_id
+            JOIN concepts c ON c.id = s.anchor_concept_id
+            WHERE i.concept_id = ? AND (? IS NULL OR i.kind = ?)
+            ORDER BY i.scan_id, i.kind
+        """, (concept_id, kind, kind))
+        return [dict(row) for row in cursor.fetchall()]
 
     def get_high_delta_relationships(self, threshold: float = 0.3, limit: int = 100) -> List[Dict]:
         """Get relationships with high delta scores"""
-        import struct
-
-        cursor = self.conn.cursor()
+        cursor = self._conn().cursor()
         cursor.execute("""
             SELECT
                 c1.name as concept_a,
@@ -173,29 +491,30 @@ class LSCPDatabase:
             ORDER BY r.delta DESC
             LIMIT ?
         """, (threshold, limit))
+        rows = cursor.fetchall()
 
-        results = []
-        for row in cursor.fetchall():
-            # Handle both blob (corrupted) and real (normal) formats
-            human_dist = row['human_distance']
-            if isinstance(human_dist, bytes):
-                # Decode 4-byte IEEE 754 float from blob
-                human_dist = struct.unpack('f', human_dist)[0]
-            else:
-                human_dist = float(human_dist)
-
-            latent_dist = float(row['latent_distance'])
-            delta = float(row['delta'])
+        # Distances are REAL after the user_version migration; any blob
+        # (corrupted) left over is decoded with the rest in one call
+        human_dists = [row['human_distance'] for row in rows]
+        blob_rows = [i for i, d in enumerate(human_dists) if isinstance(d, bytes)]
+        if blob_rows:
+            blobs = [human_dists[i] for i in blob_rows]
+            if any(len(b) != 4 for b in blobs):
+                raise ValueError("human_distance blob is not a 4-byte float")
+            for i, d in zip(blob_rows, np.frombuffer(b''.join(blobs), dtype=np.float32).tolist()):
+                human_dists[i] = d
 
-            results.append({
+        return [
+            {
                 'concept_a': row['concept_a'],
                 'concept_b': row['concept_b'],
-                'human_distance': human_dist,
-                'latent_distance': latent_dist,
-                'delta': delta,
+                'human_distance': float(human_dist),
+                'latent_distance': float(row['latent_distance']),
+                'delta': float(row['delta']),
                 'bridge_mechanism': row['bridge_mechanism']
-            })
-        return results
+            }
+            for row, human_dist in zip(rows, human_dists)
+        ]
 
     def get_concept_neighbors(self, concept_name: str) -> Dict[str, List[Dict]]:
         """Get all neighbors of a concept, split by human and latent"""
@@ -203,7 +522,7 @@ class LSCPDatabase:
         if not concept_id:
             return {"human": [], "latent": []}
 
-        cursor = self.conn.cursor()
+        cursor = self._conn().cursor()
 
         # Get all relationships for this concept
         cursor.execute("""
@@ -225,17 +544,69 @@ class LSCPDatabase:
             "relationships": relationships
         }
 
+    def get_stats(self, threshold: float = 0.3) -> Dict:
+        """Get database statistics in a single query"""
+        cursor = self._conn().cursor()
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM concepts) as concepts,
+                COUNT(*) as relationships,
+                (SELECT COUNT(*) FROM scans) as scans,
+                AVG(delta) as avg_delta,
+                COUNT(CASE WHEN delta >= ? THEN 1 END) as high_delta_pairs
+            FROM relationships
+        """, (threshold,))
+        row = cursor.fetchone()
+
+        return {
+            "concepts": row['concepts'],
+            "relationships": row['relationships'],
+            "scans": row['scans'],
+            "avg_delta": row['avg_delta'] or 0,
+            "high_delta_pairs": row['high_delta_pairs']
+        }
+
+    def add_scan_job(self, job_id: str, concept: str):
+        """Record a queued scan job"""
+        self._conn().execute(
+            "INSERT INTO scan_jobs (id, concept, status) VALUES (?, ?, 'queued')", (job_id, concept)
+        )
+        self._commit()
+
+    def update_scan_job(self, job_id: str, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        """Set a scan job's status and, once finished, its result or error"""
+        payload = json.dumps(result, default=float) if result is not None else None
+        self._conn().execute(UPDATE_SCAN_JOB_SQL, (status, payload, error, job_id))
+        self._commit()
+
+    def get_scan_job(self, job_id: str) -> Optional[Dict]:
+        """Get a scan job as {'status', 'concept', 'result', 'error'}, or None if unknown"""
+        row = self._conn().execute(
+            "SELECT status, concept, result, error FROM scan_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def prune_scan_jobs(self, max_age_seconds: int) -> int:
+        """Delete finished scan jobs older than max_age_seconds; returns the count removed"""
+        cursor = self._conn().execute(PRUNE_SCAN_JOBS_SQL, (f"-{int(max_age_seconds)} seconds",))
+        self._commit()
+        return cursor.rowcount
+
     def update_coordinates(self, concept_name: str, x: float, y: float, z: float):
         """Update 3D coordinates for a concept (for UMAP projection)"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE concepts
-            SET coordinates_x = ?, coordinates_y = ?, coordinates_z = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE name = ?
-        """, (x, y, z, concept_name))
-        self.conn.commit()
+        self._conn().execute(UPDATE_COORDINATES_SQL, (x, y, z, concept_name))
+        self._commit()
 
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        """Close every thread's database connection"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for i, conn in enumerate(connections):
+            if i == 0:
+                conn.execute("PRAGMA optimize")
+            conn.close()
+        self._local.conn = None
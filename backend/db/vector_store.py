@@ -2,25 +2,158 @@
 ChromaDB Vector Store for LSCP
 Stores embeddings and performs nearest neighbor searches
 """
+import json
+import os
+import threading
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from typing import List, Tuple, Dict
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple, Dict, Optional
 import numpy as np
 
+# Stored embeddings remembered per space for neighbor queries
+EMBEDDING_CACHE_SIZE = 4096
+
+# Rows first reserved in an on-disk embedding matrix (doubled as it fills)
+MATRIX_INITIAL_ROWS = 1024
+
+
+class _EmbeddingMatrix:
+    """
+    On-disk float32 copy of one collection's embeddings
+
+    Rows live in a .npy file opened as a memmap and grown geometrically;
+    concept names are appended to a JSON-lines file in row order. Readers
+    get a contiguous matrix backed by the page cache instead of Chroma's
+    lists of Python floats.
+    """
+
+    def __init__(self, path_prefix: Path):
+        self.matrix_path = Path(f"{path_prefix}.npy")
+        self.names_path = Path(f"{path_prefix}.names.jsonl")
+        self._lock = threading.Lock()
+        self.names: List[str] = []
+        self.matrix = None
+
+        if self.names_path.exists():
+            with open(self.names_path) as f:
+                self.names = [json.loads(line) for line in f]
+        if self.matrix_path.exists():
+            self.matrix = np.lib.format.open_memmap(self.matrix_path, mode='r+')
+        if self.names and (self.matrix is None or len(self.names) > len(self.matrix)):
+            # Interrupted write; rebuilt from Chroma on the next read
+            self._reset()
+        self.rows = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _reset(self):
+        self.names, self.rows, self.matrix = [], {}, None
+        for path in (self.matrix_path, self.names_path):
+            if path.exists():
+                path.unlink()
+
+    def _reserve(self, rows: int, dim: int):
+        """Make room for at least `rows` rows, doubling the file when it grows"""
+        capacity = 0 if self.matrix is None else len(self.matrix)
+        if rows <= capacity:
+            return
+
+        capacity = max(MATRIX_INITIAL_ROWS, 2 * capacity, rows)
+        tmp_path = self.matrix_path.with_name(self.matrix_path.name + ".tmp")
+        grown = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=(capacity, dim))
+        if self.matrix is not None:
+            grown[:len(self.names)] = self.matrix[:len(self.names)]
+        grown.flush()
+        del grown
+        os.replace(tmp_path, self.matrix_path)
+        self.matrix = np.lib.format.open_memmap(self.matrix_path, mode='r+')
+
+    def write(self, concepts: List[str], embeddings: np.ndarray):
+        """Overwrite existing rows and append new ones"""
+        with self._lock:
+            if self.matrix is not None and self.matrix.shape[1] != embeddings.shape[1]:
+                self._reset()
+
+            new = [c for c in dict.fromkeys(concepts) if c not in self.rows]
+            self._reserve(len(self.names) + len(new), embeddings.shape[1])
+            for concept in new:
+                self.rows[concept] = len(self.names)
+                self.names.append(concept)
+
+            # Vectors are flushed before their names, so a crash never
+            # leaves a name pointing at an unwritten row
+            self.matrix[[self.rows[c] for c in concepts]] = embeddings
+            self.matrix.flush()
+            with open(self.names_path, 'a') as f:
+                f.writelines(json.dumps(c) + "\n" for c in new)
+
+    def rebuild(self, concepts: List[str], embeddings: np.ndarray):
+        """Replace the whole matrix"""
+        with self._lock:
+            self._reset()
+        if concepts:
+            self.write(concepts, embeddings)
+
+    def read(self) -> Tuple[List[str], np.ndarray]:
+        """(names, read-only memmap view of their rows)"""
+        with self._lock:
+            if not self.names:
+                return [], np.array([])
+            view = self.matrix[:len(self.names)]
+            view.flags.writeable = False
+            return list(self.names), view
+
+
 class VectorStore:
     """Manages vector embeddings and similarity searches"""
 
-    def __init__(self, persist_directory: str, collection_name: str = "lscp_embeddings"):
+    def __init__(self, persist_directory: str, collection_name: str = "lscp_embeddings",
+                 shared_spaces: bool = False):
+        """
+        Args:
+            persist_directory: Directory ChromaDB and the embedding matrices live in
+            collection_name: Prefix for the collection names
+            shared_spaces: Serve human and latent from one collection, for
+                models whose two views are the same vectors (each row is
+                stored and indexed once)
+        """
         self.client = chromadb.Client(ChromaSettings(
             chroma_db_impl="duckdb+parquet",
             persist_directory=persist_directory,
             anonymized_telemetry=False
         ))
         self.collection_name = collection_name
+        self.shared_spaces = shared_spaces
         self._initialize_collections()
 
+        # Contiguous float32 copies of both spaces for get_all_embeddings
+        matrix_dir = Path(persist_directory) / "matrices"
+        matrix_dir.mkdir(parents=True, exist_ok=True)
+        if shared_spaces:
+            shared = _EmbeddingMatrix(matrix_dir / f"{collection_name}_shared")
+            self._matrices = {"human": shared, "latent": shared}
+        else:
+            self._matrices = {
+                space: _EmbeddingMatrix(matrix_dir / f"{collection_name}_{space}")
+                for space in ("human", "latent")
+            }
+
+        # Per-instance so cache_clear() on writes only affects this store
+        self._stored_embedding = lru_cache(maxsize=EMBEDDING_CACHE_SIZE)(self._fetch_embedding)
+
     def _initialize_collections(self):
         """Create or load collections for human and latent embeddings"""
+        if self.shared_spaces:
+            # One collection aliased as both spaces
+            self.human_collection = self.latent_collection = self.client.get_or_create_collection(
+                name=f"{self.collection_name}_shared",
+                metadata={"description": "Embeddings serving both human and latent views"}
+            )
+            return
+
         # Human embeddings (MiniLM)
         self.human_collection = self.client.get_or_create_collection(
             name=f"{self.collection_name}_human",
@@ -35,47 +168,75 @@ class VectorStore:
 
     def add_human_embedding(self, concept: str, embedding: np.ndarray):
         """Store a human (MiniLM) embedding"""
-        try:
-            self.human_collection.add(
-                embeddings=[embedding.tolist()],
-                documents=[concept],
-                ids=[concept]
-            )
-        except Exception as e:
-            # If ID already exists, update instead
-            if "already exist" in str(e):
-                self.human_collection.update(
-                    embeddings=[embedding.tolist()],
-                    documents=[concept],
-                    ids=[concept]
-                )
-            else:
-                raise
+        self.add_human_embedding_batch([concept], np.asarray(embedding).reshape(1, -1))
 
     def add_latent_embedding(self, concept: str, embedding: np.ndarray):
         """Store a latent (llama.cpp) embedding"""
-        try:
-            self.latent_collection.add(
-                embeddings=[embedding.tolist()],
-                documents=[concept],
-                ids=[concept]
-            )
-        except Exception as e:
-            # If ID already exists, update instead
-            if "already exist" in str(e):
-                self.latent_collection.update(
-                    embeddings=[embedding.tolist()],
-                    documents=[concept],
-                    ids=[concept]
-                )
-            else:
-                raise
+        self.add_latent_embedding_batch([concept], np.asarray(embedding).reshape(1, -1))
 
-    def find_human_neighbors(self, concept: str, n: int = 5) -> List[Tuple[str, float]]:
-        """Find N nearest neighbors in human space"""
-        results = self.human_collection.query(
-            query_texts=[concept],
-            n_results=n + 1  # +1 because the concept itself will be included
+    def add_human_embedding_batch(self, concepts: List[str], embeddings: np.ndarray):
+        """Store many human (MiniLM) embeddings in one call"""
+        self._add_batch("human", concepts, embeddings)
+
+    def add_latent_embedding_batch(self, concepts: List[str], embeddings: np.ndarray):
+        """Store many latent (llama.cpp) embeddings in one call"""
+        self._add_batch("latent", concepts, embeddings)
+
+    def add_shared_embedding(self, concept: str, embedding: np.ndarray):
+        """Store one embedding as both the human and latent view of a concept"""
+        self.add_shared_embedding_batch([concept], np.asarray(embedding).reshape(1, -1))
+
+    def add_shared_embedding_batch(self, concepts: List[str], embeddings: np.ndarray):
+        """
+        Store many embeddings as both views of their concepts
+
+        With shared_spaces each row is written once; otherwise it is
+        written to both collections.
+        """
+        self._add_batch("human", concepts, embeddings)
+        if not self.shared_spaces:
+            self._add_batch("latent", concepts, embeddings)
+
+    def _add_batch(self, space: str, concepts: List[str], embeddings: np.ndarray):
+        """Upsert rows of embeddings into a space (existing IDs are overwritten)"""
+        if not concepts:
+            return
+
+        collection = self.human_collection if space == "human" else self.latent_collection
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(len(concepts), -1)
+        self._stored_embedding.cache_clear()
+        collection.upsert(
+            embeddings=embeddings,
+            documents=list(concepts),
+            ids=list(concepts)
+        )
+        self._matrices[space].write(list(concepts), embeddings)
+
+    def _fetch_embedding(self, space: str, concept: str) -> Optional[np.ndarray]:
+        """Read a concept's stored embedding (cached through _stored_embedding)"""
+        collection = self.human_collection if space == "human" else self.latent_collection
+        result = collection.get(ids=[concept], include=["embeddings"])
+        if result['ids'] and len(result['embeddings']):
+            # Shared by every cache hit, so keep it read-only
+            embedding = np.array(result['embeddings'][0], dtype=np.float32)
+            embedding.setflags(write=False)
+            return embedding
+        return None
+
+    def _find_neighbors(self, space: str, concept: str, n: int) -> List[Tuple[str, float]]:
+        """
+        Find N nearest neighbors of a concept in one space
+
+        A stored concept is queried by its stored embedding, so Chroma does
+        not re-embed the text; unknown concepts still go through query_texts.
+        """
+        collection = self.human_collection if space == "human" else self.latent_collection
+        embedding = self._stored_embedding(space, concept)
+        query = dict(query_embeddings=embedding[np.newaxis, :]) if embedding is not None else dict(query_texts=[concept])
+        results = collection.query(
+            **query,
+            n_results=n + 1,  # +1 because the concept itself will be included
+            include=["documents", "distances"]
         )
 
         neighbors = []
@@ -86,20 +247,33 @@ class VectorStore:
 
         return neighbors[:n]
 
+    def find_human_neighbors(self, concept: str, n: int = 5) -> List[Tuple[str, float]]:
+        """Find N nearest neighbors in human space"""
+        return self._find_neighbors("human", concept, n)
+
     def find_latent_neighbors(self, concept: str, n: int = 5) -> List[Tuple[str, float]]:
         """Find N nearest neighbors in latent space"""
-        results = self.latent_collection.query(
-            query_texts=[concept],
-            n_results=n + 1
+        return self._find_neighbors("latent", concept, n)
+
+    def query_human(self, embedding: np.ndarray, k: int = 5) -> Tuple[List[str], np.ndarray]:
+        """
+        Approximate k-NN of an embedding using the collection's HNSW index
+        Returns: (concept_names, embeddings_matrix) of up to k candidates, nearest first
+        """
+        count = self.human_collection.count()
+        if count == 0 or k <= 0:
+            return [], np.array([])
+
+        results = self.human_collection.query(
+            query_embeddings=np.asarray(embedding, dtype=np.float32).reshape(1, -1),
+            n_results=min(k, count),
+            include=["embeddings"]
         )
 
-        neighbors = []
-        if results['documents'] and results['distances']:
-            for doc, dist in zip(results['documents'][0], results['distances'][0]):
-                if doc != concept:
-                    neighbors.append((doc, dist))
+        if results['ids'] and results['ids'][0]:
+            return results['ids'][0], np.asarray(results['embeddings'][0], dtype=np.float32)
 
-        return neighbors[:n]
+        return [], np.array([])
 
     def get_human_embedding(self, concept: str) -> np.ndarray:
         """Retrieve stored human embedding for a concept"""
@@ -107,7 +281,7 @@ class VectorStore:
             ids=[concept],
             include=["embeddings"]
         )
-        if result['embeddings']:
+        if result['ids'] and len(result['embeddings']):
             return np.array(result['embeddings'][0])
         return None
 
@@ -117,34 +291,66 @@ class VectorStore:
             ids=[concept],
             include=["embeddings"]
         )
-        if result['embeddings']:
+        if result['ids'] and len(result['embeddings']):
             return np.array(result['embeddings'][0])
         return None
 
     def get_all_concepts(self) -> List[str]:
-        """Get all concepts stored in the database"""
-        human_results = self.human_collection.get()
+        """Get all concepts stored in the database (IDs only, no payloads)"""
+        human_results = self.human_collection.get(include=[])
         return human_results['ids'] if human_results['ids'] else []
 
     def concept_exists(self, concept: str) -> bool:
         """Check if a concept has been embedded"""
-        result = self.human_collection.get(ids=[concept])
+        result = self.human_collection.get(ids=[concept], include=[])
         return len(result['ids']) > 0
 
+    def get_embeddings(self, concepts: List[str], space: str = "human") -> Tuple[List[str], np.ndarray]:
+        """
+        Get the stored embeddings for many concepts in one lookup
+        Returns: (concept_names, embeddings_matrix) for the concepts that exist
+        """
+        collection = self.human_collection if space == "human" else self.latent_collection
+        results = collection.get(ids=list(dict.fromkeys(concepts)), include=["embeddings"])
+
+        if results['ids'] and len(results['embeddings']):
+            return results['ids'], np.asarray(results['embeddings'], dtype=np.float32)
+
+        return [], np.array([])
+
+    def filter_missing(self, concepts: List[str]) -> List[str]:
+        """
+        Return the concepts that have not been embedded yet (one lookup)
+
+        Order is preserved and duplicates are dropped.
+        """
+        unique = list(dict.fromkeys(concepts))
+        if not unique:
+            return []
+
+        existing = set(self.human_collection.get(ids=unique, include=[])['ids'])
+        return [c for c in unique if c not in existing]
+
     def get_all_embeddings(self, space: str = "human") -> Tuple[List[str], np.ndarray]:
         """
         Get all embeddings from a space
         Returns: (concept_names, embeddings_matrix)
+
+        The matrix is a read-only float32 memmap of the on-disk copy. It is
+        rebuilt from Chroma once when its row count disagrees with the
+        collection (stores written before the copy existed).
         """
         collection = self.human_collection if space == "human" else self.latent_collection
-        results = collection.get(include=["embeddings"])
+        matrix = self._matrices[space]
 
-        if results['ids'] and results['embeddings']:
-            concepts = results['ids']
-            embeddings = np.array(results['embeddings'])
-            return concepts, embeddings
+        if len(matrix) != collection.count():
+            results = collection.get(include=["embeddings"])
+            if results['ids']:
+                matrix.rebuild(results['ids'], np.asarray(results['embeddings'], dtype=np.float32))
+            else:
+                matrix.rebuild([], np.array([]))
 
-        return [], np.array([])
+        return matrix.read()
 
     def persist(self):
         """Persist the vector store to disk"""
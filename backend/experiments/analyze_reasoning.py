@@ -2,6 +2,8 @@
 import json
 import sys
 
+from text_analysis import KeywordMatcher
+
 with open('/Users/joshuafarrow/Projects/LSCP/data/experiments/prompt_ablation_20251228_171611.json') as f:
     data = json.load(f)
 
@@ -31,21 +33,23 @@ comp_keywords = [
     'neural', 'dopamine', 'reward', 'prediction', 'policy', 'valuation',
     'learning', 'training', 'embedding', 'representation', 'activation'
 ]
+comp_matcher = KeywordMatcher(comp_keywords)
 
 results = {}
 for variant in ['neutral', 'current', 'hybrid']:
-    all_reasoning = ' '.join([
-        pair['responses'][variant]['reasoning']
-        for pair in data['concept_pairs']
-    ]).lower()
-
-    words = all_reasoning.split()
-    comp_count = sum(1 for word in words if any(kw in word for kw in comp_keywords))
+    # Count trace by trace instead of joining every trace into one string;
+    # joining with spaces never merged words, so the totals are the same
+    comp_count = 0
+    total_words = 0
+    for pair in data['concept_pairs']:
+        comp, total = comp_matcher.count_matching_words(pair['responses'][variant]['reasoning'].lower())
+        comp_count += comp
+        total_words += total
 
     results[variant] = {
-        'total_words': len(words),
+        'total_words': total_words,
         'comp_words': comp_count,
-        'pct': (comp_count / len(words) * 100) if words else 0
+        'pct': (comp_count / total_words * 100) if total_words else 0
     }
 
 for variant in ['neutral', 'current', 'hybrid']:
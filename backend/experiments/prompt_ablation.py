@@ -13,13 +13,25 @@ Run: python experiments/prompt_ablation.py
 import os
 import sys
 import json
+import asyncio
+from collections import Counter
 from pathlib import Path
-from openai import OpenAI
+from openai import AsyncOpenAI
 from datetime import datetime
 
 # Add backend to path
 sys.path.append(str(Path(__file__).parent.parent))
 from config import settings
+from text_analysis import KeywordMatcher
+
+# Computational-language keywords, matched in one pass per text
+COMP_KEYWORDS = frozenset([
+    'computational', 'function', 'process', 'algorithm', 'optimize',
+    'system', 'mechanism', 'state', 'output', 'input', 'model',
+    'entropy', 'information', 'signal', 'feedback', 'loop',
+    'vector', 'space', 'dimension', 'mapping', 'transformation'
+])
+COMP_MATCHER = KeywordMatcher(COMP_KEYWORDS)
 
 # Test concept pairs (mix of semantically close and distant in human space)
 TEST_PAIRS = [
@@ -63,6 +75,77 @@ Output one concise, definitive sentence stating the mechanism."""
 }
 
 
+# Requests in flight at once
+MAX_CONCURRENT = 8
+# Client-side retries with exponential backoff (429s and 5xx)
+MAX_RETRIES = 5
+
+
+async def query_variant(client: AsyncOpenAI, sem: asyncio.Semaphore,
+                        concept_a: str, concept_b: str, prompt_name: str) -> dict:
+    """Run one prompt variant on one concept pair and score its response"""
+    # Format prompt
+    prompt = PROMPTS[prompt_name].format(a=concept_a, b=concept_b)
+
+    try:
+        # Call DeepSeek
+        async with sem:
+            response = await client.chat.completions.create(
+                model=settings.DEEPSEEK_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=150,
+                temperature=0.7
+            )
+
+        # Extract response
+        bridge = response.choices[0].message.content.strip()
+        reasoning = getattr(response.choices[0].message, 'reasoning_content', None) or ""
+
+        # Analyze for computational language
+        bridge_comp_count = COMP_MATCHER.count_keywords(bridge.lower())
+        reasoning_comp_count = COMP_MATCHER.count_keywords(reasoning.lower())
+
+        return {
+            "bridge": bridge,
+            "reasoning": reasoning,
+            "bridge_length": len(bridge),
+            "reasoning_length": len(reasoning),
+            "bridge_computational_keywords": bridge_comp_count,
+            "reasoning_computational_keywords": reasoning_comp_count,
+            "bridge_has_computational_bias": bridge_comp_count > 0,
+            "reasoning_has_computational_bias": reasoning_comp_count > 0
+        }
+
+    except Exception as e:
+        # Recorded per variant so one bad response never aborts the study
+        return {"error": str(e)}
+
+
+async def query_all() -> list:
+    """
+    Run every (pair, variant) request concurrently
+
+    Returns:
+        Response dicts in TEST_PAIRS x PROMPTS order
+    """
+    # Initialize DeepSeek client
+    client = AsyncOpenAI(
+        api_key=settings.DEEPSEEK_API_KEY,
+        base_url=settings.DEEPSEEK_BASE_URL,
+        max_retries=MAX_RETRIES
+    )
+    sem = asyncio.Semaphore(MAX_CONCURRENT)
+
+    try:
+        return await asyncio.gather(*[
+            query_variant(client, sem, concept_a, concept_b, prompt_name)
+            for concept_a, concept_b in TEST_PAIRS
+            for prompt_name in PROMPTS
+        ])
+    finally:
+        await client.close()
+
+
 def run_ablation_study():
     """Execute the full ablation study"""
 
@@ -70,13 +153,9 @@ def run_ablation_study():
     print("LSCP PROMPT ABLATION STUDY")
     print("=" * 80)
     print(f"\nTesting {len(TEST_PAIRS)} concept pairs with {len(PROMPTS)} prompt variants")
-    print(f"Total API calls: {len(TEST_PAIRS) * len(PROMPTS)}\n")
+    print(f"Total API calls: {len(TEST_PAIRS) * len(PROMPTS)} ({MAX_CONCURRENT} concurrent)\n")
 
-    # Initialize DeepSeek client
-    client = OpenAI(
-        api_key=settings.DEEPSEEK_API_KEY,
-        base_url=settings.DEEPSEEK_BASE_URL
-    )
+    responses = iter(asyncio.run(query_all()))
 
     results = {
         "metadata": {
@@ -87,8 +166,10 @@ def run_ablation_study():
         },
         "concept_pairs": []
     }
+    # Bias tallies per prompt variant, accumulated while collating
+    bias_counts = {pname: Counter() for pname in PROMPTS}
 
-    # Test each concept pair
+    # Collate responses per concept pair
     for idx, (concept_a, concept_b) in enumerate(TEST_PAIRS, 1):
         print(f"\n[{idx}/{len(TEST_PAIRS)}] Testing: {concept_a} ↔ {concept_b}")
         print("-" * 60)
@@ -99,56 +180,25 @@ def run_ablation_study():
             "responses": {}
         }
 
-        # Test each prompt variant
-        for prompt_name, prompt_template in PROMPTS.items():
+        for prompt_name in PROMPTS:
             print(f"\n  Variant: {prompt_name}")
-
-            # Format prompt
-            prompt = prompt_template.format(a=concept_a, b=concept_b)
-
-            try:
-                # Call DeepSeek
-                response = client.chat.completions.create(
-                    model=settings.DEEPSEEK_MODEL,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=150,
-                    temperature=0.7
-                )
-
-                # Extract response
-                bridge = response.choices[0].message.content.strip()
-                reasoning = getattr(response.choices[0].message, 'reasoning_content', None) or ""
-
-                # Analyze for computational language
-                comp_keywords = [
-                    'computational', 'function', 'process', 'algorithm', 'optimize',
-                    'system', 'mechanism', 'state', 'output', 'input', 'model',
-                    'entropy', 'information', 'signal', 'feedback', 'loop',
-                    'vector', 'space', 'dimension', 'mapping', 'transformation'
-                ]
-
-                bridge_comp_count = sum(1 for kw in comp_keywords if kw in bridge.lower())
-                reasoning_comp_count = sum(1 for kw in comp_keywords if kw in reasoning.lower())
-
-                pair_result["responses"][prompt_name] = {
-                    "bridge": bridge,
-                    "reasoning": reasoning,
-                    "bridge_length": len(bridge),
-                    "reasoning_length": len(reasoning),
-                    "bridge_computational_keywords": bridge_comp_count,
-                    "reasoning_computational_keywords": reasoning_comp_count,
-                    "bridge_has_computational_bias": bridge_comp_count > 0,
-                    "reasoning_has_computational_bias": reasoning_comp_count > 0
-                }
-
-                # Display
-                print(f"    Bridge: {bridge[:100]}{'...' if len(bridge) > 100 else ''}")
-                print(f"    Comp Keywords (Bridge): {bridge_comp_count}")
-                print(f"    Comp Keywords (Reasoning): {reasoning_comp_count}")
-
-            except Exception as e:
-                print(f"    ERROR: {e}")
-                pair_result["responses"][prompt_name] = {"error": str(e)}
+            response = next(responses)
+            pair_result["responses"][prompt_name] = response
+
+            # Display
+            if "error" in response:
+                print(f"    ERROR: {response['error']}")
+                continue
+            # Tally
+            counts = bias_counts[prompt_name]
+            counts["bridge"] += response["bridge_has_computational_bias"]
+            counts["reasoning"] += response["reasoning_has_computational_bias"]
+            counts["total"] += 1
+
+            bridge = response["bridge"]
+            print(f"    Bridge: {bridge[:100]}{'...' if len(bridge) > 100 else ''}")
+            print(f"    Comp Keywords (Bridge): {response['bridge_computational_keywords']}")
+            print(f"    Comp Keywords (Reasoning): {response['reasoning_computational_keywords']}")
 
         results["concept_pairs"].append(pair_result)
 
@@ -165,28 +215,21 @@ def run_ablation_study():
     print("=" * 80)
 
     # Generate summary
-    generate_summary(results)
+    generate_summary(bias_counts)
 
 
-def generate_summary(results):
-    """Analyze and print summary statistics"""
+def generate_summary(bias_counts):
+    """
+    Print summary statistics
+
+    Args:
+        bias_counts: {prompt_name: Counter(bridge=..., reasoning=..., total=...)}
+    """
 
     print("\n" + "=" * 80)
     print("SUMMARY ANALYSIS")
     print("=" * 80)
 
-    # Count computational bias by prompt type
-    bias_counts = {pname: {"bridge": 0, "reasoning": 0, "total": 0} for pname in PROMPTS.keys()}
-
-    for pair in results["concept_pairs"]:
-        for pname, response in pair["responses"].items():
-            if "error" not in response:
-                if response.get("bridge_has_computational_bias"):
-                    bias_counts[pname]["bridge"] += 1
-                if response.get("reasoning_has_computational_bias"):
-                    bias_counts[pname]["reasoning"] += 1
-                bias_counts[pname]["total"] += 1
-
     print("\nComputational Bias Frequency:")
     print("-" * 60)
     for pname, counts in bias_counts.items():
@@ -0,0 +1,76 @@
+"""
+Keyword matching for reasoning-trace analysis
+Finds every keyword occurrence in one pass over the text
+"""
+import re
+from bisect import bisect_right
+from typing import List, Set, Tuple
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+
+class KeywordMatcher:
+    """
+    Multi-keyword substring matcher, compiled once and reused across texts
+
+    Uses a pyahocorasick automaton when installed (a single linear scan that
+    reports overlapping matches), otherwise one compiled regex alternation.
+    Matching is case-sensitive; lowercase the text for keyword lists in
+    lowercase.
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = list(dict.fromkeys(keywords))
+
+        if HAS_AHOCORASICK:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+        else:
+            # Longest first so a keyword is never shadowed by its own prefix
+            ordered = sorted(self.keywords, key=len, reverse=True)
+            self._pattern = re.compile('|'.join(map(re.escape, ordered)))
+
+    def _matches(self, text: str) -> List[Tuple[int, str]]:
+        """
+        (start, keyword) for keyword occurrences in text
+
+        The automaton reports every occurrence; the regex fallback reports
+        leftmost non-overlapping ones, which still hits every word that
+        contains a keyword.
+        """
+        if not self.keywords:
+            return []
+        if HAS_AHOCORASICK:
+            return [(end - len(kw) + 1, kw) for end, kw in self._automaton.iter(text)]
+        return [(m.start(), m.group()) for m in self._pattern.finditer(text)]
+
+    def keywords_in(self, text: str) -> Set[str]:
+        """Distinct keywords that occur anywhere in text"""
+        if HAS_AHOCORASICK:
+            return {kw for _, kw in self._matches(text)}
+        # Non-overlapping regex matches can hide a keyword inside another
+        return {kw for kw in self.keywords if kw in text}
+
+    def count_keywords(self, text: str) -> int:
+        """Number of distinct keywords that occur in text"""
+        return len(self.keywords_in(text))
+
+    def count_matching_words(self, text: str) -> Tuple[int, int]:
+        """
+        Count whitespace-separated words containing at least one keyword
+
+        Keywords contain no whitespace, so each match falls inside exactly
+        one word; its start offset is mapped to that word by bisection.
+
+        Returns:
+            (matching_words, total_words)
+        """
+        word_starts = [m.start() for m in re.finditer(r'\S+', text)]
+        hit_words = {bisect_right(word_starts, start) - 1 for start, _ in self._matches(text)}
+        return len(hit_words), len(word_starts)
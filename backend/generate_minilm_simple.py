@@ -1,24 +1,141 @@
 """
 Simple MiniLM embedding generator - bypasses ChromaDB to avoid version issues
 """
+import argparse
+import os
+import platform
 import sqlite3
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 from pathlib import Path
 
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    HAS_ORT = True
+except ImportError:
+    HAS_ORT = False
+
 # Configuration
 DB_PATH = "/Users/joshuafarrow/Projects/LSCP/data/lscp.db"
 OUTPUT_FILE = "/Users/joshuafarrow/Projects/LSCP/data/minilm_embeddings.npz"
+MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+# Exported + dynamically quantized int8 ONNX model, built on the first int8 run
+# (one directory per quantization config)
+ONNX_INT8_DIR = "/Users/joshuafarrow/Projects/LSCP/data/minilm_onnx_int8"
+BATCH_SIZE = 64
+
+
+def quantization_target() -> str:
+    """
+    Pick the optimum dynamic-quantization config for this CPU
+
+    Returns:
+        'arm64', 'avx512_vnni', 'avx512' or 'avx2'
+    """
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+
+    flags = set()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    flags = set(line.split(":", 1)[1].split())
+                    break
+    except OSError:
+        pass
+
+    if "avx512_vnni" in flags:
+        return "avx512_vnni"
+    if "avx512f" in flags:
+        return "avx512"
+    return "avx2"
+
+
+def load_int8_model():
+    """
+    Load the int8 ONNX MiniLM, exporting and quantizing it once if needed
+
+    Returns:
+        (tokenizer, ORT model) running on the CPU execution provider
+    """
+    target = quantization_target()
+    save_dir = Path(f"{ONNX_INT8_DIR}_{target}")
+    if not (save_dir / "model_quantized.onnx").exists():
+        print(f"   Exporting {MODEL_ID} to ONNX and quantizing to int8 ({target})...")
+        fp32 = ORTModelForFeatureExtraction.from_pretrained(MODEL_ID, export=True)
+        quantizer = ORTQuantizer.from_pretrained(fp32)
+        make_config = getattr(AutoQuantizationConfig, target)
+        quantizer.quantize(
+            save_dir=save_dir,
+            quantization_config=make_config(is_static=False, per_channel=False)
+        )
+        AutoTokenizer.from_pretrained(MODEL_ID).save_pretrained(save_dir)
+
+    tokenizer = AutoTokenizer.from_pretrained(save_dir)
+    model = ORTModelForFeatureExtraction.from_pretrained(
+        save_dir,
+        file_name="model_quantized.onnx",
+        provider="CPUExecutionProvider"
+    )
+    return tokenizer, model
+
+
+def encode_int8(tokenizer, model, concepts, batch_size=BATCH_SIZE):
+    """
+    Encode concepts with the int8 ONNX model
+
+    Mean-pools token states over the attention mask and L2-normalizes,
+    matching SentenceTransformer's all-MiniLM-L6-v2 pipeline.
+
+    Returns:
+        (N, 384) float32 array of unit embeddings
+    """
+    out = []
+    for start in range(0, len(concepts), batch_size):
+        batch = concepts[start:start + batch_size]
+        inputs = tokenizer(batch, padding=True, truncation=True, max_length=256, return_tensors="np")
+        hidden = model(**inputs).last_hidden_state
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        out.append(pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12))
+        print(f"[{min(start + batch_size, len(concepts))}/{len(concepts)}] encoded")
+    return np.concatenate(out).astype(np.float32, copy=False)
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate MiniLM embeddings for every concept")
+    parser.add_argument(
+        "--int8", action="store_true",
+        default=os.getenv("MINILM_INT8", "false").lower() == "true",
+        help="Encode on CPU with an int8-quantized ONNX model (approximate embeddings; "
+             "needs optimum[onnxruntime]). Also enabled by MINILM_INT8=true"
+    )
+    args = parser.parse_args()
+
     print("=" * 80)
     print("MINILM EMBEDDING GENERATION (Standalone)")
     print("=" * 80)
 
-    # 1. Load MiniLM model
+    # 1. Load MiniLM model (fp16 weights on GPU; int8 ONNX on CPU only when asked,
+    # since it changes the stored human embeddings the drift analysis compares)
     print("\n1. Loading MiniLM model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    print(f"✓ MiniLM model loaded")
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    use_int8 = args.int8 and device == "cpu"
+    if args.int8 and not HAS_ORT:
+        raise SystemExit("--int8 needs optimum[onnxruntime]: pip install 'optimum[onnxruntime]'")
+    if args.int8 and device != "cpu":
+        print("   --int8 ignored: CUDA is available, using fp16 SentenceTransformer")
+    if use_int8:
+        tokenizer, model = load_int8_model()
+        print("✓ MiniLM model loaded (int8 ONNX Runtime, CPU)")
+    else:
+        model = SentenceTransformer('all-MiniLM-L6-v2', device=device)
+        if device == "cuda":
+            model.half()
+        print(f"✓ MiniLM model loaded on {device}")
 
     # 2. Get concepts from database
     print("\n2. Loading concepts from database...")
@@ -33,31 +150,27 @@ def main():
     print(f"\n3. Generating embeddings...")
     print("-" * 80)
 
-    embeddings_dict = {}
-
-    for i, concept in enumerate(concepts, 1):
-        try:
-            # Generate embedding
-            embedding = model.encode(concept)
-            embeddings_dict[concept] = np.array(embedding)
-
-            if i % 10 == 0:
-                print(f"[{i}/{len(concepts)}] {concept}: shape={embeddings_dict[concept].shape}")
-            else:
-                print(f"[{i}/{len(concepts)}] {concept}")
-
-        except Exception as e:
-            print(f"ERROR on '{concept}': {e}")
-            continue
+    # One batched encode: tokenization and forward passes run 64 concepts at a time
+    if use_int8:
+        embs = encode_int8(tokenizer, model, concepts)
+    else:
+        embs = model.encode(
+            concepts,
+            batch_size=BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=True
+        ).astype(np.float32, copy=False)
+    print(f"✓ Encoded {len(concepts)} concepts: shape={embs.shape}")
 
-    # 4. Save embeddings
+    # 4. Save embeddings as one (N, 384) matrix plus its row names
     print(f"\n4. Saving embeddings to {OUTPUT_FILE}...")
-    np.savez_compressed(OUTPUT_FILE, **embeddings_dict)
-    print(f"✓ Saved {len(embeddings_dict)} embeddings")
+    np.savez(OUTPUT_FILE, names=np.array(concepts), embeddings=embs)
+    print(f"✓ Saved {len(concepts)} embeddings")
 
     # Print sample
     sample_concept = concepts[0]
-    sample_emb = embeddings_dict[sample_concept]
+    sample_emb = embs[0]
     print(f"\nSample: '{sample_concept}' → {sample_emb.shape} dims")
     print(f"First 5 values: {sample_emb[:5]}")
 
@@ -2,7 +2,10 @@
 Generate Qwen embeddings for all concepts to enable dual-view visualization
 This creates the "AI" embedding set to compare against MiniLM (human baseline)
 """
+import argparse
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add current directory to path
@@ -10,14 +13,39 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 import numpy as np
 from llama_cpp import Llama
-from db.vector_store import VectorStore
-from db.relational import LSCPDatabase
+from tqdm import tqdm
+from db.handles import get_db, get_vector_store
 
 # Load configuration
 from config import settings
 
-def generate_qwen_embeddings():
-    """Generate Qwen embeddings for all concepts in the database"""
+# Concepts per llm.embed() call; llama.cpp packs them into n_batch-token decodes
+EMBED_BATCH = 32
+# Embeddings buffered per vector store upsert
+STORE_BATCH = 64
+N_BATCH = 256
+# Leave two cores free so decode threads don't contend with the OS and I/O
+N_THREADS = max((os.cpu_count() or 4) - 2, 1)
+# Transformer layers offloaded to Metal/CUDA (-1 = all, 0 = CPU only)
+N_GPU_LAYERS = int(os.getenv("LSCP_NGL", "-1"))
+
+
+def stream_concepts(cursor, batch_size: int):
+    """Yield concept names in lists of up to batch_size, as SQLite returns them"""
+    cursor.execute("SELECT name FROM concepts ORDER BY name")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield [row[0] for row in rows]
+
+def generate_qwen_embeddings(verbose: bool = False):
+    """
+    Generate Qwen embeddings for all concepts in the database
+
+    Args:
+        verbose: Log every concept instead of showing a progress bar
+    """
 
     print("=" * 80)
     print("QWEN EMBEDDING GENERATION")
@@ -28,62 +56,118 @@ def generate_qwen_embeddings():
     print("\n1. Loading Qwen model...")
     qwen_model_path = "/Users/joshuafarrow/Downloads/Qwen2.5-14B-Instruct-Q4_K_M.gguf"
 
-    if not Path(qwen_model_path).exists():
-        print(f"ERROR: Qwen model not found at {qwen_model_path}")
+    # Llama checks the path itself; a missing or unreadable file raises here
+    try:
+        llm = Llama(
+            model_path=qwen_model_path,
+            n_ctx=512,
+            n_batch=N_BATCH,
+            n_ubatch=N_BATCH,
+            n_threads=N_THREADS,
+            n_gpu_layers=N_GPU_LAYERS,
+            flash_attn=True,
+            embedding=True,
+            verbose=False
+        )
+    except (ValueError, OSError) as e:
+        print(f"ERROR: cannot open Qwen model at {qwen_model_path}: {e}")
         print("Please download the model first.")
         sys.exit(1)
-
-    llm = Llama(
-        model_path=qwen_model_path,
-        n_ctx=512,
-        n_batch=32,
-        embedding=True,
-        verbose=False
-    )
     print(f"✓ Qwen model loaded from {qwen_model_path}")
 
-    # Get all concepts from database
+    # Count concepts; names are streamed from the cursor while embedding
     print("\n2. Loading concepts from database...")
-    db = LSCPDatabase()
+    db = get_db()
     cursor = db.conn.cursor()
-    cursor.execute("SELECT DISTINCT concept_a FROM concepts")
-    concepts = [row[0] for row in cursor.fetchall()]
-    print(f"✓ Found {len(concepts)} concepts")
+    total = cursor.execute("SELECT COUNT(*) FROM concepts").fetchone()[0]
+    print(f"✓ Found {total} concepts")
 
     # Initialize vector store for Qwen embeddings
     print("\n3. Initializing Qwen vector store...")
-    # Use a separate collection for Qwen embeddings
-    vector_store = VectorStore(collection_suffix="_qwen")
+    # Qwen's human and latent views are the same vectors, so keep one
+    # collection under a separate "_qwen" prefix and serve both from it
+    vector_store = get_vector_store("_qwen", shared_spaces=True)
     print("✓ Qwen vector store initialized")
 
     # Generate embeddings
-    print(f"\n4. Generating Qwen embeddings for {len(concepts)} concepts...")
+    print(f"\n4. Generating Qwen embeddings for {total} concepts...")
     print("-" * 80)
 
-    for i, concept in enumerate(concepts, 1):
+    # Redrawn at most twice a second; errors go through tqdm.write
+    progress = tqdm(total=total, desc="embed", mininterval=0.5, disable=verbose)
+    log = tqdm.write
+    embedding_array = None
+
+    # Buffered (concept, vector) rows, written to the store in bulk
+    ids, vecs = [], []
+
+    # One background writer: a batch is upserted into Chroma while the
+    # next chunk is embedded (both calls release the GIL)
+    writer = ThreadPoolExecutor(max_workers=1)
+    pending = None
+
+    def flush():
+        nonlocal pending
+        if ids:
+            matrix = np.stack(vecs)
+            # At most one batch in flight; also surfaces a failed write
+            if pending is not None:
+                pending.result()
+            # Stored once; readers of either space see the same rows
+            pending = writer.submit(vector_store.add_shared_embedding_batch, ids[:], matrix)
+            ids.clear()
+            vecs.clear()
+
+    start = 0
+    for chunk in stream_concepts(cursor, EMBED_BATCH):
         try:
-            # Generate embedding
-            embedding = llm.embed(concept)
-            embedding_array = np.array(embedding)
-
-            # Store in both latent and human collections (for compatibility)
-            vector_store.add_human_embedding(concept, embedding_array)
-            vector_store.add_latent_embedding(concept, embedding_array)
-
-            print(f"[{i}/{len(concepts)}] {concept}: {embedding_array.shape}")
-
+            # One call per chunk: sequences share llama.cpp decode batches
+            embeddings = llm.embed(chunk)
         except Exception as e:
-            print(f"ERROR generating embedding for '{concept}': {e}")
-            continue
+            log(f"ERROR on batch starting at '{chunk[0]}': {e}; retrying one at a time")
+            embeddings = []
+            for concept in chunk:
+                try:
+                    embeddings.append(llm.embed(concept))
+                except Exception as e:
+                    log(f"ERROR generating embedding for '{concept}': {e}")
+                    embeddings.append(None)
+
+        for i, (concept, embedding) in enumerate(zip(chunk, embeddings), start + 1):
+            if embedding is None:
+                continue
+            # First row of unpooled per-token output, so every vector is (D,)
+            embedding_array = np.asarray(embedding, dtype=np.float32)
+            embedding_array = embedding_array.reshape(-1, embedding_array.shape[-1])[0]
+            ids.append(concept)
+            vecs.append(embedding_array)
+
+            if verbose:
+                print(f"[{i}/{total}] {concept}: {embedding_array.shape}")
+
+        if len(ids) >= STORE_BATCH:
+            flush()
+
+        start += len(chunk)
+        progress.update(len(chunk))
+        if embedding_array is not None:
+            progress.set_postfix(shape=embedding_array.shape, refresh=False)
+    flush()
+    if pending is not None:
+        pending.result()
+    writer.shutdown()
+    progress.close()
 
     print("\n" + "=" * 80)
     print("✓ QWEN EMBEDDINGS GENERATION COMPLETE")
     print("=" * 80)
-    print(f"\nGenerated embeddings for {len(concepts)} concepts")
+    print(f"\nGenerated embeddings for {total} concepts")
     print(f"Dimension: {embedding_array.shape[0]}")
-    print("\nThese embeddings are stored in the '_qwen' collection")
+    print(f"\nThese embeddings are stored in the '{settings.CHROMA_COLLECTION_NAME}_qwen_shared' collection")
     print("and can now be used for dual-view visualization.")
 
 
 if __name__ == "__main__":
-    generate_qwen_embeddings()
+    parser = argparse.ArgumentParser(description="Generate Qwen embeddings for every concept")
+    parser.add_argument("--verbose", action="store_true", help="Log every concept instead of a progress bar")
+    generate_qwen_embeddings(verbose=parser.parse_args().verbose)
@@ -1,74 +1,143 @@
 """
 Simple Qwen embedding generator - bypasses VectorStore to avoid ChromaDB import issues
 """
+import argparse
+import os
 import sqlite3
 import numpy as np
 from llama_cpp import Llama
-from pathlib import Path
+from tqdm import tqdm
 
 # Configuration
 QWEN_MODEL_PATH = "/Users/joshuafarrow/Downloads/Qwen2.5-14B-Instruct-Q4_K_M.gguf"
 DB_PATH = "/Users/joshuafarrow/Projects/LSCP/data/lscp.db"
 OUTPUT_FILE = "/Users/joshuafarrow/Projects/LSCP/data/qwen_embeddings.npz"
 
+# Concepts per llm.embed() call; llama.cpp packs them into n_batch-token decodes
+EMBED_BATCH = 32
+N_BATCH = 256
+# Leave two cores free so decode threads don't contend with the OS and I/O
+N_THREADS = max((os.cpu_count() or 4) - 2, 1)
+# Transformer layers offloaded to Metal/CUDA (-1 = all, 0 = CPU only)
+N_GPU_LAYERS = int(os.getenv("LSCP_NGL", "-1"))
+
+
+def stream_concepts(cursor, batch_size: int):
+    """Yield concept names in lists of up to batch_size, as SQLite returns them"""
+    cursor.execute("SELECT name FROM concepts ORDER BY name")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield [row[0] for row in rows]
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate Qwen embeddings for every concept")
+    parser.add_argument("--verbose", action="store_true", help="Log every concept instead of a progress bar")
+    args = parser.parse_args()
+
     print("=" * 80)
     print("QWEN EMBEDDING GENERATION (Standalone)")
     print("=" * 80)
 
     # 1. Load Qwen model
     print("\n1. Loading Qwen model...")
-    if not Path(QWEN_MODEL_PATH).exists():
-        print(f"ERROR: Model not found at {QWEN_MODEL_PATH}")
+    # Llama checks the path itself; a missing or unreadable file raises here
+    try:
+        llm = Llama(
+            model_path=QWEN_MODEL_PATH,
+            n_ctx=512,
+            n_batch=N_BATCH,
+            n_ubatch=N_BATCH,
+            n_threads=N_THREADS,
+            n_gpu_layers=N_GPU_LAYERS,
+            flash_attn=True,
+            embedding=True,
+            verbose=False
+        )
+    except (ValueError, OSError) as e:
+        print(f"ERROR: cannot open {QWEN_MODEL_PATH}: {e}")
         return
-
-    llm = Llama(
-        model_path=QWEN_MODEL_PATH,
-        n_ctx=512,
-        n_batch=32,
-        embedding=True,
-        verbose=False
-    )
     print(f"✓ Qwen model loaded")
 
-    # 2. Get concepts from database
+    # 2. Count concepts; names are streamed from the cursor while embedding
     print("\n2. Loading concepts from database...")
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT name FROM concepts ORDER BY name")
-    concepts = [row[0] for row in cursor.fetchall()]
-    conn.close()
-    print(f"✓ Found {len(concepts)} concepts")
+    # One read snapshot, so the count matches the streamed rows
+    cursor.execute("BEGIN")
+    total = cursor.execute("SELECT COUNT(*) FROM concepts").fetchone()[0]
+    print(f"✓ Found {total} concepts")
 
     # 3. Generate embeddings
     print(f"\n3. Generating embeddings...")
     print("-" * 80)
 
-    embeddings_dict = {}
+    # One float32 row per embedded concept, allocated once the dimension is known
+    matrix = None
+    names = []
 
-    for i, concept in enumerate(concepts, 1):
+    # Redrawn at most twice a second; errors go through tqdm.write
+    progress = tqdm(total=total, desc="embed", mininterval=0.5, disable=args.verbose)
+    log = tqdm.write
+
+    start = 0
+    for chunk in stream_concepts(cursor, EMBED_BATCH):
         try:
-            # Generate embedding
-            embedding = llm.embed(concept)
-            embeddings_dict[concept] = np.array(embedding)
+            # One call per chunk: sequences share llama.cpp decode batches
+            embeddings = llm.embed(chunk)
+        except Exception as e:
+            log(f"ERROR on batch starting at '{chunk[0]}': {e}; retrying one at a time")
+            embeddings = []
+            for concept in chunk:
+                try:
+                    embeddings.append(llm.embed(concept))
+                except Exception as e:
+                    log(f"ERROR on '{concept}': {e}")
+                    embeddings.append(None)
 
-            if i % 10 == 0:
-                print(f"[{i}/{len(concepts)}] {concept}: shape={embeddings_dict[concept].shape}")
-            else:
-                print(f"[{i}/{len(concepts)}] {concept}")
+        for i, (concept, embedding) in enumerate(zip(chunk, embeddings), start + 1):
+            if embedding is None:
+                continue
+            # Pooled output is (D,); unpooled output is one (D,) row per token,
+            # of which the first is kept (what load_embeddings' target_dim did)
+            vector = np.asarray(embedding, dtype=np.float32)
+            if matrix is None:
+                matrix = np.empty((total, vector.shape[-1]), dtype=np.float32)
+            vector = vector.reshape(-1, matrix.shape[1])[0]
+            matrix[len(names)] = vector
+            names.append(concept)
 
-        except Exception as e:
-            print(f"ERROR on '{concept}': {e}")
-            continue
+            if args.verbose:
+                print(f"[{i}/{total}] {concept}: shape={vector.shape}")
+
+        start += len(chunk)
+        progress.update(len(chunk))
+        if matrix is not None:
+            progress.set_postfix(shape=matrix.shape[1:], refresh=False)
+    progress.close()
+    conn.close()
+
+    if matrix is None:
+        print("ERROR: No embeddings generated")
+        return
+    matrix = matrix[:len(names)]
 
-    # 4. Save embeddings
+    # 4. Save embeddings (uncompressed: zlib gains little on float data,
+    # and load_embeddings maps the stacked matrix without a per-key walk).
+    # Half precision halves the file and the bytes the layout maps; cosine
+    # ranks barely move. Kept float32 if a value overflows float16.
     print(f"\n4. Saving embeddings to {OUTPUT_FILE}...")
-    np.savez_compressed(OUTPUT_FILE, **embeddings_dict)
-    print(f"✓ Saved {len(embeddings_dict)} embeddings")
+    stored = matrix.astype(np.float16)
+    if not np.isfinite(stored).all():
+        print("   Values exceed float16 range; saving float32")
+        stored = matrix
+    np.savez(OUTPUT_FILE, names=np.array(names), embeddings=stored)
+    print(f"✓ Saved {len(names)} embeddings ({stored.dtype})")
 
     # Print sample
-    sample_concept = concepts[0]
-    sample_emb = embeddings_dict[sample_concept]
+    sample_concept = names[0]
+    sample_emb = matrix[0]
     print(f"\nSample: '{sample_concept}' → {sample_emb.shape} dims")
     print(f"First 5 values: {sample_emb[:5]}")
 
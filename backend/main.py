@@ -3,19 +3,23 @@ LSCP Main CLI
 Command-line interface for running scans and populating the database
 """
 import argparse
+import heapq
 import sys
+from operator import itemgetter
 from pathlib import Path
+from typing import Optional
 
 from config import settings
 from db.relational import LSCPDatabase
-from db.vector_store import VectorStore
-from models.control import ControlModel
-from models.explorer import ExplorerModel
-from crawler.scanner import LSCPScanner
+from db.explorer_cache import cache_bridges
+from db.handles import get_db, get_explorer_cache, get_vector_store
 
+# The models and scanner (sentence-transformers/torch) are imported in
+# initialize_system, so --stats, --edges and --server start without them
 
-# Oxford 3000 Core Word List (subset for initial testing)
-CORE_VOCABULARY = [
+
+# Oxford 3000 Core Word List (subset for initial testing), in scan order
+CORE_VOCABULARY = (
     # Abstract Concepts
     "time", "space", "reality", "truth", "knowledge", "memory", "thought", "idea",
     "concept", "meaning", "purpose", "value", "existence", "consciousness",
@@ -47,11 +51,33 @@ CORE_VOCABULARY = [
     # Computational (High Delta Expected)
     "compression", "loss", "gradient", "optimization", "prediction", "model",
     "data", "information", "signal", "noise", "probability", "distribution"
-]
+)
+
+# Lowercased once, row-aligned with CORE_VOCABULARY, for case-insensitive filtering
+CORE_VOCABULARY_LOWER = tuple(w.lower() for w in CORE_VOCABULARY)
+# Case-insensitive membership test
+CORE_VOCABULARY_SET = frozenset(CORE_VOCABULARY_LOWER)
+
+# A repeated word would be scanned twice by --batch
+if len(CORE_VOCABULARY_SET) != len(CORE_VOCABULARY):
+    raise ValueError("CORE_VOCABULARY has duplicate words")
+
+# Sort key for scan results
+_by_avg_delta = itemgetter('avg_delta')
+
+
+def initialize_system(vocabulary: Optional[tuple] = None):
+    """
+    Initialize all components
 
+    Args:
+        vocabulary: Words the chosen command scans against; embedded up
+                    front when given (otherwise scans embed what they need)
+    """
+    from models.control import ControlModel
+    from models.explorer import ExplorerModel
+    from crawler.scanner import LSCPScanner
 
-def initialize_system():
-    """Initialize all components"""
     print("="*60)
     print("LATENT SPACE CARTOGRAPHY PROTOCOL")
     print("Initializing System...")
@@ -66,8 +92,8 @@ def initialize_system():
 
     # Initialize databases
     print("\n1. Initializing databases...")
-    db = LSCPDatabase(settings.SQLITE_DB_PATH)
-    vector_store = VectorStore(settings.VECTOR_DB_PATH, settings.CHROMA_COLLECTION_NAME)
+    db = get_db()
+    vector_store = get_vector_store()
 
     # Initialize models
     print("\n2. Loading models...")
@@ -81,6 +107,12 @@ def initialize_system():
         base_url=settings.DEEPSEEK_BASE_URL,
         model_name=settings.DEEPSEEK_MODEL
     )
+    if settings.EXPLORER_CACHE:
+        # Bridges already generated for a pair are read back instead of re-requested
+        explorer_model.generate_bridge = cache_bridges(
+            explorer_model.generate_bridge, get_explorer_cache(), settings.DEEPSEEK_MODEL
+        )
+        print(f"Explorer responses cached in {settings.EXPLORER_CACHE_PATH}")
     print("Explorer Model loaded successfully")
 
     # Create scanner
@@ -91,14 +123,21 @@ def initialize_system():
         vector_store=vector_store,
         database=db,
         neighbor_count=settings.NEIGHBOR_COUNT,
-        delta_threshold=settings.DELTA_THRESHOLD
+        delta_threshold=settings.DELTA_THRESHOLD,
+        quantize=settings.QUANTIZE_EMBEDDINGS
     )
 
+    # One batched MiniLM encode for any vocabulary words not stored yet;
+    # scans then reuse the cached normalized vocabulary matrix
+    if vocabulary:
+        print(f"Embedding scan vocabulary ({len(vocabulary)} words)...")
+        scanner.prepare_vocabulary(vocabulary)
+
     print("\n✓ System initialization complete!")
     return scanner, db, vector_store
 
 
-def scan_single_concept(scanner: LSCPScanner, concept: str, vocabulary: list):
+def scan_single_concept(scanner: "LSCPScanner", concept: str, vocabulary: list):
     """Scan a single concept"""
     result = scanner.scan_concept(concept, vocabulary)
 
@@ -116,53 +155,38 @@ def scan_single_concept(scanner: LSCPScanner, concept: str, vocabulary: list):
         print(f"  • {neighbor}: {dist:.3f}")
 
 
-def scan_batch(scanner: LSCPScanner, concepts: list, vocabulary: list):
-    """Scan multiple concepts"""
+def scan_batch(scanner: "LSCPScanner", concepts: list, vocabulary: list, workers: int = 1):
+    """Scan multiple concepts, `workers` at a time"""
     print(f"\n{'='*60}")
-    print(f"BATCH SCAN: {len(concepts)} concepts")
+    print(f"BATCH SCAN: {len(concepts)} concepts ({workers} workers)")
     print(f"{'='*60}")
 
-    results = scanner.batch_scan(concepts, vocabulary)
+    results = scanner.batch_scan(concepts, vocabulary, workers=workers)
 
     print(f"\n{'='*60}")
     print("BATCH SCAN COMPLETE")
     print(f"{'='*60}")
     print(f"Total scanned: {len(results)}")
 
-    # Show top high-delta concepts
-    sorted_results = sorted(results, key=lambda x: x['avg_delta'], reverse=True)
+    # Show top high-delta concepts (partial selection, no full sort)
+    top10 = heapq.nlargest(10, results, key=_by_avg_delta)
     print("\nTop 10 concepts by average delta:")
-    for i, result in enumerate(sorted_results[:10], 1):
+    for i, result in enumerate(top10, 1):
         print(f"{i}. {result['concept']}: Δ={result['avg_delta']:.4f} ({result['high_delta_count']} high-delta pairs)")
 
 
 def show_stats(db: LSCPDatabase):
     """Show database statistics"""
-    cursor = db.conn.cursor()
-
-    cursor.execute("SELECT COUNT(*) FROM concepts")
-    concept_count = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM relationships")
-    relationship_count = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM scans")
-    scan_count = cursor.fetchone()[0]
-
-    cursor.execute("SELECT AVG(delta) FROM relationships")
-    avg_delta = cursor.fetchone()[0] or 0
-
-    cursor.execute("SELECT COUNT(*) FROM relationships WHERE delta >= ?", (settings.DELTA_THRESHOLD,))
-    high_delta_count = cursor.fetchone()[0]
+    stats = db.get_stats(settings.DELTA_THRESHOLD)
 
     print("\n" + "="*60)
     print("DATABASE STATISTICS")
     print("="*60)
-    print(f"Concepts: {concept_count}")
-    print(f"Relationships: {relationship_count}")
-    print(f"Scans: {scan_count}")
-    print(f"Average Delta: {avg_delta:.4f}")
-    print(f"High Delta Pairs (≥{settings.DELTA_THRESHOLD}): {high_delta_count}")
+    print(f"Concepts: {stats['concepts']}")
+    print(f"Relationships: {stats['relationships']}")
+    print(f"Scans: {stats['scans']}")
+    print(f"Average Delta: {stats['avg_delta']:.4f}")
+    print(f"High Delta Pairs (≥{settings.DELTA_THRESHOLD}): {stats['high_delta_pairs']}")
 
 
 def main():
@@ -170,6 +194,7 @@ def main():
     parser.add_argument("--scan", type=str, help="Scan a single concept")
     parser.add_argument("--batch", action="store_true", help="Scan all core vocabulary")
     parser.add_argument("--batch-size", type=int, default=None, help="Limit batch scan to N words")
+    parser.add_argument("--workers", type=int, default=1, help="Concepts scanned concurrently in a batch")
     parser.add_argument("--stats", action="store_true", help="Show database statistics")
     parser.add_argument("--edges", action="store_true", help="Show high-delta edges")
     parser.add_argument("--server", action="store_true", help="Start API server")
@@ -181,8 +206,19 @@ def main():
         run_server()
         return
 
-    # Initialize system for other operations
-    scanner, db, vector_store = initialize_system()
+    # Words a --batch run scans (and embeds up front)
+    vocab = CORE_VOCABULARY[:args.batch_size] if args.batch_size else CORE_VOCABULARY
+
+    # Read-only reports need the database alone, not the models
+    if args.stats or args.edges:
+        db = get_db()
+    elif args.scan:
+        scanner, db, vector_store = initialize_system()
+    elif args.batch:
+        scanner, db, vector_store = initialize_system(vocab)
+    else:
+        parser.print_help()
+        return
 
     if args.stats:
         show_stats(db)
@@ -204,13 +240,7 @@ def main():
         scan_single_concept(scanner, args.scan, CORE_VOCABULARY)
 
     elif args.batch:
-        vocab = CORE_VOCABULARY[:args.batch_size] if args.batch_size else CORE_VOCABULARY
-        scan_batch(scanner, vocab, vocab)
-
-    else:
-        parser.print_help()
-
-    db.close()
+        scan_batch(scanner, vocab, vocab, workers=args.workers)
 
 
 if __name__ == "__main__":
@@ -2,30 +2,31 @@
 Run batch scan for remaining concepts (excluding already-scanned ones)
 """
 import sys
-from config import settings
-from db.relational import LSCPDatabase
-from db.vector_store import VectorStore
-from models.control import ControlModel
-from models.explorer import ExplorerModel
-from crawler.scanner import LSCPScanner
-from main import CORE_VOCABULARY, initialize_system
+from db.handles import get_db
+from main import CORE_VOCABULARY, CORE_VOCABULARY_LOWER, initialize_system
 
 if __name__ == "__main__":
-    # Initialize system
-    scanner, db, vector_store = initialize_system()
-
-    # Get already-scanned concepts
+    # Get already-scanned concepts, lowercased by SQLite, before loading any models
+    db = get_db()
     cursor = db.conn.cursor()
-    cursor.execute("SELECT DISTINCT c.name FROM scans s JOIN concepts c ON s.anchor_concept_id = c.id")
-    scanned = set(row[0].lower() for row in cursor.fetchall())
+    cursor.execute("SELECT DISTINCT LOWER(c.name) FROM scans s JOIN concepts c ON s.anchor_concept_id = c.id")
+    scanned = {row[0] for row in cursor.fetchall()}
 
     print(f"\nAlready scanned: {len(scanned)} concepts")
     print(f"  {', '.join(sorted(scanned))}")
 
     # Get remaining concepts (ensure case-insensitive comparison)
-    remaining = [c for c in CORE_VOCABULARY if c.lower() not in scanned]
+    remaining = [c for c, cl in zip(CORE_VOCABULARY, CORE_VOCABULARY_LOWER) if cl not in scanned]
 
     print(f"\nRemaining: {len(remaining)} concepts")
+    if not remaining:
+        print("✓ Core vocabulary fully scanned")
+        sys.exit(0)
+
+    # Initialize system (loads the models) only when there is work left;
+    # it reuses the database handle opened above and embeds the scan vocabulary
+    scanner, db, vector_store = initialize_system(CORE_VOCABULARY)
+
     print(f"First 10: {', '.join(remaining[:10])}")
     print(f"\nStarting batch scan of {len(remaining)} concepts...")
     print("="*60)
@@ -39,5 +40,3 @@ if __name__ == "__main__":
     print(f"Previously completed: {len(scanned)}")
     print(f"Newly completed: {len(results)}")
     print(f"Total concepts: {len(scanned) + len(results)}/{len(CORE_VOCABULARY)}")
-
-    db.close()
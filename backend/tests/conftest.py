@@ -0,0 +1,13 @@
+"""
+Pytest setup for the LSCP backend
+Run from the backend directory: python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Modules import each other as top-level packages (db.relational, dual_layout, ...)
+for path in (BACKEND_DIR, BACKEND_DIR / "api", BACKEND_DIR / "experiments"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,101 @@
+"""
+Vectorized k-NN and Procrustes alignment against the original implementations
+"""
+import numpy as np
+import pytest
+from scipy.spatial import procrustes
+
+dual_layout = pytest.importorskip("dual_layout")
+
+
+def reference_knn(names, X, k):
+    """The original per-pair cosine k-NN loop"""
+    relationships = []
+    for i, concept in enumerate(names):
+        emb_norm = np.linalg.norm(X[i])
+        if emb_norm == 0:
+            continue
+        distances = []
+        for j, other in enumerate(names):
+            other_norm = np.linalg.norm(X[j])
+            if other != concept and other_norm != 0:
+                distances.append((other, 1.0 - np.dot(X[i], X[j]) / (emb_norm * other_norm)))
+        distances.sort(key=lambda x: x[1])
+        relationships.extend((concept, neighbor, float(dist)) for neighbor, dist in distances[:k])
+    return relationships
+
+
+def random_rotation(rng):
+    q, r = np.linalg.qr(rng.standard_normal((3, 3)))
+    q *= np.sign(np.diag(r))
+    return q if np.linalg.det(q) > 0 else -q
+
+
+def test_knn_matches_pairwise_loop():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((60, 24)).astype(np.float32)
+    X[7] = 0  # zero vectors have no direction and are skipped
+    names = [f"c{i}" for i in range(len(X))]
+
+    got = dual_layout.compute_knn_relationships_arr(X, names, k=5)
+    expected = reference_knn(names, X.astype(np.float64), 5)
+
+    assert [(a, b) for a, b, _ in got] == [(a, b) for a, b, _ in expected]
+    np.testing.assert_allclose([d for _, _, d in got], [d for _, _, d in expected], atol=1e-5)
+
+
+def test_knn_accepts_prenormalized_rows():
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal((30, 8)).astype(np.float32)
+    names = [f"c{i}" for i in range(len(X))]
+
+    assert dual_layout.compute_knn_relationships_arr(dual_layout._normalize(X), names, 4, normalized=True) == \
+        pytest.approx(dual_layout.compute_knn_relationships_arr(X, names, 4))
+
+
+def test_constrained_procrustes_matches_scipy():
+    rng = np.random.default_rng(2)
+    human = rng.standard_normal((50, 3))
+    ai = human @ random_rotation(rng) * 3.0 + rng.normal(scale=0.3, size=(50, 3)) + 5.0
+
+    aligned_human, aligned_ai, disparity = dual_layout.align_layouts_procrustes(human, ai)
+    ref_human, ref_ai, ref_disparity = procrustes(human, ai)
+
+    assert disparity == pytest.approx(ref_disparity, rel=1e-4)
+    # Same frames up to the visualization scale (both brought to norm 50)
+    np.testing.assert_allclose(aligned_human / 50.0, ref_human, atol=1e-5)
+    np.testing.assert_allclose(aligned_ai / 50.0, ref_ai / np.linalg.norm(ref_ai), atol=1e-5)
+
+
+def test_authentic_procrustes_recovers_rigid_motion():
+    rng = np.random.default_rng(3)
+    human = rng.standard_normal((40, 3))
+    ai = human @ random_rotation(rng) + np.array([4.0, -2.0, 1.0])
+
+    aligned_human, aligned_ai, disparity = dual_layout.align_layouts_procrustes(human, ai, preserve_scale=True)
+
+    assert disparity == pytest.approx(0.0, abs=1e-5)
+    np.testing.assert_allclose(aligned_ai, aligned_human, atol=1e-4)
+    # Human spread is scaled to a standard deviation of 5
+    assert np.sqrt(np.mean(aligned_human ** 2)) == pytest.approx(5.0, rel=1e-5)
+
+
+def test_procrustes_needs_three_points():
+    with pytest.raises(ValueError):
+        dual_layout.align_layouts_procrustes(np.zeros((2, 3)), np.zeros((2, 3)))
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float16])
+def test_load_embeddings_from_matrix_npz(tmp_path, dtype):
+    rng = np.random.default_rng(3)
+    names = ["a", "b", "c", "d"]
+    stored = rng.standard_normal((4, 10)).astype(dtype)
+    npz = tmp_path / "emb.npz"
+    np.savez(npz, names=np.array(names), embeddings=stored)
+
+    X, name_to_row, valid = dual_layout.load_embeddings(str(npz), ["c", "x", "a"], target_dim=6)
+    assert valid == ["c", "a"] and name_to_row == {"c": 0, "a": 1}
+    assert X.dtype == np.float32 and X.flags.c_contiguous
+    np.testing.assert_array_equal(X, stored[[2, 0], :6].astype(np.float32))
+    # The mapped sidecar keeps the stored precision
+    assert np.load(npz.with_suffix(".npy"), mmap_mode="r").dtype == dtype
@@ -0,0 +1,66 @@
+"""
+Explorer bridge cache: hits skip the API, misses and model changes call it
+"""
+import threading
+
+import pytest
+
+from db.explorer_cache import ExplorerCache, cache_bridges
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ExplorerCache(str(tmp_path / "explorer_cache.db"))
+    yield c
+    c.close()
+
+
+class FakeExplorer:
+    def __init__(self):
+        self.calls = []
+
+    def generate_bridge(self, concept_a, concept_b):
+        self.calls.append((concept_a, concept_b))
+        if concept_b == "fail":
+            return None, None
+        return f"{concept_a}->{concept_b}", "because"
+
+
+def test_hits_skip_the_api(cache):
+    explorer = FakeExplorer()
+    bridge = cache_bridges(explorer.generate_bridge, cache, "m1")
+
+    assert bridge("time", "space") == ("time->space", "because")
+    assert bridge("time", "space") == ("time->space", "because")
+    assert explorer.calls == [("time", "space")]
+
+    # Direction and model are part of the key
+    bridge("space", "time")
+    cache_bridges(explorer.generate_bridge, cache, "m2")("time", "space")
+    assert len(explorer.calls) == 3
+
+
+def test_failures_are_not_cached(cache):
+    explorer = FakeExplorer()
+    bridge = cache_bridges(explorer.generate_bridge, cache, "m1")
+    assert bridge("time", "fail") == (None, None)
+    bridge("time", "fail")
+    assert len(explorer.calls) == 2
+
+
+def test_persists_and_is_shared_across_threads(tmp_path):
+    path = str(tmp_path / "explorer_cache.db")
+    cache = ExplorerCache(path)
+    explorer = FakeExplorer()
+    bridge = cache_bridges(explorer.generate_bridge, cache, "m1")
+
+    threads = [threading.Thread(target=bridge, args=("a", f"b{i}")) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    cache.close()
+
+    reopened = ExplorerCache(path)
+    assert all(reopened.get("m1", "a", f"b{i}") == (f"a->b{i}", "because") for i in range(8))
+    reopened.close()
@@ -0,0 +1,306 @@
+"""
+LSCPDatabase: transactions, upserts, indexes and the blob migration
+"""
+import sqlite3
+import struct
+import threading
+
+import pytest
+
+from db.relational import LSCPDatabase, SCHEMA_VERSION
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "lscp.db")
+
+
+@pytest.fixture
+def db(db_path):
+    database = LSCPDatabase(db_path)
+    yield database
+    database.close()
+
+
+def other_connection(db_path: str) -> sqlite3.Connection:
+    """A second connection, to see only what has been committed"""
+    return sqlite3.connect(db_path)
+
+
+def relationship_rows(n: int, bridge: str = None):
+    return [(f"a{i}", f"b{i}", 0.1 * i, 0.2, 0.3 + 0.01 * i, bridge, None, "neighbor") for i in range(n)]
+
+
+def test_opens_in_wal_mode(db):
+    assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert db.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+
+def test_bulk_write_commits_on_exit(db, db_path):
+    with db.bulk_write():
+        db.add_relationship("love", "addiction", 0.4, 0.4, 0.5)
+        db.add_scan("love", ["addiction"], ["addiction"], 0.4)
+        # Nothing is visible outside the transaction yet
+        assert other_connection(db_path).execute("SELECT COUNT(*) FROM relationships").fetchone()[0] == 0
+
+    other = other_connection(db_path)
+    assert other.execute("SELECT COUNT(*) FROM relationships").fetchone()[0] == 1
+    assert other.execute("SELECT COUNT(*) FROM scans").fetchone()[0] == 1
+
+
+def test_bulk_write_rolls_back_on_error(db, db_path):
+    db.add_concept("kept")
+
+    with pytest.raises(RuntimeError):
+        with db.bulk_write():
+            db.add_relationship("love", "addiction", 0.4, 0.4, 0.5)
+            db.add_relationships_bulk(relationship_rows(3))
+            raise RuntimeError("scan failed")
+
+    other = other_connection(db_path)
+    assert other.execute("SELECT COUNT(*) FROM relationships").fetchone()[0] == 0
+    assert [r[0] for r in other.execute("SELECT name FROM concepts")] == ["kept"]
+    assert not db._local.in_txn
+
+    # The connection is usable (and autocommitting) afterwards
+    db.add_relationship("x", "y", 0.1, 0.1, 0.1)
+    assert other.execute("SELECT COUNT(*) FROM relationships").fetchone()[0] == 1
+
+
+def test_nested_bulk_write_joins_outer_transaction(db, db_path):
+    with pytest.raises(ValueError):
+        with db.bulk_write():
+            with db.bulk_write():
+                db.add_relationship("a", "b", 0.1, 0.1, 0.1)
+            # Leaving the inner block must not commit
+            assert other_connection(db_path).execute("SELECT COUNT(*) FROM relationships").fetchone()[0] == 0
+            raise ValueError
+
+    assert other_connection(db_path).execute("SELECT COUNT(*) FROM relationships").fetchone()[0] == 0
+
+
+def test_add_concept_is_idempotent_without_burning_ids(db):
+    first = db.add_concept("love")
+    assert db.add_concept("love") == first
+    assert db.add_concept("fear") == first + 1
+
+
+def test_add_relationship_upserts_in_place(db):
+    rel_id = db.add_relationship("love", "addiction", 0.4, 0.4, 0.5, "bridge one")
+    again = db.add_relationship("love", "addiction", 0.6, 0.7, 0.9, "bridge two", "trace", "neighbor")
+
+    assert again == rel_id
+    row = db.conn.execute("SELECT * FROM relationships").fetchall()
+    assert len(row) == 1
+    assert (row[0]["human_distance"], row[0]["latent_distance"], row[0]["delta"]) == (0.6, 0.7, 0.9)
+    assert (row[0]["bridge_mechanism"], row[0]["internal_monologue"], row[0]["relationship_type"]) == \
+        ("bridge two", "trace", "neighbor")
+
+
+def test_add_relationships_bulk_creates_concepts_and_upserts(db):
+    assert db.add_relationships_bulk([]) == 0
+    assert db.add_relationships_bulk(relationship_rows(4)) == 4
+
+    concepts = {r[0] for r in db.conn.execute("SELECT name FROM concepts")}
+    assert concepts == {f"a{i}" for i in range(4)} | {f"b{i}" for i in range(4)}
+
+    ids_before = [r[0] for r in db.conn.execute("SELECT id FROM relationships ORDER BY id")]
+    db.add_relationships_bulk(relationship_rows(4, bridge="updated"))
+    rows = db.conn.execute("SELECT id, bridge_mechanism FROM relationships ORDER BY id").fetchall()
+    assert [r[0] for r in rows] == ids_before
+    assert {r[1] for r in rows} == {"updated"}
+
+
+def test_add_relationships_bulk_matches_single_inserts(tmp_path):
+    rows = relationship_rows(5, bridge="m")
+    bulk = LSCPDatabase(str(tmp_path / "bulk.db"))
+    single = LSCPDatabase(str(tmp_path / "single.db"))
+    bulk.add_relationships_bulk(rows)
+    for row in rows:
+        single.add_relationship(*row)
+
+    assert bulk.get_high_delta_relationships(0.0) == single.get_high_delta_relationships(0.0)
+    bulk.close()
+    single.close()
+
+
+def test_add_scan_keeps_first_scan(db):
+    first = db.add_scan("love", ["a"], ["a"], 0.4)
+    assert db.add_scan("love", ["b"], ["b"], 0.9) == first
+    assert db.conn.execute("SELECT avg_delta FROM scans").fetchall()[0][0] == 0.4
+
+
+def test_high_delta_relationships_ordered_and_thresholded(db):
+    db.add_relationships_bulk(relationship_rows(10))
+    result = db.get_high_delta_relationships(threshold=0.35, limit=3)
+
+    assert [r["delta"] for r in result] == pytest.approx([0.39, 0.38, 0.37])
+    assert result[0]["concept_a"] == "a9" and result[0]["concept_b"] == "b9"
+
+
+def test_stats_single_query(db):
+    db.add_relationships_bulk(relationship_rows(4))
+    db.add_scan("a0", ["b0"], ["b0"], 0.3)
+    stats = db.get_stats(threshold=0.32)
+
+    assert stats["concepts"] == 8
+    assert stats["relationships"] == 4
+    assert stats["scans"] == 1
+    assert stats["avg_delta"] == pytest.approx(0.315)
+    assert stats["high_delta_pairs"] == 2
+
+
+def query_plan(db, sql: str, params=()) -> str:
+    return " ".join(row[-1] for row in db.conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def test_top_delta_query_uses_covering_index(db):
+    db.add_relationships_bulk(relationship_rows(20))
+    plan = query_plan(db, """
+        SELECT concept_a_id, concept_b_id, human_distance, latent_distance, delta, bridge_mechanism
+        FROM relationships WHERE delta >= ? ORDER BY delta DESC LIMIT ?
+    """, (0.3, 10))
+
+    assert "COVERING INDEX idx_rel_delta_covering" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_concept_relationships_use_delta_ordered_index(db):
+    db.add_relationships_bulk(relationship_rows(20))
+    plan = query_plan(db, "SELECT * FROM relationships WHERE concept_a_id = ? ORDER BY delta DESC", (1,))
+
+    assert "idx_rel_a_delta" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_blob_distances_migrated_once(db_path):
+    database = LSCPDatabase(db_path)
+    database.add_relationships_bulk(relationship_rows(4))
+    database.close()
+
+    # An older database: 4-byte float blobs and no schema version
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE relationships SET human_distance = ? WHERE id % 2 = 0", (struct.pack('f', 0.75),))
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    conn.close()
+
+    database = LSCPDatabase(db_path)
+    kinds = {r[0] for r in database.conn.execute("SELECT typeof(human_distance) FROM relationships")}
+    assert kinds == {"real"}
+    distances = sorted(r["human_distance"] for r in database.get_high_delta_relationships(0.0))
+    assert distances == pytest.approx([0.0, 0.2, 0.75, 0.75])
+    database.close()
+
+
+def test_leftover_blob_distances_decoded_in_batch(db):
+    db.add_relationships_bulk(relationship_rows(4))
+    db.conn.execute("UPDATE relationships SET human_distance = ? WHERE id IN (1, 3)", (struct.pack('f', 0.5),))
+    db.conn.commit()
+
+    by_pair = {r["concept_a"]: r["human_distance"] for r in db.get_high_delta_relationships(0.0)}
+    assert by_pair == pytest.approx({"a0": 0.5, "a1": 0.1, "a2": 0.5, "a3": 0.3})
+
+    db.conn.execute("UPDATE relationships SET human_distance = ? WHERE id = 2", (b"\x00\x01",))
+    db.conn.commit()
+    with pytest.raises(ValueError):
+        db.get_high_delta_relationships(0.0)
+
+
+def test_threads_read_on_their_own_connections(db):
+    db.add_relationships_bulk(relationship_rows(4))
+    seen = {}
+
+    def read():
+        seen["conn"] = db.conn
+        seen["stats"] = db.get_stats(threshold=0.0)
+
+    # A reader in another thread is not blocked by this thread's open write
+    with db.bulk_write():
+        db.add_relationship("x", "y", 0.1, 0.1, 0.9)
+        worker = threading.Thread(target=read)
+        worker.start()
+        worker.join(timeout=5)
+
+    assert not worker.is_alive()
+    assert seen["conn"] is not db.conn
+    assert seen["stats"]["relationships"] == 4
+    assert db.get_stats()["relationships"] == 5
+
+    db.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        seen["conn"].execute("SELECT 1")
+
+
+def scan_items(db):
+    return db.conn.execute("""
+        SELECT s.name, i.kind, i.position, c.name
+        FROM scan_items i
+        JOIN scans ON scans.id = i.scan_id
+        JOIN concepts s ON s.id = scans.anchor_concept_id
+        JOIN concepts c ON c.id = i.concept_id
+        ORDER BY i.scan_id, i.kind, i.position
+    """).fetchall()
+
+
+def test_add_scan_writes_scan_items(db):
+    db.add_scan("love", ["addiction", "care"], ["reward"], 0.4)
+    db.add_scan("love", ["ignored"], ["ignored"], 0.9)
+
+    assert [tuple(r) for r in scan_items(db)] == [
+        ("love", "human", 0, "addiction"), ("love", "human", 1, "care"), ("love", "latent", 0, "reward")
+    ]
+    assert db.get_scans_including("reward") == [{"anchor": "love", "kind": "latent", "position": 0}]
+    assert db.get_scans_including("reward", kind="human") == []
+    assert db.get_scans_including("ignored") == []
+
+
+def test_scan_items_backfilled_from_json(db_path):
+    database = LSCPDatabase(db_path)
+    database.add_scan("love", ["addiction", "care"], ["reward"], 0.4)
+    database.close()
+
+    # A version 1 database: neighbor lists only in the JSON columns
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM scan_items")
+    conn.execute("DELETE FROM concepts WHERE name = 'reward'")
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    database = LSCPDatabase(db_path)
+    assert [tuple(r) for r in scan_items(database)] == [
+        ("love", "human", 0, "addiction"), ("love", "human", 1, "care"), ("love", "latent", 0, "reward")
+    ]
+    database.close()
+
+
+def test_scans_including_concept_use_index(db):
+    db.add_scan("love", ["addiction"], ["reward"], 0.4)
+    plan = query_plan(db, "SELECT scan_id FROM scan_items WHERE concept_id = ? AND kind = ?", (1, "human"))
+
+    assert "idx_scan_items_concept" in plan
+
+
+def test_scan_jobs_are_shared_and_pruned(db, db_path):
+    db.add_scan_job("j1", "love")
+    db.add_scan_job("j2", "hate")
+    db.update_scan_job("j1", "complete", result={"concept": "love", "human_neighbors": [("care", 0.25)]})
+    db.update_scan_job("j2", "running")
+
+    # Another process (API worker) opening the same file sees the jobs
+    other = LSCPDatabase(db_path)
+    assert other.get_scan_job("j1") == {
+        "status": "complete", "concept": "love",
+        "result": {"concept": "love", "human_neighbors": [["care", 0.25]]}, "error": None
+    }
+    assert other.get_scan_job("missing") is None
+    other.close()
+
+    assert db.prune_scan_jobs(3600) == 0
+    db.conn.execute("UPDATE scan_jobs SET updated_at = datetime('now', '-2 hours')")
+    db.conn.commit()
+    # Only finished jobs expire
+    assert db.prune_scan_jobs(3600) == 1
+    assert db.get_scan_job("j1") is None
+    assert db.get_scan_job("j2")["status"] == "running"
@@ -0,0 +1,47 @@
+"""
+KeywordMatcher against the substring loops it replaced
+"""
+import random
+
+import pytest
+
+import text_analysis
+
+KEYWORDS = ['computational', 'function', 'process', 'processing', 'state', 'statement',
+            'model', 'form', 'information', 'loop']
+WORDS = KEYWORDS + ['the', 'a', 'dysfunctional', 'reformation', 'statements', 'modeling',
+                    'hello', 'informational', 'loophole', 'pro']
+
+
+@pytest.fixture(params=[True, False], ids=["ahocorasick", "regex"])
+def backend(request, monkeypatch):
+    if request.param and not text_analysis.HAS_AHOCORASICK:
+        pytest.skip("pyahocorasick not installed")
+    monkeypatch.setattr(text_analysis, "HAS_AHOCORASICK", request.param)
+
+
+def random_texts(count=200, seed=1):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield ' '.join(rng.choice(WORDS) + rng.choice(['', 's', '.', ','])
+                       for _ in range(rng.randint(0, 60)))
+
+
+def test_matching_words_equal_per_word_scan(backend):
+    matcher = text_analysis.KeywordMatcher(KEYWORDS)
+    for text in random_texts():
+        words = text.split()
+        expected = sum(1 for word in words if any(kw in word for kw in KEYWORDS))
+        assert matcher.count_matching_words(text) == (expected, len(words))
+
+
+def test_keyword_count_equals_substring_checks(backend):
+    matcher = text_analysis.KeywordMatcher(KEYWORDS)
+    for text in random_texts():
+        assert matcher.count_keywords(text) == sum(1 for kw in KEYWORDS if kw in text)
+
+
+def test_empty_inputs(backend):
+    assert text_analysis.KeywordMatcher([]).count_matching_words("a model") == (0, 2)
+    assert text_analysis.KeywordMatcher(KEYWORDS).count_matching_words("") == (0, 0)
+    assert text_analysis.KeywordMatcher(KEYWORDS).count_keywords("") == 0
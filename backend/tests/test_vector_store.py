@@ -0,0 +1,106 @@
+"""
+On-disk embedding matrix behind VectorStore.get_all_embeddings
+"""
+import numpy as np
+import pytest
+
+vector_store = pytest.importorskip("db.vector_store")
+
+
+@pytest.fixture
+def prefix(tmp_path):
+    return tmp_path / "lscp_human"
+
+
+def rows(n: int, dim: int = 8, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def test_append_overwrite_and_reload(prefix):
+    matrix = vector_store._EmbeddingMatrix(prefix)
+    first, second = rows(3), rows(2, seed=1)
+    matrix.write(["a", "b", "c"], first)
+    matrix.write(["b", "d"], second)
+
+    names, X = matrix.read()
+    assert names == ["a", "b", "c", "d"]
+    assert X.dtype == np.float32 and isinstance(X, np.memmap)
+    np.testing.assert_array_equal(X, np.stack([first[0], second[0], first[2], second[1]]))
+    with pytest.raises(ValueError):
+        X[0, 0] = 1.0
+
+    reopened_names, reopened = vector_store._EmbeddingMatrix(prefix).read()
+    assert reopened_names == names
+    np.testing.assert_array_equal(reopened, X)
+
+
+def test_grows_past_initial_capacity(prefix, monkeypatch):
+    monkeypatch.setattr(vector_store, "MATRIX_INITIAL_ROWS", 4)
+    matrix = vector_store._EmbeddingMatrix(prefix)
+    X = rows(11)
+    for i in range(0, 11, 3):
+        matrix.write([f"c{j}" for j in range(i, min(i + 3, 11))], X[i:i + 3])
+
+    assert len(matrix.matrix) == 16
+    names, stored = matrix.read()
+    assert names == [f"c{j}" for j in range(11)]
+    np.testing.assert_array_equal(stored, X)
+
+
+def test_interrupted_write_is_discarded(prefix):
+    matrix = vector_store._EmbeddingMatrix(prefix)
+    matrix.write(["a"], rows(1))
+    # A names file that outgrew its matrix
+    with open(matrix.names_path, "a") as f:
+        f.writelines(f'"x{i}"\n' for i in range(2000))
+
+    assert len(vector_store._EmbeddingMatrix(prefix)) == 0
+    assert not matrix.matrix_path.exists()
+
+
+def test_rebuild_replaces_rows(prefix):
+    matrix = vector_store._EmbeddingMatrix(prefix)
+    matrix.write(["a", "b"], rows(2))
+    matrix.rebuild(["z"], rows(1, dim=4))
+
+    names, X = matrix.read()
+    assert names == ["z"] and X.shape == (1, 4)
+    matrix.rebuild([], np.array([]))
+    assert matrix.read()[0] == []
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch):
+    """VectorStore over an in-memory Chroma client (the legacy settings only pick the directory)"""
+    chromadb = vector_store.chromadb
+    ephemeral = chromadb.EphemeralClient
+    monkeypatch.setattr(chromadb, "Client", lambda settings: ephemeral())
+
+    def make(**kwargs):
+        return vector_store.VectorStore(str(tmp_path), f"t{tmp_path.name[-12:]}", **kwargs)
+    return make
+
+
+def test_shared_spaces_store_each_row_once(make_store):
+    store = make_store(shared_spaces=True)
+    X = rows(3)
+    store.add_shared_embedding_batch(["a", "b", "c"], X)
+
+    assert store.human_collection is store.latent_collection
+    assert store.human_collection.count() == 3
+    np.testing.assert_allclose(store.get_latent_embedding("b"), X[1], rtol=1e-6)
+    for space in ("human", "latent"):
+        names, stored = store.get_all_embeddings(space)
+        assert names == ["a", "b", "c"]
+        np.testing.assert_array_equal(stored, X)
+    assert [n for n, _ in store.find_latent_neighbors("a", n=2)] == [n for n, _ in store.find_human_neighbors("a", n=2)]
+
+
+def test_shared_embedding_without_aliasing_writes_both(make_store):
+    store = make_store()
+    X = rows(2)
+    store.add_shared_embedding_batch(["a", "b"], X)
+
+    assert store.human_collection is not store.latent_collection
+    assert store.human_collection.count() == store.latent_collection.count() == 2
+    np.testing.assert_array_equal(store.get_all_embeddings("latent")[1], X)
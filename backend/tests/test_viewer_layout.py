@@ -0,0 +1,120 @@
+"""
+Incremental node placement against a full force-directed recompute
+"""
+import numpy as np
+import pytest
+from scipy import sparse
+
+vs = pytest.importorskip("viewer_server")
+
+N_BASE = 150
+
+
+def random_graph(n: int, leaves: int, seed: int = 0) -> sparse.csr_matrix:
+    """n concepts with ~5 neighbors each, then leaves attached to one of them"""
+    rng = np.random.RandomState(seed)
+    edges = {}
+    for i in range(n):
+        for j in rng.choice(n, 5, replace=False):
+            if i != j:
+                edges[(min(i, j), max(i, j))] = 1.0 / (1.0 + rng.rand())
+    for t in range(leaves):
+        edges[(rng.randint(n), n + t)] = 1.0 / (1.0 + rng.rand())
+
+    size = n + leaves
+    pairs = np.array(list(edges))
+    w = np.array(list(edges.values()))
+    return sparse.csr_matrix(
+        (np.r_[w, w], (np.r_[pairs[:, 0], pairs[:, 1]], np.r_[pairs[:, 1], pairs[:, 0]])),
+        shape=(size, size)
+    )
+
+
+def full_layout(adjacency: sparse.csr_matrix) -> np.ndarray:
+    """Same settings and scaling as get_graph_layout_3d"""
+    return vs.fr_energy_layout(adjacency, k=2.0, iterations=100, seed=42) * 10
+
+
+def layout_units(pos: np.ndarray, adjacency: sparse.csr_matrix, n: int):
+    """(median edge length, 90th-percentile radius) of the first n nodes"""
+    upper = sparse.triu(adjacency[:n][:, :n]).tocoo()
+    edge = np.median(np.linalg.norm(pos[upper.row] - pos[upper.col], axis=1))
+    radius = np.percentile(np.linalg.norm(pos[:n] - pos[:n].mean(axis=0), axis=1), 90)
+    return edge, radius
+
+
+def place(adjacency: sparse.csr_matrix, n_placed: int):
+    """Lay out the first n_placed nodes, then add the rest incrementally"""
+    names = [f"c{i}" for i in range(adjacency.shape[0])]
+    base = full_layout(adjacency[:n_placed][:, :n_placed])
+    cache = vs.ProjectionCache(names[:n_placed], base.astype(np.float32))
+    placed = vs.place_new_nodes(cache, {name: i for i, name in enumerate(names)}, adjacency)
+    order = [placed.row[name] for name in names]
+    return base, np.asarray(placed.coords, dtype=np.float64)[order]
+
+
+def test_existing_nodes_do_not_move():
+    adjacency = random_graph(N_BASE, 3)
+    base, pos = place(adjacency, N_BASE)
+    np.testing.assert_allclose(pos[:N_BASE], base.astype(np.float32))
+
+
+def test_incremental_matches_full_recompute():
+    """
+    New leaves land where a full recompute puts them
+
+    A full recompute rescales the whole layout into [-10, 10], so positions
+    are compared in each layout's own units: distance to the neighbor in
+    median edge lengths, distance from the center in 90th-percentile radii.
+    """
+    leaves = 2
+    adjacency = random_graph(N_BASE, leaves)
+    _, inc = place(adjacency, N_BASE)
+    full = full_layout(adjacency)
+
+    inc_edge, inc_radius = layout_units(inc, adjacency, N_BASE)
+    full_edge, full_radius = layout_units(full, adjacency, N_BASE)
+    inc_center = inc[:N_BASE].mean(axis=0)
+    full_center = full[:N_BASE].mean(axis=0)
+
+    for leaf in range(N_BASE, N_BASE + leaves):
+        nbr = adjacency.getrow(leaf).indices[0]
+        inc_d = np.linalg.norm(inc[leaf] - inc[nbr]) / inc_edge
+        full_d = np.linalg.norm(full[leaf] - full[nbr]) / full_edge
+        inc_r = np.linalg.norm(inc[leaf] - inc_center) / inc_radius
+        full_r = np.linalg.norm(full[leaf] - full_center) / full_radius
+        assert inc_d == pytest.approx(full_d, rel=0.25)
+        assert inc_r == pytest.approx(full_r, rel=0.25)
+
+
+def test_node_linked_only_to_new_nodes_stays_close():
+    """A chain of new nodes is placed outward from the layout, link by link"""
+    adjacency = random_graph(N_BASE, 0).tolil()
+    adjacency.resize((N_BASE + 2, N_BASE + 2))
+    # First new node only knows the second, which hangs off node 5
+    adjacency[N_BASE, N_BASE + 1] = adjacency[N_BASE + 1, N_BASE] = 0.6
+    adjacency[N_BASE + 1, 5] = adjacency[5, N_BASE + 1] = 0.6
+    adjacency = adjacency.tocsr()
+
+    _, pos = place(adjacency, N_BASE)
+    edge, _ = layout_units(pos, adjacency, N_BASE)
+
+    assert np.linalg.norm(pos[N_BASE + 1] - pos[5]) < 3 * edge
+    assert np.linalg.norm(pos[N_BASE] - pos[N_BASE + 1]) < 3 * edge
+
+
+def test_barnes_hut_temperature_spans_z():
+    bh = pytest.importorskip("barnes_hut_layout")
+    if not bh.HAS_NUMBA:
+        pytest.skip("numba not installed")
+
+    # Nodes spread along z only: an x/y-only temperature would freeze them
+    n = 20
+    pos = np.zeros((n, 3))
+    pos[:, 2] = np.linspace(0.0, 10.0, n)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    empty = np.zeros(0, dtype=np.int64)
+
+    out, ok = bh._bh_minibatch_layout(pos.copy(), indptr, empty, np.zeros(0), 1.0, 10, 0.5, 8, 4 * n + 64)
+    assert ok
+    assert np.abs(out - pos).max() > 1e-3
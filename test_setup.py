@@ -33,7 +33,8 @@ if not settings.LLAMA_MODEL_PATH:
     sys.exit(1)
 
 from pathlib import Path
-if not Path(settings.LLAMA_MODEL_PATH).exists():
+# One stat, failing fast before the slow database and model loads below
+if not Path(settings.LLAMA_MODEL_PATH).is_file():
     print(f"✗ Model file not found: {settings.LLAMA_MODEL_PATH}")
     sys.exit(1)
 